@@ -0,0 +1,4 @@
+import os
+
+# Settings() requires an Etherscan key; benchmarks never call the real API
+os.environ.setdefault('ETHERSCAN_API_KEY', 'benchmark')
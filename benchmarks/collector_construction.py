@@ -0,0 +1,52 @@
+"""Cost of constructing a DataCollector, as Celery tasks do once per job.
+
+    python -m benchmarks.collector_construction [iterations]
+
+Compares DataCollector() with what its __init__ used to do on top of that:
+build an AsyncWeb3 + AsyncHTTPProvider for each of the three chains.
+Providers now come from the process-wide web3_registry, built on first use.
+"""
+import sys
+import timeit
+from typing import Dict
+
+import aiohttp
+from web3 import AsyncWeb3
+
+from src.config.settings import settings
+from src.data.collectors import DataCollector
+from src.data.web3_registry import web3_registry
+
+
+def _eager_providers():
+    request_kwargs = {'timeout': aiohttp.ClientTimeout(total=settings.RPC_TIMEOUT)}
+    return {
+        chain_id: AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url, request_kwargs=request_kwargs))
+        for chain_id, url in ((1, settings.ETH_RPC), (56, settings.BSC_RPC), (137, settings.POLYGON_RPC))
+    }
+
+
+def run(iterations: int = 2000) -> Dict:
+    chains_before = web3_registry.initialized_chains()
+    collector = timeit.timeit(DataCollector, number=iterations) / iterations
+    eager = timeit.timeit(lambda: (DataCollector(), _eager_providers()), number=iterations) / iterations
+    return {
+        'iterations': iterations,
+        'collector_seconds': collector,
+        'eager_providers_seconds': eager,
+        # Constructing collectors must not build any provider
+        'chains_initialized': [c for c in web3_registry.initialized_chains() if c not in chains_before],
+    }
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    results = run(iterations)
+    print(f"DataCollector() over {iterations} constructions")
+    print(f"  lazy registry    {results['collector_seconds'] * 1e6:8.1f} us each")
+    print(f"  eager providers  {results['eager_providers_seconds'] * 1e6:8.1f} us each")
+    print(f"  chains initialized while constructing: {results['chains_initialized'] or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Concurrent RPC reads through AsyncWeb3 against a stub node.
+
+    python -m benchmarks.rpc_concurrency [calls] [latency_seconds]
+
+Compares N block_number reads made the old way (synchronous HTTPProvider
+called from the event loop) with the pooled AsyncWeb3 provider used by
+collect_contract_data, and reports the wall time and the longest stall of
+the event loop in each case.
+"""
+import asyncio
+import sys
+import time
+from typing import Dict
+
+from web3 import HTTPProvider, Web3
+
+from src.config.settings import settings
+from src.data.web3_registry import Web3Registry
+from src.utils.http_client import http_clients
+from .stub_rpc import ThreadedStubRPCServer
+
+
+async def _loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Longest delay of a periodic timer, i.e. how long the loop was blocked"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def _measure(work) -> Dict:
+    stop = asyncio.Event()
+    lag = asyncio.ensure_future(_loop_lag(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return {'seconds': elapsed, 'max_loop_stall': await lag}
+
+
+async def run(calls: int = 50, latency: float = 0.05) -> Dict:
+    with ThreadedStubRPCServer(latency=latency) as server:
+        blocking = Web3(HTTPProvider(server.url))
+
+        async def sync_reads():
+            # What collect_contract_data did before: a blocking call per read
+            for _ in range(calls):
+                blocking.eth.block_number
+
+        registry = Web3Registry(settings.model_copy(update={'ETH_RPC': server.url, 'ETH_RPC_URLS': []}))
+        web3 = registry.get(1)
+
+        async def async_reads():
+            await asyncio.gather(*(web3.eth.block_number for _ in range(calls)))
+
+        try:
+            results = {
+                'calls': calls,
+                'latency': latency,
+                'sync_provider': await _measure(sync_reads),
+                'async_pool': await _measure(async_reads),
+                'max_in_flight': server.max_in_flight,
+            }
+        finally:
+            await http_clients.close()
+    return results
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    results = asyncio.run(run(calls, latency))
+    print(f"{calls} block_number reads, {latency * 1000:.0f} ms stub latency")
+    for name in ('sync_provider', 'async_pool'):
+        result = results[name]
+        print(f"  {name:14} {result['seconds'] * 1000:8.1f} ms total, "
+              f"event loop blocked up to {result['max_loop_stall'] * 1000:.1f} ms")
+    print(f"  max concurrent requests at the node: {results['max_in_flight']}")
+
+
+if __name__ == '__main__':
+    main()
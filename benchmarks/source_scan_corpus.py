@@ -0,0 +1,147 @@
+"""Throughput of the source pattern scanner over a synthetic contract corpus.
+
+    python -m benchmarks.source_scan_corpus [contracts]
+
+Compares SourceScanner (str.find per needle, then overlap resolution) with
+the whole catalogue compiled into one trie-shaped regex and matched in a
+single pass, and with the original flag checks, which lowercased the source
+again for every needle. The corpus mixes token boilerplate with the
+constructs the catalogue looks for, at sizes from a single file to large
+flattened sources.
+"""
+import random
+import re
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from src.analyzers.source_scanner import DEFAULT_PATTERNS, SourceScanner
+
+BOILERPLATE = [
+    "    mapping(address => uint256) private _balances;\n",
+    "    mapping(address => mapping(address => uint256)) private _allowances;\n",
+    "    function transfer(address to, uint256 amount) public returns (bool) {\n",
+    "        _transfer(_msgSender(), to, amount);\n        return true;\n    }\n",
+    "    function balanceOf(address account) public view returns (uint256) {\n",
+    "        require(from != address(0), \"ERC20: transfer from the zero address\");\n",
+    "    event Transfer(address indexed from, address indexed to, uint256 value);\n",
+    "    /// @dev See {IERC20-approve}. Emits an {Approval} event.\n",
+    "        uint256 fromBalance = _balances[from];\n        unchecked { _balances[from] = fromBalance - amount; }\n",
+    "    uint8 private constant _decimals = 18;\n",
+]
+
+FLAGGED = [
+    "    function mint(address to, uint256 amount) external onlyOwner {\n",
+    "    function pause() external onlyOwner { _pause(); }\n",
+    "    function renounceOwnership() public virtual onlyOwner {\n",
+    "    mapping(address => bool) public bots;\n    function setBots(address[] memory bots_) public onlyOwner {\n",
+    "        require(!bots[from] && !bots[to]);\n",
+    "    function setFee(uint256 buyFee, uint256 sellFee) external onlyOwner {\n",
+    "    uint256 public maxTransactionAmount;\n    uint256 public maxWallet;\n",
+    "    function enableTrading() external onlyOwner { tradingOpen = true; }\n",
+    "        require(cooldown[to] < block.timestamp);\n",
+    "        (bool ok, ) = implementation.delegatecall(data);\n",
+]
+
+
+def build_corpus(contracts: int = 200, seed: int = 7) -> List[str]:
+    """Deterministic sources from 2 KB to about 300 KB, about 5% flagged lines"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(contracts):
+        target = 300_000 if i % 50 == 0 else rng.randint(2_000, 60_000)
+        lines = ["// SPDX-License-Identifier: MIT\npragma solidity ^0.8.20;\n\ncontract Token {\n"]
+        size = len(lines[0])
+        while size < target:
+            line = rng.choice(FLAGGED) if rng.random() < 0.05 else rng.choice(BOILERPLATE)
+            lines.append(line)
+            size += len(line)
+        lines.append("}\n")
+        corpus.append(''.join(lines))
+    return corpus
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """Regex for a set of literals with shared prefixes factored into a trie"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class TrieRegexScanner:
+    """One regex pass over the source; greedy optional tails make the longest needle win"""
+    def __init__(self, patterns: Dict[str, List[str]], max_positions: int = 20):
+        self.max_positions = max_positions
+        self._categories = {needle.lower(): category for category, needles in patterns.items()
+                            for needle in needles}
+        self._regex = re.compile(_trie_pattern(list(self._categories)))
+
+    def scan(self, source: str) -> Dict[str, List[Tuple[int, str]]]:
+        matches: Dict[str, List[Tuple[int, str]]] = {}
+        for match in self._regex.finditer(source.lower()):
+            positions = matches.setdefault(self._categories[match.group()], [])
+            if len(positions) < self.max_positions:
+                positions.append((match.start(), source[match.start():match.end()]))
+        return matches
+
+
+def scan_per_flag(source: str, patterns: Dict[str, List[str]]) -> Dict[str, bool]:
+    """The original checks: a fresh lowercase copy and substring test per needle"""
+    return {
+        category: any(needle.lower() in source.lower() for needle in needles)
+        for category, needles in patterns.items()
+    }
+
+
+def run(contracts: int = 200, repeat: int = 3) -> Dict:
+    corpus = build_corpus(contracts)
+    scanner = SourceScanner(DEFAULT_PATTERNS)
+    total_bytes = sum(len(source) for source in corpus)
+
+    def best_of(scan) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for source in corpus:
+                scan(source)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    trie_regex = TrieRegexScanner(DEFAULT_PATTERNS)
+    return {
+        'contracts': len(corpus),
+        'bytes': total_bytes,
+        'patterns': sum(len(needles) for needles in DEFAULT_PATTERNS.values()),
+        'scanner_seconds': best_of(scanner.scan),
+        'trie_regex_seconds': best_of(trie_regex.scan),
+        'per_flag_seconds': best_of(lambda source: scan_per_flag(source, DEFAULT_PATTERNS)),
+        # The scanner must report exactly what a single regex pass reports
+        'mismatches': sum(scanner.scan(source) != trie_regex.scan(source) for source in corpus),
+    }
+
+
+def main():
+    contracts = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    results = run(contracts)
+    megabytes = results['bytes'] / 1e6
+    print(f"{results['contracts']} contracts, {megabytes:.1f} MB, {results['patterns']} patterns")
+    for label, key in (('scanner', 'scanner_seconds'), ('trie regex', 'trie_regex_seconds'),
+                       ('per flag', 'per_flag_seconds')):
+        print(f"  {label:12} {results[key]:7.3f}s  {megabytes / results[key]:7.1f} MB/s")
+    print(f"  contracts where scanner and regex differ: {results['mismatches']}")
+
+
+if __name__ == '__main__':
+    main()
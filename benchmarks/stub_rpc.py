@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from aiohttp import web
+
+Handler = Callable[[list], Any]
+
+DEFAULT_HANDLERS: Dict[str, Handler] = {
+    'eth_chainId': lambda params: '0x1',
+    'eth_blockNumber': lambda params: hex(19_000_000),
+    'eth_getCode': lambda params: '0x6080',
+    'web3_clientVersion': lambda params: 'stub/1.0',
+}
+
+
+class StubRPCServer:
+    """Local JSON-RPC endpoint that answers every call after a fixed latency.
+
+    Handles single calls and batch arrays, so RPCEndpointPool and
+    PooledAsyncProvider can be pointed at it in place of a real node.
+    """
+    def __init__(self, latency: float = 0.05, handlers: Optional[Dict[str, Handler]] = None):
+        self.latency = latency
+        self.handlers = {**DEFAULT_HANDLERS, **(handlers or {})}
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.url = None
+        self._runner = None
+
+    def _answer(self, call: Dict) -> Dict:
+        handler = self.handlers.get(call.get('method'))
+        if handler is None:
+            return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': 'method not found'}}
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': handler(call.get('params') or [])}
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if isinstance(payload, list):
+            return web.json_response([self._answer(call) for call in payload])
+        return web.json_response(self._answer(payload))
+
+    async def __aenter__(self) -> "StubRPCServer":
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+        return False
+
+
+class ThreadedStubRPCServer:
+    """StubRPCServer on its own event loop thread.
+
+    Needed when the code under test may block the caller's loop (e.g. a
+    synchronous provider), which would otherwise stall the stub as well.
+    """
+    def __init__(self, **kwargs):
+        self.server = StubRPCServer(**kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self) -> StubRPCServer:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.__aenter__(), self._loop).result()
+        return self.server
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self.server.__aexit__(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        return False
@@ -0,0 +1,120 @@
+import os
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+from .source_scanner import CAPABILITY_CATEGORIES, source_scanner
+
+PUSH1 = 0x60
+PUSH4 = 0x63
+PUSH32 = 0x7f
+EQ = 0x14
+DELEGATECALL = 0xf4
+SELFDESTRUCT = 0xff
+
+SELECTOR_FILE = os.path.join(os.path.dirname(__file__), 'data', 'function_selectors.tsv')
+
+# A callable upgradeTo() makes the token a proxy; source reports that as is_proxy
+SELECTOR_CATEGORIES = CAPABILITY_CATEGORIES | {'proxy'}
+
+
+class SelectorIndex:
+    """4-byte selector -> signature lookup backed by a bundled TSV file.
+
+    Selectors are kept sorted in a packed uint32 array and searched with
+    bisect; the file is only read on first use.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._selectors: Optional[array] = None
+        self._signatures: List[str] = []
+
+    def _load(self):
+        rows = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    selector, signature = line.split('\t', 1)
+                    rows.append((int(selector, 16), signature))
+        rows.sort()
+        self._selectors = array('I', (selector for selector, _ in rows))
+        self._signatures = [signature for _, signature in rows]
+
+    def lookup(self, selector: int) -> Optional[str]:
+        if self._selectors is None:
+            self._load()
+        i = bisect_left(self._selectors, selector)
+        if i < len(self._selectors) and self._selectors[i] == selector:
+            return self._signatures[i]
+        return None
+
+    def __len__(self):
+        if self._selectors is None:
+            self._load()
+        return len(self._selectors)
+
+
+def _strip_metadata(code: bytes) -> bytes:
+    """Drop the CBOR metadata solc appends, so its bytes are not read as opcodes"""
+    if len(code) < 2:
+        return code
+    length = int.from_bytes(code[-2:], 'big')
+    start = len(code) - length - 2
+    if start > 0 and 0xa1 <= code[start] <= 0xa5:
+        return code[:start]
+    return code
+
+
+def scan_bytecode(code: bytes) -> Tuple[List[int], Set[int]]:
+    """Disassemble in one linear pass.
+
+    Returns the dispatcher selectors (PUSH4 immediately compared with EQ)
+    and the set of opcodes seen outside PUSH data.
+    """
+    code = _strip_metadata(code)
+    selectors = []
+    opcodes = set()
+    i, size = 0, len(code)
+    while i < size:
+        op = code[i]
+        if PUSH1 <= op <= PUSH32:
+            width = op - PUSH1 + 1
+            if op == PUSH4 and i + 5 < size and code[i + 5] == EQ:
+                selectors.append(int.from_bytes(code[i + 1:i + 5], 'big'))
+            i += width + 1
+            continue
+        opcodes.add(op)
+        i += 1
+    return selectors, opcodes
+
+
+class BytecodeAnalyzer:
+    """Capability flags for contracts without verified source"""
+    def __init__(self, index: SelectorIndex):
+        self.index = index
+
+    def analyze(self, code: bytes) -> Dict:
+        selectors, opcodes = scan_bytecode(code)
+        selectors = sorted(set(selectors))
+        functions = []
+        capabilities = set()
+        for selector in selectors:
+            signature = self.index.lookup(selector)
+            if signature is None:
+                continue
+            functions.append(signature)
+            name = signature.split('(', 1)[0]
+            capabilities.update(c for c in source_scanner.scan(name) if c in SELECTOR_CATEGORIES)
+        if DELEGATECALL in opcodes:
+            capabilities.add('proxy')
+        if SELFDESTRUCT in opcodes:
+            capabilities.add('selfdestruct')
+        return {
+            'bytecode_selector_count': len(selectors),
+            'bytecode_functions': functions,
+            'bytecode_capabilities': sorted(capabilities),
+        }
+
+
+bytecode_analyzer = BytecodeAnalyzer(SelectorIndex(SELECTOR_FILE))
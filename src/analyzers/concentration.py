@@ -0,0 +1,72 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+
+class ConcentrationStats:
+    """Holder concentration computed in one pass over (address, balance) pairs.
+
+    Memory stays bounded however many holders are streamed through: the
+    largest top_k balances are kept in a min-heap, HHI only needs the running
+    sum of squared balances, and the Gini coefficient is approximated from
+    log-spaced balance buckets (buckets_per_octave buckets per doubling), each
+    holding a count and a sum.
+    """
+    def __init__(self, top_k: int = 20, buckets_per_octave: int = 8):
+        self.top_k = top_k
+        self.buckets_per_octave = buckets_per_octave
+        self.count = 0
+        self.total = 0
+        self.sum_squares = 0
+        self._top: List[Tuple[int, str]] = []
+        self._buckets: Dict[int, List[int]] = {}
+
+    def add(self, address: str, balance: int):
+        if balance <= 0:
+            return
+        self.count += 1
+        self.total += balance
+        self.sum_squares += balance * balance
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, (balance, address))
+        elif balance > self._top[0][0]:
+            heapq.heapreplace(self._top, (balance, address))
+        bucket = self._buckets.setdefault(math.floor(math.log2(balance) * self.buckets_per_octave), [0, 0])
+        bucket[0] += 1
+        bucket[1] += balance
+
+    def top(self) -> List[Tuple[str, int]]:
+        """(address, balance) of the largest holders, largest first"""
+        return [(address, balance) for balance, address in sorted(self._top, reverse=True)]
+
+    def hhi(self, total_supply: Optional[int] = None) -> float:
+        """Herfindahl-Hirschman index on a 0-10000 scale"""
+        supply = total_supply or self.total
+        return self.sum_squares / (supply * supply) * 10000 if supply else 0.0
+
+    def gini(self) -> float:
+        """Gini coefficient from the area under the bucketed Lorenz curve"""
+        if not self.count or not self.total:
+            return 0.0
+        area, cumulative = 0.0, 0.0
+        for key in sorted(self._buckets):
+            count, amount = self._buckets[key]
+            share = amount / self.total
+            # Holders within a bucket are treated as equal, a trapezoid per bucket
+            area += count / self.count * (2 * cumulative + share)
+            cumulative += share
+        return max(0.0, 1.0 - area)
+
+    def summary(self, total_supply: Optional[int] = None) -> Dict:
+        supply = total_supply or self.total
+        top = self.top()
+        top1 = top[0][1] if top else 0
+        top10 = sum(balance for _, balance in top[:10])
+        return {
+            'holder_count': self.count,
+            'top_holder_percent': top1 / supply * 100 if supply else 0,
+            'top10_holders_percent': top10 / supply * 100 if supply else 0,
+            'holder_addresses': [address for address, _ in top],
+            'holder_hhi': self.hhi(supply),
+            'holder_gini': self.gini(),
+        }
@@ -49,10 +49,18 @@ class HeuristicEngine:
             critical_risks=critical_risks
         )
     
+    def _is_missing(self, token_data: Dict, *fields: str) -> bool:
+        """True if a collector missed its time budget for any of these fields"""
+        missing = token_data.get('missing_fields', [])
+        return any(field in missing for field in fields)
+    
     async def check_honeypot(self, token_data: Dict) -> List[Risk]:
         """Check for honeypot indicators"""
         risks = []
         
+        if self._is_missing(token_data, 'cannot_sell_all', 'sell_tax'):
+            return risks
+        
         if not token_data.get('can_sell', True):
             risks.append(Risk(
                 type="HONEYPOT_CANNOT_SELL",
@@ -83,10 +91,23 @@ class HeuristicEngine:
         """Analyze liquidity health"""
         risks = []
         
+        if self._is_missing(token_data, 'liquidity_usd'):
+            return risks
+        
         liquidity_usd = token_data.get('liquidity_usd', 0)
         market_cap = token_data.get('market_cap', 1)
         liquidity_locked = token_data.get('liquidity_locked_percent', 0)
         
+        # Reserves read on-chain catch a pulled pool before the DEX APIs notice
+        if token_data.get('pair_quote_reserve') == 0 or token_data.get('pair_token_reserve') == 0:
+            risks.append(Risk(
+                type="LIQUIDITY_REMOVED",
+                score=1.0,
+                reason="Main pair has no reserves on-chain",
+                severity=RiskLevel.CRITICAL
+            ))
+            return risks
+        
         if liquidity_usd < 5000:
             risks.append(Risk(
                 type="EXTREMELY_LOW_LIQUIDITY",
@@ -117,7 +138,8 @@ class HeuristicEngine:
         """Check contract ownership and permissions"""
         risks = []
         
-        if not token_data.get('ownership_renounced', False):
+        # Capability checks below do not depend on ownership being known
+        if not self._is_missing(token_data, 'ownership_renounced') and not token_data.get('ownership_renounced', False):
             risks.append(Risk(
                 type="CENTRALIZED_OWNERSHIP",
                 score=0.5,
@@ -125,7 +147,12 @@ class HeuristicEngine:
                 severity=RiskLevel.MEDIUM
             ))
         
-        if token_data.get('has_mint_function', False):
+        # Capabilities from function selectors in the runtime bytecode. Unlike
+        # source flags they only fire for callable functions, and they are the
+        # only signal available for unverified contracts; either one counts.
+        capabilities = token_data.get('bytecode_capabilities') or []
+        
+        if token_data.get('has_mint_function', False) or 'mint' in capabilities:
             if not token_data.get('mint_disabled', False):
                 risks.append(Risk(
                     type="ACTIVE_MINT_FUNCTION",
@@ -134,12 +161,39 @@ class HeuristicEngine:
                     severity=RiskLevel.HIGH
                 ))
         
+        if token_data.get('has_blacklist', False) or 'blacklist' in capabilities:
+            risks.append(Risk(
+                type="BLACKLIST_FUNCTION",
+                score=0.7,
+                reason="Owner can block addresses from trading",
+                severity=RiskLevel.HIGH
+            ))
+        
+        if token_data.get('has_fee_setter', False) or 'fee_setter' in capabilities:
+            risks.append(Risk(
+                type="ADJUSTABLE_FEES",
+                score=0.5,
+                reason="Owner can change buy/sell fees",
+                severity=RiskLevel.MEDIUM
+            ))
+        
+        if token_data.get('has_pause_function', False) or 'pause' in capabilities:
+            risks.append(Risk(
+                type="PAUSABLE_TRADING",
+                score=0.5,
+                reason="Owner can pause token transfers",
+                severity=RiskLevel.MEDIUM
+            ))
+        
         return risks
     
     async def check_holder_distribution(self, token_data: Dict) -> List[Risk]:
         """Analyze token holder distribution"""
         risks = []
         
+        if self._is_missing(token_data, 'holder_count'):
+            return risks
+        
         holder_count = token_data.get('holder_count', 0)
         top10_percent = token_data.get('top10_holders_percent', 100)
         
@@ -172,7 +226,7 @@ class HeuristicEngine:
         """Check contract-related safety factors"""
         risks = []
         
-        if not token_data.get('contract_verified', False):
+        if not token_data.get('contract_verified', False) and not self._is_missing(token_data, 'contract_verified'):
             risks.append(Risk(
                 type="UNVERIFIED_CONTRACT",
                 score=0.5,
@@ -197,6 +251,9 @@ class HeuristicEngine:
         """Analyze trading patterns for red flags"""
         risks = []
         
+        if self._is_missing(token_data, 'volume_24h', 'liquidity_usd'):
+            return risks
+        
         volume_24h = token_data.get('volume_24h', 0)
         liquidity = token_data.get('liquidity_usd', 1)
         volume_liq_ratio = volume_24h / liquidity if liquidity > 0 else 0
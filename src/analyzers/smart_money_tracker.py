@@ -1,12 +1,18 @@
 from typing import Dict, List, Set, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 import asyncio
+import heapq
+import itertools
+import time
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config.settings import settings
+from ..data.transfer_indexer import transfer_indexer
+from ..data.web3_registry import web3_registry
 from ..models.database import SmartWallet, TokenAnalysis
+from ..utils.circuit_breaker import breakers
 from ..utils.database import get_db
 
 class SmartMoneyTracker:
@@ -28,8 +34,13 @@ class SmartMoneyTracker:
             # Add real profitable wallet addresses here
         ])
     
-    async def analyze_smart_money_flow(self, token_address: str, chain_id: int, token_data: Dict) -> Dict:
-        """Analyze smart money activity for a token"""
+    async def analyze_smart_money_flow(self, token_address: str, chain_id: int, token_data: Dict,
+                                       time_budget: Optional[float] = None) -> Dict:
+        """Analyze smart money activity for a token
+
+        The Transfer log scan behind the flow metrics stops after time_budget
+        seconds (at most SMART_MONEY_TIME_BUDGET).
+        """
         analysis = {
             'smart_money_score': 0.0,
             'smart_wallets_holding': [],
@@ -47,9 +58,10 @@ class SmartMoneyTracker:
             holder_addresses = token_data.get('holder_addresses', [])
             
             # Check which smart wallets are holding
+            smart_wallets = {w.lower() for w in self.smart_wallets}
             smart_holders = []
             for holder in holder_addresses:
-                if holder.lower() in [w.lower() for w in self.smart_wallets]:
+                if holder.lower() in smart_wallets:
                     smart_holders.append({
                         'address': holder,
                         'is_smart_money': True
@@ -80,9 +92,20 @@ class SmartMoneyTracker:
             
             analysis['smart_money_score'] = min(score, 1.0)
             
-            # Determine market phase
+            try:
+                flows = await self._compute_flows(token_address, chain_id, token_data, smart_wallets, time_budget)
+            except Exception as e:
+                print(f"Smart money flow error: {e}")
+                flows = None
+            if flows:
+                analysis.update(flows)
+            
+            # Determine market phase, from smart money flow when there was any
             volume_ratio = token_data.get('volume_liquidity_ratio', 0)
-            if volume_ratio > 0.5 and len(smart_holders) > 0:
+            if flows and (flows['recent_smart_buys'] or flows['recent_smart_sells']):
+                analysis['accumulation_phase'] = flows['smart_money_net_flow'] > 0
+                analysis['distribution_phase'] = flows['smart_money_net_flow'] < 0
+            elif volume_ratio > 0.5 and len(smart_holders) > 0:
                 analysis['accumulation_phase'] = True
             elif volume_ratio < 0.1 and len(smart_holders) == 0:
                 analysis['distribution_phase'] = True
@@ -98,6 +121,95 @@ class SmartMoneyTracker:
         
         return analysis
     
+    async def _compute_flows(self, token_address: str, chain_id: int, token_data: Dict,
+                             smart_wallets: Set[str], time_budget: Optional[float] = None) -> Optional[Dict]:
+        """Smart money net flow per window and whale transfers over recent Transfer logs.
+        
+        Logs are folded one eth_getLogs window at a time into fixed-size
+        aggregates, so memory does not grow with the number of transfers.
+        Transfers out of the main pair are buys and into it are sells. Stops
+        at the time budget; flow_complete is False when it did.
+        """
+        lookback = settings.SMART_MONEY_LOOKBACK_BLOCKS.get(chain_id)
+        pool = web3_registry.get_pool(chain_id)
+        budget = settings.SMART_MONEY_TIME_BUDGET if time_budget is None else min(
+            time_budget, settings.SMART_MONEY_TIME_BUDGET
+        )
+        if not lookback or pool is None or budget <= 0:
+            return None
+        deadline = time.monotonic() + budget
+        # The cached chain_state head can be a minute old; flows need the current head
+        try:
+            async with breakers.get('rpc', chain_id):
+                latest_block = int(await asyncio.wait_for(pool.request('eth_blockNumber'), budget), 16)
+        except asyncio.TimeoutError:
+            return None
+        pair = (token_data.get('pair_address') or '').lower()
+        scale = 10 ** token_data.get('decimals', 18)
+        usd_per_unit = (token_data.get('price_usd') or 0) / scale
+        start = max(0, latest_block - lookback + 1)
+        window_size = -(-(latest_block - start + 1) // settings.SMART_MONEY_FLOW_WINDOWS)
+        windows = [
+            {'from_block': first, 'to_block': min(first + window_size - 1, latest_block),
+             'inflow_usd': 0.0, 'outflow_usd': 0.0, 'smart_buys': 0, 'smart_sells': 0}
+            for first in range(start, latest_block + 1, window_size)
+        ]
+        buys = deque(maxlen=settings.SMART_MONEY_MAX_EVENTS)
+        sells = deque(maxlen=settings.SMART_MONEY_MAX_EVENTS)
+        whales = []  # min-heap of the largest movements
+        tiebreak = itertools.count()
+        scanned_to = start - 1
+        
+        stream = transfer_indexer.stream_transfers(chain_id, token_address, start, latest_block)
+        try:
+            while True:
+                try:
+                    # A slow eth_getLogs window must not outlast the budget either
+                    end, transfers = await asyncio.wait_for(stream.__anext__(), deadline - time.monotonic())
+                except (StopAsyncIteration, asyncio.TimeoutError):
+                    break
+                for block, sender, recipient, value in transfers:
+                    value_usd = value * usd_per_unit
+                    window = windows[(block - start) // window_size]
+                    if recipient in smart_wallets:
+                        window['inflow_usd'] += value_usd
+                        if sender == pair:
+                            window['smart_buys'] += 1
+                            buys.append({'address': recipient, 'block': block,
+                                         'amount': value / scale, 'value_usd': value_usd})
+                    if sender in smart_wallets:
+                        window['outflow_usd'] += value_usd
+                        if recipient == pair:
+                            window['smart_sells'] += 1
+                            sells.append({'address': sender, 'block': block,
+                                          'amount': value / scale, 'value_usd': value_usd})
+                    if value_usd >= self.whale_threshold:
+                        movement = {
+                            'from': sender, 'to': recipient, 'block': block,
+                            'amount': value / scale, 'value_usd': value_usd,
+                            'direction': 'buy' if sender == pair else 'sell' if recipient == pair else 'transfer',
+                        }
+                        entry = (value_usd, next(tiebreak), movement)
+                        if len(whales) < settings.SMART_MONEY_MAX_EVENTS:
+                            heapq.heappush(whales, entry)
+                        elif entry > whales[0]:
+                            heapq.heapreplace(whales, entry)
+                scanned_to = end
+        finally:
+            await stream.aclose()
+        
+        for window in windows:
+            window['net_flow_usd'] = window['inflow_usd'] - window['outflow_usd']
+        return {
+            'smart_money_net_flow': sum(window['net_flow_usd'] for window in windows),
+            'smart_money_flow_windows': windows,
+            'recent_smart_buys': list(reversed(buys)),
+            'recent_smart_sells': list(reversed(sells)),
+            'whale_movements': [movement for _, _, movement in sorted(whales, reverse=True)],
+            'flow_blocks_scanned': [start, scanned_to],
+            'flow_complete': scanned_to >= latest_block,
+        }
+    
     async def get_top_smart_wallets(self, limit: int = 100) -> List[Dict]:
         """Get top performing smart wallets from database"""
         async with get_db() as db:
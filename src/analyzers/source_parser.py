@@ -0,0 +1,217 @@
+import asyncio
+import json
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from ..config.settings import settings
+from .source_scanner import CAPABILITY_CATEGORIES, source_scanner
+
+_COMMENTS_AND_STRINGS = re.compile(
+    r'//[^\n]*|/\*.*?\*/|("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')',
+    re.DOTALL,
+)
+_CONTRACT_HEADER = re.compile(
+    r'\b(abstract\s+contract|contract|interface|library)\s+(\w+)\s*(?:is\s+([^{]+))?\{'
+)
+_FUNCTION = re.compile(r'\bfunction\s+(\w+)\s*\(([^)]*)\)([^{;]*)')
+_MODIFIER = re.compile(r'\bmodifier\s+(\w+)')
+_VISIBILITY = ('external', 'public', 'internal', 'private')
+_NOT_STATE = ('function', 'modifier', 'event', 'error', 'struct', 'enum', 'using', 'constructor',
+              'fallback', 'receive', 'pragma', 'import')
+_KEYWORDS = {'view', 'pure', 'payable', 'virtual', 'override', 'nonpayable', *_VISIBILITY}
+
+
+def split_source_files(source_code: str) -> Dict[str, str]:
+    """Split Etherscan's SourceCode field into {path: source}.
+
+    Multi-file projects come back as standard-JSON input wrapped in an extra
+    pair of braces ({{...}}), or as a bare {path: {content}} map.
+    """
+    text = source_code.strip()
+    if text.startswith('{{') and text.endswith('}}'):
+        text = text[1:-1]
+    if text.startswith('{'):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return {'main.sol': source_code}
+        files = data.get('sources', data)
+        return {
+            path: entry.get('content', '') if isinstance(entry, dict) else str(entry)
+            for path, entry in files.items()
+        }
+    return {'main.sol': source_code}
+
+
+def strip_comments(source: str) -> str:
+    """Remove comments and blank out string literals, keeping line structure"""
+    def replace(match):
+        if match.group(1):
+            return '""'
+        return '\n' * match.group().count('\n')
+    return _COMMENTS_AND_STRINGS.sub(replace, source)
+
+
+def _matching_brace(source: str, start: int) -> int:
+    depth = 0
+    for i in range(start, len(source)):
+        if source[i] == '{':
+            depth += 1
+        elif source[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(source)
+
+
+def _top_level(body: str) -> str:
+    """The body with every nested {...} block removed"""
+    parts, depth, last = [], 0, 0
+    for i, char in enumerate(body):
+        if char == '{':
+            if depth == 0:
+                parts.append(body[last:i])
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                parts.append(';')
+                last = i + 1
+    parts.append(body[last:] if depth == 0 else '')
+    return ''.join(parts)
+
+
+def parse_contracts(source: str) -> Dict[str, Dict]:
+    """Contracts, interfaces and libraries declared in comment-free source"""
+    contracts = {}
+    for match in _CONTRACT_HEADER.finditer(source):
+        kind, name, bases = match.groups()
+        end = _matching_brace(source, match.end() - 1)
+        body = source[match.end():end]
+        top = _top_level(body)
+        functions = []
+        for fn in _FUNCTION.finditer(top):
+            # Drop the returns clause and modifier arguments before reading attributes
+            attributes = re.findall(r'\w+', re.sub(r'\([^)]*\)', '', fn.group(3).split('returns')[0]))
+            visibility = next((a for a in attributes if a in _VISIBILITY), 'public')
+            functions.append({
+                'name': fn.group(1),
+                'visibility': visibility,
+                'modifiers': [a for a in attributes if a not in _KEYWORDS and not a[0].isdigit()],
+            })
+        state_variables = []
+        for statement in top.split(';'):
+            keyword = re.match(r'\s*(\w+)', statement)
+            if not keyword or keyword.group(1) in _NOT_STATE:
+                continue
+            names = re.findall(r'\w+', re.split(r'=(?!>)', statement, 1)[0])
+            if len(names) >= 2:
+                state_variables.append(names[-1])
+        contracts[name] = {
+            'kind': kind.split()[-1],
+            'bases': [re.split(r'[\s(]', b.strip(), 1)[0] for b in bases.split(',')] if bases else [],
+            'functions': functions,
+            'modifiers': _MODIFIER.findall(top),
+            'state_variables': state_variables,
+            'body': body,
+        }
+    return contracts
+
+
+def _linearize(name: str, contracts: Dict[str, Dict]) -> List[str]:
+    """name followed by its ancestors, most-derived first, each once"""
+    order, stack = [], [name]
+    while stack:
+        current = stack.pop()
+        if current in order or current not in contracts:
+            continue
+        order.append(current)
+        stack.extend(reversed(contracts[current]['bases']))
+    return order
+
+
+def _main_contract(contracts: Dict[str, Dict], contract_name: Optional[str]) -> Optional[str]:
+    if contract_name in contracts:
+        return contract_name
+    # Otherwise the last concrete contract nothing else inherits from
+    inherited = {base for c in contracts.values() for base in c['bases']}
+    candidates = [n for n, c in contracts.items() if c['kind'] == 'contract' and n not in inherited]
+    return candidates[-1] if candidates else None
+
+
+def summarize_source(source_code: str, contract_name: Optional[str] = None) -> Dict:
+    """Structural summary and pattern flags for a verified contract.
+
+    Only the main contract and the contracts it inherits from are
+    considered, with comments removed, so unrelated interfaces, libraries
+    and documentation no longer trigger flags. Capability flags come from
+    public/external function names.
+    """
+    files = split_source_files(source_code)
+    contracts = {}
+    for content in files.values():
+        contracts.update(parse_contracts(strip_comments(content)))
+    main = _main_contract(contracts, contract_name)
+    if main is None:
+        # Unparseable source: fall back to scanning all of it
+        matches = source_scanner.scan(strip_comments('\n'.join(files.values())))
+        return {'summary': {'file_count': len(files), 'main_contract': None}, 'matches': matches,
+                'capabilities': sorted(c for c in matches if c in CAPABILITY_CATEGORIES)}
+
+    lineage = [n for n in _linearize(main, contracts) if contracts[n]['kind'] != 'interface']
+    functions, modifiers, state_variables = [], [], []
+    for name in lineage:
+        contract = contracts[name]
+        functions.extend({**fn, 'contract': name} for fn in contract['functions'])
+        modifiers.extend(contract['modifiers'])
+        state_variables.extend(contract['state_variables'])
+
+    capabilities = set()
+    for fn in functions:
+        if fn['visibility'] in ('external', 'public'):
+            capabilities.update(c for c in source_scanner.scan(fn['name']) if c in CAPABILITY_CATEGORIES)
+    matches = source_scanner.scan('\n'.join(contracts[name]['body'] for name in lineage))
+    return {
+        'summary': {
+            'file_count': len(files),
+            'main_contract': main,
+            'inherits': lineage[1:],
+            'functions': functions,
+            'modifiers': sorted(set(modifiers)),
+            'state_variables': state_variables,
+        },
+        # Offsets are into the comment-free bodies of the main contract's lineage
+        'matches': matches,
+        'capabilities': sorted(capabilities),
+    }
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Process pool for parsing, or None where child processes are not allowed"""
+    global _pool
+    # Celery prefork children are daemonic and cannot start processes of their own
+    if multiprocessing.current_process().daemon:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.SOURCE_PARSE_WORKERS)
+    return _pool
+
+
+async def summarize_source_async(source_code: str, contract_name: Optional[str] = None) -> Dict:
+    """summarize_source() off the event loop for large sources"""
+    if len(source_code) < settings.SOURCE_PARSE_PROCESS_THRESHOLD:
+        return summarize_source(source_code, contract_name)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), summarize_source, source_code, contract_name)
+
+
+def shutdown_parser_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional, Tuple
+
+from ..config.settings import settings
+
+# Category -> case-insensitive substrings that indicate it in Solidity source.
+DEFAULT_PATTERNS: Dict[str, List[str]] = {
+    'proxy': ['proxy', 'delegatecall', 'upgradeto'],
+    'mint': ['mint'],
+    'pause': ['pause'],
+    'ownership_renounced': [
+        'renounceownership',
+        'owner = address(0)',
+        'owner = 0x0000000000000000000000000000000000000000',
+    ],
+    'blacklist': ['blacklist', 'blocklist', 'isbot', 'bots[', 'addbot', 'setbot', 'blockbot', 'delbot'],
+    'fee_setter': ['setfee', 'settax', 'setbuyfee', 'setsellfee', 'updatefee', 'setswapfee'],
+    'max_tx': ['maxtx', 'maxtransactionamount', 'maxwallet'],
+    'trading_toggle': ['tradingenabled', 'enabletrading', 'tradingopen', 'opentrading'],
+    'cooldown': ['cooldown'],
+    'selfdestruct': ['selfdestruct', 'suicide('],
+}
+
+# Categories that describe something a caller can do; the rest (e.g.
+# ownership_renounced) depend on state, not on a function existing.
+CAPABILITY_CATEGORIES = {'mint', 'pause', 'blacklist', 'fee_setter', 'max_tx', 'trading_toggle', 'cooldown'}
+
+
+class SourceScanner:
+    """Multi-pattern scanner for contract source code.
+
+    The source is lowercased once and each needle is located with str.find,
+    whose C loop outruns a single regex pass over the whole catalogue (see
+    benchmarks/source_scan_corpus.py). Matches are then resolved as one
+    left-to-right pass would: they do not overlap and at each offset the
+    longest pattern wins.
+    """
+    def __init__(self, patterns: Dict[str, List[str]], max_positions: int = 20):
+        self.max_positions = max_positions
+        self._categories: Dict[str, str] = {}
+        for category, needles in patterns.items():
+            for needle in needles:
+                self._categories[needle.lower()] = category
+        self.categories = sorted(set(self._categories.values()))
+
+    def scan(self, source: str) -> Dict[str, List[Tuple[int, str]]]:
+        """Return {category: [(offset, matched text), ...]} for categories that matched"""
+        lowered = source.lower()
+        candidates = []
+        for needle in self._categories:
+            start = lowered.find(needle)
+            while start != -1:
+                candidates.append((start, -len(needle), needle))
+                start = lowered.find(needle, start + 1)
+        candidates.sort()
+        matches: Dict[str, List[Tuple[int, str]]] = {}
+        end = 0
+        for start, negative_length, needle in candidates:
+            if start < end:
+                continue
+            end = start - negative_length
+            positions = matches.setdefault(self._categories[needle], [])
+            if len(positions) < self.max_positions:
+                positions.append((start, source[start:end]))
+        return matches
+
+
+def build_scanner(extra_patterns: Optional[Dict[str, List[str]]] = None) -> SourceScanner:
+    """Default catalogue, with configured categories added or replaced"""
+    return SourceScanner({**DEFAULT_PATTERNS, **(extra_patterns or {})})
+
+
+source_scanner = build_scanner(settings.SOURCE_SCAN_PATTERNS)
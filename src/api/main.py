@@ -12,8 +12,21 @@ from ..config.settings import settings
 from ..analyzers.heuristic_engine import HeuristicEngine
 from ..analyzers.ml_detector import MLScamDetector
 from ..analyzers.smart_money_tracker import SmartMoneyTracker
-from ..data.collectors import DataCollector
+from ..analyzers.source_parser import shutdown_parser_pool
+from ..data.collectors import DataCollector, collection_flight
+from ..data.contract_code import contract_code
+from ..data.deployment_finder import deployment_finder
+from ..data.holder_scanner import holder_scanner
+from ..data.onchain_reader import onchain_reader
+from ..data.web3_registry import web3_registry
+from ..data.security_analyzer import goplus_batcher
+from ..data.transfer_indexer import transfer_indexer
 from ..utils.database import init_db, get_db
+from ..utils.http_client import http_clients
+from ..utils.redis_client import close_redis
+from ..utils.rate_limiter import rate_limiter
+from ..utils.circuit_breaker import breakers
+from ..utils.cache import token_cache
 from ..models import database, schemas
 from ..models.schemas import (
     TokenAnalysisRequest, TokenAnalysisResponse, Risk,
@@ -73,6 +86,14 @@ async def startup_event():
     await init_db()
     print("Database initialized")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared HTTP connection pool and Redis client"""
+    await token_cache.close()
+    shutdown_parser_pool()
+    await http_clients.close()
+    await close_redis()
+
 @app.post("/api/v1/analysis", response_model=AnalysisTaskInfo, status_code=202)
 async def start_analysis(
     request: TokenAnalysisRequest,
@@ -206,13 +227,17 @@ async def analyze_token(request: TokenAnalysisRequest):
         async with DataCollector() as collector:
             token_data = await collector.collect_all_data(
                 request.token_address,
-                request.chain_id
+                request.chain_id,
+                time_budget=settings.FAST_PATH_TIME_BUDGET,
+                max_staleness=settings.ANALYZE_MAX_STALENESS
             )
         # Run all analyses in parallel
         heuristic_task = heuristic_engine.analyze(token_data)
         ml_task = ml_detector.predict_scam_probability(token_data)
+        # The flow scan only gets what is left of the fast-path budget
         smart_money_task = smart_money_tracker.analyze_smart_money_flow(
-            request.token_address, request.chain_id, token_data
+            request.token_address, request.chain_id, token_data,
+            time_budget=max(0.0, settings.FAST_PATH_TIME_BUDGET - (time.time() - start_time))
         )
         heuristic_result, ml_result, smart_money_result = await asyncio.gather(
             heuristic_task, ml_task, smart_money_task
@@ -280,17 +305,43 @@ async def check_data_sources():
             "chains": [56] if settings.BSCSCAN_API_KEY else []
         },
         "geckoterminal": {
-            "configured": True,  # No API key needed
-            "chains": [1, 56, 137, 8453, 42161]
+            "configured": settings.GECKOTERMINAL_ENABLED,  # No API key needed
+            "chains": [1, 56, 137, 8453, 42161] if settings.GECKOTERMINAL_ENABLED else []
         },
         "web3_rpc": {
             "ethereum": bool(settings.ETH_RPC),
             "bsc": bool(settings.BSC_RPC),
-            "polygon": bool(settings.POLYGON_RPC)
-        }
+            "polygon": bool(settings.POLYGON_RPC),
+            "endpoints": {
+                chain_id: len(web3_registry.rpc_urls(chain_id)) for chain_id in (1, 56, 137)
+            }
+        },
+        "circuit_breakers": breakers.snapshot()
     }
     return status
 
+@app.get("/status/metrics")
+async def get_metrics():
+    """Internal performance counters for the data collection layer"""
+    return {
+        "http": http_clients.stats(),
+        "cache": token_cache.stats(),
+        "rpc_pools": web3_registry.stats(),
+        "single_flight": collection_flight.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "goplus_batching": goplus_batcher.stats(),
+        "contract_code": contract_code.stats(),
+        "onchain_reads": onchain_reader.stats(),
+        "deployment_search": deployment_finder.stats(),
+        "holder_scans": holder_scanner.stats(),
+        "transfer_index": transfer_indexer.stats()
+    }
+
+@app.get("/status/code-clones")
+async def get_code_clones(chain_id: int = 1, limit: int = 20):
+    """Runtime code hashes shared by the most token addresses"""
+    return {"chain_id": chain_id, "clones": await contract_code.top_clones(chain_id, limit)}
+
 @app.get("/smart-money/wallets")
 async def get_smart_wallets(limit: int = 100):
     """Get list of tracked smart money wallets"""
@@ -1,5 +1,5 @@
-import aiohttp
 from ..config.settings import settings
+from ..utils.http_client import get_session
 
 class BasicDataCollector:
     async def get_token_info(self, token_address: str, chain_id: int):
@@ -13,6 +13,6 @@ class BasicDataCollector:
             "apikey": settings.ETHERSCAN_API_KEY
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                return await response.json()
+        session = await get_session()
+        async with session.get(url, params=params) as response:
+            return await response.json()
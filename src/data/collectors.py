@@ -1,94 +1,331 @@
 import asyncio
-import aiohttp
+import time
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from web3 import Web3
 import json
 
+from ..analyzers.source_parser import summarize_source_async
 from ..config.settings import settings
-from ..utils.cache import cache
+from ..utils.cache import token_cache
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamError, breakers
+from ..utils.http_client import get_session
+from ..utils.rate_limiter import RateLimitExceeded, rate_limiter
+from ..utils.single_flight import DistributedSingleFlight, SingleFlight
+from .contract_code import contract_code
+from .deployment_finder import deployment_finder
 from .dex_integrations import MultiDEXAggregator
+from .holder_scanner import holder_scanner
+from .onchain_reader import onchain_reader
 from .security_analyzer import SecurityAnalyzer
+from .transfer_indexer import transfer_indexer
+from .web3_registry import web3_registry
+
+# Concurrent collections of the same token (API requests and Celery workers)
+# share a single upstream fan-out.
+collection_flight = DistributedSingleFlight('moneygrow:collect', settings)
+
+# Background refreshes of stale cache entries; at most one per key in-process,
+# and token_cache.claim_refresh() keeps it to one across processes.
+refresh_flight = SingleFlight()
+
+# Fields each collector is responsible for; used to mark what is missing when
+# a collector does not finish within the caller's time budget.
+COLLECTOR_FIELDS = {
+    'dex': ['liquidity_usd', 'volume_24h', 'price_usd', 'price_change_24h_percent', 'market_cap', 'pool_count'],
+    'etherscan': ['contract_verified', 'contract_name', 'compiler_version', 'optimization_used',
+                  'has_mint_function', 'has_pause_function', 'ownership_renounced', 'has_blacklist',
+                  'has_fee_setter', 'has_max_tx_limit', 'has_trading_toggle', 'has_cooldown',
+                  'has_selfdestruct', 'total_supply_etherscan'],
+    'holders': ['holder_count', 'top_holder_percent', 'top10_holders_percent', 'holder_addresses',
+                'holder_hhi', 'holder_gini'],
+    'contract': ['contract_created_at', 'bytecode_capabilities'],
+    # Head and owner()/totalSupply() change with any block; kept out of the
+    # long-lived contract part and merged after etherscan so owner() wins
+    'chain_state': ['latest_block', 'onchain_owner', 'onchain_total_supply'],
+    'security': ['is_honeypot', 'buy_tax', 'sell_tax', 'cannot_sell_all', 'is_open_source',
+                 'owner_address', 'is_mintable'],
+}
+
+# Strong references to collections still running after a partial result was returned
+_background_collections = set()
+
+
+async def drain_background_collections(timeout: float):
+    """Wait up to timeout seconds for background collections to cache their output"""
+    deadline = time.monotonic() + timeout
+    # Finishing collections may schedule refreshes of their own
+    while _background_collections and (remaining := deadline - time.monotonic()) > 0:
+        await asyncio.wait(list(_background_collections), timeout=remaining)
+
+COLLECTORS = list(COLLECTOR_FIELDS)
+
+# Collector failures that mean "no answer" rather than "no data": the source is
+# down or throttling us, so the collector is reported missing instead of merged
+# as defaults.
+UNANSWERED_ERRORS = (CircuitOpenError, UpstreamError, RateLimitExceeded)
+
+# Chains with an Etherscan-family explorer API
+EXPLORER_CHAINS = {1, 56}
 
 class DataCollector:
     """Collect comprehensive token data from multiple sources"""
     def __init__(self):
         self.settings = settings
         self.session = None
-        self.web3_connections = self._init_web3_connections()
         self.dex_aggregator = MultiDEXAggregator(self.settings)
-        if self.session:
-            self.security_analyzer = SecurityAnalyzer(self.settings.GOPLUS_API_KEY, self.session)
-        else:
-            self.security_analyzer = None
-    
-    def _init_web3_connections(self) -> Dict:
-        return {
-            1: Web3(Web3.HTTPProvider(self.settings.ETH_RPC)),
-            56: Web3(Web3.HTTPProvider(self.settings.BSC_RPC)),
-            137: Web3(Web3.HTTPProvider(self.settings.POLYGON_RPC)),
-        }
+        self.security_analyzer = SecurityAnalyzer(self.settings.GOPLUS_API_KEY)
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
-        self.security_analyzer = SecurityAnalyzer(self.settings.GOPLUS_API_KEY, self.session)
+        # The session is shared process-wide; leaving the context must not close it.
+        self.session = await get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        self.session = None
     
-    async def collect_all_data(self, token_address: str, chain_id: int) -> Dict:
-        """Collect all available data for a token"""
-        cache_key = f"{chain_id}:{token_address}"
-        cached_data = cache.get(cache_key)
-        if cached_data:
+    async def collect_all_data(self, token_address: str, chain_id: int, time_budget: Optional[float] = None,
+                               max_staleness: float = 0.0) -> Dict:
+        """Collect all available data for a token
+
+        Each collector's output is cached separately with its own TTL
+        (COLLECTOR_CACHE_TTLS), so only the stale pieces are fetched again.
+
+        With a time_budget (seconds), returns whatever collectors finished in
+        time. Missing collectors are listed in 'missing_sources' and their
+        fields in 'missing_fields'; they keep running in the background and
+        cache their output once they finish.
+
+        Cached pieces up to max_staleness seconds past their TTL are used as-is
+        while a single background refresh replaces them.
+        """
+        cache_key = f"{chain_id}:{token_address.lower()}"
+        negative_reason = await token_cache.get(f"{cache_key}:negative")
+        if negative_reason:
+            return self._calculate_additional_metrics({
+                'address': token_address,
+                'chain_id': chain_id,
+                'timestamp': datetime.now(),
+                'negative_reason': negative_reason,
+            })
+        cached_parts = await self._get_cached_parts(token_address, chain_id, cache_key, max_staleness)
+        if len(cached_parts) == len(COLLECTORS):
             print(f"Returning cached data for {token_address}")
-            return cached_data
+            return self._merge_results(token_address, chain_id, cached_parts, {})
+        # The shared flight always runs to completion; each caller applies its
+        # own budget, whether it leads the flight or joined someone else's.
+        flight = asyncio.ensure_future(collection_flight.do(
+            cache_key, lambda: self._collect_all_data(token_address, chain_id, cache_key, cached_parts)
+        ))
+        await asyncio.wait([flight], timeout=time_budget)
+        if flight.done():
+            return flight.result()
+        _background_collections.add(flight)
+        flight.add_done_callback(_background_collections.discard)
+        # Collectors that finished so far have cached their output
+        parts = dict(cached_parts)
+        for name in COLLECTORS:
+            if name not in parts:
+                part = await token_cache.get(f"{cache_key}:{name}")
+                if part is not None:
+                    parts[name] = part
+        return self._merge_results(token_address, chain_id, parts, {})
+
+    async def _get_cached_parts(self, token_address: str, chain_id: int, cache_key: str,
+                                max_staleness: float) -> Dict[str, Dict]:
+        lookups = await asyncio.gather(*(
+            token_cache.lookup(f"{cache_key}:{name}", max_staleness) for name in COLLECTORS
+        ))
+        parts = {}
+        for name, (part, should_refresh) in zip(COLLECTORS, lookups):
+            if part is None:
+                continue
+            parts[name] = part
+            if should_refresh:
+                self._schedule_refresh(name, token_address, chain_id, cache_key)
+        return parts
+
+    def _schedule_refresh(self, name: str, token_address: str, chain_id: int, cache_key: str):
+        part_key = f"{cache_key}:{name}"
+        refresh = asyncio.ensure_future(
+            refresh_flight.do(part_key, lambda: self._refresh_part(name, token_address, chain_id, cache_key))
+        )
+        _background_collections.add(refresh)
+        refresh.add_done_callback(_background_collections.discard)
+
+    async def _refresh_part(self, name: str, token_address: str, chain_id: int, cache_key: str):
+        if not await token_cache.claim_refresh(f"{cache_key}:{name}"):
+            return
+        try:
+            await self._collect_part(name, token_address, chain_id, cache_key)
+        except Exception as e:
+            print(f"Background refresh of {name} failed: {e}")
+
+    def _collectors(self) -> Dict:
+        return {
+            'dex': self.collect_dex_data,
+            'etherscan': self.collect_etherscan_data,
+            'holders': self.collect_holder_data,
+            'contract': self.collect_contract_data,
+            'chain_state': self.collect_chain_state,
+            'security': self.collect_security_data,
+        }
+
+    async def _collect_all_data(self, token_address: str, chain_id: int, cache_key: str,
+                                cached_parts: Dict[str, Dict]) -> Dict:
         if not self.session:
-            self.session = aiohttp.ClientSession()
-        tasks = [
-            self.collect_dex_data(token_address, chain_id),
-            self.collect_etherscan_data(token_address, chain_id),
-            self.collect_holder_data(token_address, chain_id),
-            self.collect_contract_data(token_address, chain_id),
-            self.collect_security_data(token_address, chain_id),
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+            self.session = await get_session()
+        tasks = {
+            name: asyncio.ensure_future(self._collect_part(name, token_address, chain_id, cache_key))
+            for name in COLLECTORS
+            if name not in cached_parts
+        }
+        if tasks:
+            await asyncio.wait(tasks.values())
+        return self._merge_results(token_address, chain_id, cached_parts, tasks)
+
+    async def _collect_part(self, name: str, token_address: str, chain_id: int, cache_key: str) -> Dict:
+        """Run one collector and cache its output under that collector's TTL"""
+        if not self.session:
+            self.session = await get_session()
+        started = time.monotonic()
+        data = await self._collectors()[name](token_address, chain_id)
+        negative_reason = self._negative_reason(name, chain_id, data)
+        if negative_reason:
+            ttl = self.settings.NEGATIVE_CACHE_TTLS[negative_reason]
+            await token_cache.set(f"{cache_key}:{name}", data, ttl=ttl, negative=negative_reason)
+            if negative_reason == 'not_contract':
+                # Nothing else is worth collecting; short-circuit the whole token
+                await token_cache.set(f"{cache_key}:negative", negative_reason, ttl=ttl, negative=negative_reason)
+        elif self._is_cacheable(name, data):
+            ttl = self.settings.COLLECTOR_CACHE_TTLS.get(name, self.settings.CACHE_DEFAULT_TTL)
+            await token_cache.set(f"{cache_key}:{name}", data, ttl=ttl, delta=time.monotonic() - started)
+        return data
+
+    def _negative_reason(self, name: str, chain_id: int, data: Dict) -> Optional[str]:
+        """Why a collector's output records the absence of data, if it does"""
+        if name == 'dex':
+            if not data.get('sources') and not any(
+                data.get(key) for key in ('timed_out_sources', 'unavailable_sources', 'failed_sources')
+            ):
+                return 'no_pairs'
+        elif name in ('etherscan', 'holders'):
+            # Holder data can still come from the local Transfer index wherever there is an RPC
+            if chain_id not in EXPLORER_CHAINS and (name == 'etherscan' or web3_registry.get_pool(chain_id) is None):
+                return 'unsupported_chain'
+            if name == 'etherscan' and 'contract_name' in data and not data.get('contract_verified'):
+                return 'no_source'
+        elif name in ('contract', 'chain_state'):
+            if web3_registry.get_pool(chain_id) is None:
+                return 'unsupported_chain'
+            if data.get('is_contract') is False:
+                return 'not_contract'
+        elif name == 'security':
+            if chain_id not in self.security_analyzer.chain_map:
+                return 'unsupported_chain'
+            if data.get('goplus_no_result'):
+                return 'goplus_empty'
+        return None
+
+    def _is_cacheable(self, name: str, data: Dict) -> bool:
+        """Only cache complete, successful collector output; defaults from a failed call are not"""
+        if not data:
+            return False
+        if name == 'dex':
+            return bool(data.get('sources')) and not any(
+                data.get(key) for key in ('timed_out_sources', 'unavailable_sources', 'failed_sources')
+            )
+        if name == 'etherscan':
+            return 'contract_name' in data
+        if name == 'holders':
+            return data.get('holder_count', 0) > 0
+        if name == 'contract':
+            # The 30-day creation date guess must not outlive the next deployment search
+            return 'is_contract' in data and not data.get('contract_age_estimate')
+        if name == 'chain_state':
+            return 'latest_block' in data
+        if name == 'security':
+            return bool(data.get('goplus_security_data'))
+        return True
+
+    def _merge_results(self, token_address: str, chain_id: int, cached_parts: Dict[str, Dict], tasks: Dict) -> Dict:
         token_data = {
             'address': token_address,
             'chain_id': chain_id,
             'timestamp': datetime.now()
         }
-        for result in results:
-            if isinstance(result, dict):
-                token_data.update(result)
-            else:
-                print(f"Error collecting data: {result}")
-        token_data = self._calculate_additional_metrics(token_data)
-        cache.set(cache_key, token_data, ttl=60)
-        return token_data
+        missing_sources = []
+        unavailable_sources = {}
+        # Merge in collector order so overlapping fields resolve as before
+        for name in COLLECTORS:
+            if name in cached_parts:
+                token_data.update(cached_parts[name])
+                continue
+            task = tasks.get(name)
+            if task is None or not task.done():
+                missing_sources.append(name)
+            elif isinstance(task.exception(), CircuitOpenError):
+                # Source is known to be down; report it rather than defaulting
+                missing_sources.append(name)
+                unavailable_sources[name] = task.exception().name
+            elif isinstance(task.exception(), UNANSWERED_ERRORS):
+                print(f"No answer from {name}: {task.exception()}")
+                missing_sources.append(name)
+            elif task.exception() is not None:
+                print(f"Error collecting data: {task.exception()}")
+            elif isinstance(task.result(), dict):
+                token_data.update(task.result())
+        if missing_sources:
+            token_data['partial'] = True
+            token_data['missing_sources'] = missing_sources
+            if unavailable_sources:
+                token_data['unavailable_sources'] = unavailable_sources
+            token_data['missing_fields'] = [
+                field for name in missing_sources for field in COLLECTOR_FIELDS[name]
+                if field not in token_data
+            ]
+        return self._calculate_additional_metrics(token_data)
     
     async def collect_dex_data(self, token_address: str, chain_id: int) -> Dict:
         """Collects DEX data using the MultiDEXAggregator."""
         try:
             dex_data = await self.dex_aggregator.get_aggregated_data(token_address, chain_id)
-            if not dex_data:
-                return self._get_default_dex_data()
+            if not dex_data.get('sources') and dex_data.get('unavailable_sources'):
+                raise CircuitOpenError(','.join(dex_data['unavailable_sources']))
+            if not dex_data.get('sources'):
+                # Keep the record of sources that missed their deadline
+                return {**self._get_default_dex_data(), **dex_data}
             
             # The aggregator now returns a more comprehensive dictionary.
-            # We can add any additional processing here if needed, but for now,
-            # we will return the aggregated data directly.
+            # The main pair's reserves are read on-chain on top of it.
+            if dex_data.get('pair_address'):
+                dex_data.update(await self._read_pair_reserves(token_address, chain_id, dex_data['pair_address']))
             return dex_data
+        except CircuitOpenError:
+            raise
         except Exception as e:
             print(f"DEX data collection error: {e}")
-            return self._get_default_dex_data()
+            return {**self._get_default_dex_data(), 'failed_sources': ['aggregator']}
+    
+    async def collect_dex_data_many(self, token_addresses: List[str], chain_id: int) -> Dict[str, Dict]:
+        """Collects DEX data for many tokens on one chain with batched requests."""
+        try:
+            dex_data = await self.dex_aggregator.get_aggregated_data_many(token_addresses, chain_id)
+        except Exception as e:
+            print(f"DEX data collection error: {e}")
+            dex_data = {address: {'failed_sources': ['aggregator']} for address in token_addresses}
+        collected = {}
+        for address in token_addresses:
+            data = dex_data.get(address) or {}
+            collected[address] = data if data.get('sources') else {**self._get_default_dex_data(), **data}
+        return collected
     
     async def collect_etherscan_data(self, token_address: str, chain_id: int) -> Dict:
         if chain_id == 1:
+            source = 'etherscan'
             api_key = self.settings.ETHERSCAN_API_KEY
             base_url = "https://api.etherscan.io/api"
         elif chain_id == 56:
+            source = 'bscscan'
             api_key = self.settings.BSCSCAN_API_KEY
             base_url = "https://api.bscscan.com/api"
         else:
@@ -102,100 +339,194 @@ class DataCollector:
                 "contractaddress": token_address,
                 "apikey": api_key
             }
-            async with self.session.get(base_url, params=supply_params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('status') == '1':
-                        total_supply = float(data.get('result', 0))
-                    else:
-                        total_supply = 0
+            total_supply = 0
+            data = await self._explorer_get(source, chain_id, base_url, api_key, supply_params)
+            if data and data.get('status') == '1':
+                total_supply = float(data.get('result', 0))
+
+            # Clones share runtime bytecode; reuse the source analysis of any
+            # address already seen with the same code.
+            code_hash = await self._get_code_hash(token_address, chain_id)
+            if code_hash:
+                source_analysis = await contract_code.get_analysis(chain_id, code_hash, 'source')
+                if source_analysis:
+                    return {**source_analysis, 'total_supply_etherscan': total_supply}
             contract_params = {
                 "module": "contract",
                 "action": "getsourcecode",
                 "address": token_address,
                 "apikey": api_key
             }
-            async with self.session.get(base_url, params=contract_params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('status') == '1' and data.get('result'):
-                        contract_info = data['result'][0]
-                        source_code = contract_info.get('SourceCode', '')
-                        return {
-                            'contract_verified': len(source_code) > 0,
-                            'contract_name': contract_info.get('ContractName', ''),
-                            'compiler_version': contract_info.get('CompilerVersion', ''),
-                            'optimization_used': contract_info.get('OptimizationUsed', '0') == '1',
-                            'is_proxy': 'proxy' in source_code.lower() if source_code else False,
-                            'has_mint_function': 'mint' in source_code.lower() if source_code else False,
-                            'has_pause_function': 'pause' in source_code.lower() if source_code else False,
-                            'ownership_renounced': self._check_ownership_renounced(source_code),
-                            'total_supply_etherscan': total_supply
-                        }
+            data = await self._explorer_get(source, chain_id, base_url, api_key, contract_params)
+            if data and data.get('status') == '1' and data.get('result'):
+                contract_info = data['result'][0]
+                source_code = contract_info.get('SourceCode', '')
+                parsed = await self._summarize_source(token_address, chain_id, contract_info) if source_code else {}
+                matches = parsed.get('matches', {})
+                capabilities = parsed.get('capabilities', [])
+                source_analysis = {
+                    'contract_verified': len(source_code) > 0,
+                    'contract_name': contract_info.get('ContractName', ''),
+                    'compiler_version': contract_info.get('CompilerVersion', ''),
+                    'optimization_used': contract_info.get('OptimizationUsed', '0') == '1',
+                    'is_proxy': 'proxy' in matches,
+                    'has_mint_function': 'mint' in capabilities,
+                    'has_pause_function': 'pause' in capabilities,
+                    'ownership_renounced': 'ownership_renounced' in matches,
+                    'has_blacklist': 'blacklist' in capabilities,
+                    'has_fee_setter': 'fee_setter' in capabilities,
+                    'has_max_tx_limit': 'max_tx' in capabilities,
+                    'has_trading_toggle': 'trading_toggle' in capabilities,
+                    'has_cooldown': 'cooldown' in capabilities,
+                    'has_selfdestruct': 'selfdestruct' in matches,
+                    'source_summary': parsed.get('summary'),
+                    # Offsets into the comment-free main contract lineage, to explain flags
+                    'source_pattern_matches': matches,
+                }
+                # Unverified code may be verified later, so only cache verified analyses
+                if code_hash and source_analysis['contract_verified']:
+                    await contract_code.set_analysis(chain_id, code_hash, 'source', source_analysis)
+                return {**source_analysis, 'total_supply_etherscan': total_supply}
             return {'contract_verified': False}
+        except UNANSWERED_ERRORS:
+            raise
         except Exception as e:
             print(f"Etherscan error: {e}")
             return {'contract_verified': False}
     
     async def collect_holder_data(self, token_address: str, chain_id: int) -> Dict:
         if chain_id == 1:
+            source = 'etherscan'
             api_key = self.settings.ETHERSCAN_API_KEY
             base_url = "https://api.etherscan.io/api"
         elif chain_id == 56:
+            source = 'bscscan'
             api_key = self.settings.BSCSCAN_API_KEY
             base_url = "https://api.bscscan.com/api"
         else:
-            return self._get_default_holder_data()
+            return await self._indexed_holder_data(token_address, chain_id)
         if not api_key:
-            return self._get_default_holder_data()
-        try:
+            return await self._indexed_holder_data(token_address, chain_id)
+        async def fetch_page(page: int) -> Optional[List[Dict]]:
             params = {
                 "module": "token",
                 "action": "tokenholderlist",
                 "contractaddress": token_address,
-                "page": "1",
-                "offset": "100",
+                "page": str(page),
+                "offset": str(self.settings.HOLDER_SCAN_PAGE_SIZE),
                 "apikey": api_key
             }
-            async with self.session.get(base_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('status') == '1' and data.get('result'):
-                        holders = data['result']
-                        total_holders = len(holders)
-                        if total_holders > 0:
-                            total_supply = sum(float(h.get('TokenHolderQuantity', 0)) for h in holders)
-                            holders.sort(key=lambda x: float(x.get('TokenHolderQuantity', 0)), reverse=True)
-                            top_holder_balance = float(holders[0].get('TokenHolderQuantity', 0))
-                            top10_balance = sum(float(h.get('TokenHolderQuantity', 0)) for h in holders[:10])
-                            return {
-                                'holder_count': total_holders,
-                                'top_holder_percent': (top_holder_balance / total_supply * 100) if total_supply > 0 else 0,
-                                'top10_holders_percent': (top10_balance / total_supply * 100) if total_supply > 0 else 0,
-                                'holder_addresses': [h.get('TokenHolderAddress') for h in holders[:20]]
-                            }
-            return self._get_default_holder_data()
+            data = await self._explorer_get(source, chain_id, base_url, api_key, params)
+            # Past the last page the result is empty ("No data found"); errors come back as a string
+            if data and 'no data found' in str(data.get('message', '')).lower():
+                return []
+            result = data.get('result') if data else None
+            return result if isinstance(result, list) else None
+
+        try:
+            holder_data = await holder_scanner.scan(chain_id, token_address, fetch_page)
+            return holder_data or await self._indexed_holder_data(token_address, chain_id)
+        except CircuitOpenError:
+            raise
+        except (UpstreamError, RateLimitExceeded) as e:
+            # Throttled: the local index may still answer, otherwise holders are missing
+            print(f"Holder data unavailable: {e}")
+            indexed = await self._indexed_holder_data(token_address, chain_id)
+            if indexed.get('holder_count'):
+                return indexed
+            raise
         except Exception as e:
             print(f"Holder data error: {e}")
+            return await self._indexed_holder_data(token_address, chain_id)
+    
+    async def _indexed_holder_data(self, token_address: str, chain_id: int) -> Dict:
+        """Holder metrics from the local Transfer index when the explorer cannot provide them"""
+        try:
+            return await transfer_indexer.get_holder_data(chain_id, token_address) or self._get_default_holder_data()
+        except Exception as e:
+            print(f"Transfer index read error: {e}")
             return self._get_default_holder_data()
     
     async def collect_contract_data(self, token_address: str, chain_id: int) -> Dict:
         try:
-            web3 = self.web3_connections.get(chain_id)
+            web3 = web3_registry.get(chain_id)
             if not web3:
                 return {}
-            latest_block = web3.eth.block_number
-            blocks_per_day = 6500 if chain_id == 1 else 28800
-            contract_age_days = 30
-            return {
-                'contract_created_at': datetime.now() - timedelta(days=contract_age_days),
-                'latest_block': latest_block,
+            async with breakers.get('rpc', chain_id):
+                latest_block = await web3.eth.block_number
+            code_info = await contract_code.lookup(chain_id, token_address)
+            if code_info and not code_info['code_hash']:
+                return {'is_contract': False}
+            contract_data = {
+                'contract_created_at': datetime.now() - timedelta(days=30),
+                'is_contract': True,
+                'code_hash': code_info['code_hash'] if code_info else None,
+                'code_clone_count': code_info['clone_count'] if code_info else None,
                 'contract_age_estimate': True
             }
+            try:
+                deployment = await deployment_finder.get_deployment(chain_id, token_address, latest_block)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                print(f"Deployment search error: {e}")
+                deployment = None
+            if deployment:
+                contract_data.update({
+                    'contract_created_at': datetime.fromtimestamp(deployment['block_timestamp']),
+                    'deployment_block': deployment['block_number'],
+                    'contract_age_estimate': False,
+                })
+            if code_info:
+                bytecode_analysis = await contract_code.get_bytecode_analysis(
+                    chain_id, token_address, code_info['code_hash']
+                )
+                contract_data.update(bytecode_analysis or {})
+            return contract_data
+        except CircuitOpenError:
+            raise
         except Exception as e:
             print(f"Web3 error: {e}")
             return {'contract_created_at': datetime.now() - timedelta(days=30)}
+
+    async def collect_chain_state(self, token_address: str, chain_id: int) -> Dict:
+        """Chain head plus owner(), totalSupply() and decimals() read on-chain"""
+        try:
+            web3 = web3_registry.get(chain_id)
+            if not web3:
+                return {}
+            async with breakers.get('rpc', chain_id):
+                chain_state = {'latest_block': await web3.eth.block_number}
+            try:
+                # On-chain owner() is authoritative over the source-based renounce guess
+                chain_state.update(await onchain_reader.read_token_basics(chain_id, token_address))
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                print(f"On-chain read error: {e}")
+            return chain_state
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            print(f"Web3 error: {e}")
+            return {}
     
+    async def _read_pair_reserves(self, token_address: str, chain_id: int, pair_address: str) -> Dict:
+        """Main pair's reserves on-chain; the DEX APIs' liquidity figures can lag a pull"""
+        try:
+            reserves = await onchain_reader.read_pair_reserves(chain_id, pair_address)
+        except Exception as e:
+            print(f"Pair reserve read error: {e}")
+            return {}
+        # Not a V2-style pair, or the chain has no RPC
+        if not reserves:
+            return {}
+        if reserves['token0'].lower() == token_address.lower():
+            return {'pair_token_reserve': reserves['reserve0'], 'pair_quote_reserve': reserves['reserve1']}
+        if reserves['token1'].lower() == token_address.lower():
+            return {'pair_token_reserve': reserves['reserve1'], 'pair_quote_reserve': reserves['reserve0']}
+        return {}
+
     async def collect_security_data(self, token_address: str, chain_id: int) -> Dict:
         """Collects security data using the SecurityAnalyzer."""
         if not self.security_analyzer:
@@ -203,10 +534,39 @@ class DataCollector:
         try:
             security_data = await self.security_analyzer.get_token_security(token_address, chain_id)
             return security_data
+        except UNANSWERED_ERRORS:
+            raise
         except Exception as e:
             print(f"Security data collection error: {e}")
             return {}
 
+    async def _summarize_source(self, token_address: str, chain_id: int, contract_info: Dict) -> Dict:
+        """Parsed structure of verified source, cached by address and compiler version"""
+        key = f"source:{chain_id}:{token_address.lower()}:{contract_info.get('CompilerVersion', '')}"
+        parsed = await token_cache.get(key)
+        if parsed is None:
+            parsed = await summarize_source_async(contract_info['SourceCode'], contract_info.get('ContractName'))
+            await token_cache.set(key, parsed, ttl=self.settings.CODE_ANALYSIS_CACHE_TTL)
+        return parsed
+
+    async def _get_code_hash(self, token_address: str, chain_id: int) -> Optional[str]:
+        """Runtime code hash of the token, or None if it cannot be determined"""
+        try:
+            code_info = await contract_code.lookup(chain_id, token_address)
+        except Exception as e:
+            print(f"Code lookup error: {e}")
+            return None
+        return code_info['code_hash'] if code_info else None
+
+    async def _explorer_get(self, source: str, chain_id: int, base_url: str, api_key: str, params: Dict) -> Optional[Dict]:
+        """Rate-limited Etherscan-family request guarded by the source's circuit breaker"""
+        async with breakers.get(source, chain_id):
+            status, data = await rate_limiter.get_json(self.session, base_url, source, api_key, params=params)
+            # Throttling that outlasted the retries already raised in get_json
+            if status >= 500 or data is None:
+                raise UpstreamError(f"{source} returned HTTP {status}")
+        return data if status == 200 else None
+
     def _calculate_additional_metrics(self, token_data: Dict) -> Dict:
         volume = token_data.get('volume_24h', 0)
         liquidity = token_data.get('liquidity_usd', 1)
@@ -214,10 +574,13 @@ class DataCollector:
         market_cap = token_data.get('market_cap', 1)
         token_data['liquidity_market_cap_ratio'] = liquidity / market_cap if market_cap > 0 else 0
         
-        # These are now fetched from GoPlus, but we can add fallbacks
-        token_data.setdefault('can_sell', not token_data.get('cannot_sell_all', True))
-        token_data.setdefault('sell_tax', token_data.get('sell_tax', 100.0))
-        token_data.setdefault('buy_tax', token_data.get('buy_tax', 100.0))
+        # These are now fetched from GoPlus, but we can add fallbacks.
+        # When GoPlus did not answer in time, leave them missing instead of
+        # defaulting the token to unsellable.
+        if 'security' not in token_data.get('missing_sources', []):
+            token_data.setdefault('can_sell', not token_data.get('cannot_sell_all', True))
+            token_data.setdefault('sell_tax', token_data.get('sell_tax', 100.0))
+            token_data.setdefault('buy_tax', token_data.get('buy_tax', 100.0))
 
         # Mocked data that still needs real implementation
         token_data['buys_24h'] = 100
@@ -226,16 +589,6 @@ class DataCollector:
         token_data['unique_sellers_24h'] = 40
         return token_data
     
-    def _check_ownership_renounced(self, source_code: str) -> bool:
-        if not source_code:
-            return False
-        renounce_indicators = [
-            'renounceOwnership',
-            'owner = address(0)',
-            'owner = 0x0000000000000000000000000000000000000000'
-        ]
-        return any(indicator in source_code for indicator in renounce_indicators)
-    
     def _get_default_dex_data(self) -> Dict:
         return {
             'liquidity_usd': 0,
@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional
+
+from web3 import Web3
+
+from ..analyzers.bytecode_analyzer import bytecode_analyzer
+from ..config.settings import settings
+from ..utils.cache import token_cache
+from ..utils.circuit_breaker import breakers
+from ..utils.redis_client import get_redis
+from ..utils.single_flight import SingleFlight
+from .web3_registry import web3_registry
+
+
+class ContractCodeIndex:
+    """Runtime bytecode lookups keyed by the keccak hash of the code.
+
+    Mass-deployed clones share their runtime bytecode, so anything derived
+    purely from the code is cached once per code hash and reused for every
+    clone. The addresses seen for each hash are tracked in Redis; a hash with
+    many addresses is a strong sign of a token factory.
+    """
+    def __init__(self, settings, prefix: str = "moneygrow:code"):
+        self.settings = settings
+        self.prefix = prefix
+        self._flight = SingleFlight()
+        self.code_fetches = 0
+        self.analysis_hits = 0
+        self.analysis_misses = 0
+
+    async def get_code(self, chain_id: int, token_address: str) -> Optional[bytes]:
+        """Runtime bytecode of an address (b'' for an EOA); None if the chain has no RPC"""
+        web3 = web3_registry.get(chain_id)
+        if not web3:
+            return None
+        self.code_fetches += 1
+        async with breakers.get('rpc', chain_id):
+            return bytes(await web3.eth.get_code(Web3.to_checksum_address(token_address)))
+
+    async def lookup(self, chain_id: int, token_address: str) -> Optional[Dict]:
+        """Code hash, size and clone count for an address.
+
+        code_hash is None when the address has no code. Returns None if the
+        chain has no RPC configured.
+        """
+        key = f"code:{chain_id}:{token_address.lower()}"
+        info = await token_cache.get(key)
+        if info is not None:
+            return info
+        return await self._flight.do(key, lambda: self._lookup(chain_id, token_address, key))
+
+    async def _lookup(self, chain_id: int, token_address: str, key: str) -> Optional[Dict]:
+        code = await self.get_code(chain_id, token_address)
+        if code is None:
+            return None
+        if not code:
+            info = {'code_hash': None, 'code_size': 0, 'clone_count': 0}
+        else:
+            code_hash = Web3.keccak(code).hex()
+            info = {
+                'code_hash': code_hash,
+                'code_size': len(code),
+                'clone_count': await self.record_address(chain_id, code_hash, token_address),
+            }
+            # We already hold the code; analyze it now so no second fetch is needed
+            if await self.get_analysis(chain_id, code_hash, 'bytecode') is None:
+                await self.set_analysis(chain_id, code_hash, 'bytecode', bytecode_analyzer.analyze(code))
+        await token_cache.set(key, info, ttl=self.settings.CODE_HASH_CACHE_TTL)
+        return info
+
+    async def get_bytecode_analysis(self, chain_id: int, token_address: str, code_hash: str) -> Optional[Dict]:
+        """Selector/capability analysis of the runtime code, shared by all clones"""
+        analysis = await self.get_analysis(chain_id, code_hash, 'bytecode')
+        if analysis is None:
+            code = await self.get_code(chain_id, token_address)
+            if not code:
+                return None
+            analysis = bytecode_analyzer.analyze(code)
+            await self.set_analysis(chain_id, code_hash, 'bytecode', analysis)
+        return analysis
+
+    async def record_address(self, chain_id: int, code_hash: str, token_address: str) -> int:
+        """Remember that token_address runs code_hash; returns how many addresses do"""
+        try:
+            redis = get_redis()
+            if await redis.sadd(f"{self.prefix}:{chain_id}:{code_hash}", token_address.lower()):
+                await redis.zincrby(f"{self.prefix}:{chain_id}:clones", 1, code_hash)
+            return await redis.scard(f"{self.prefix}:{chain_id}:{code_hash}")
+        except Exception as e:
+            print(f"Code index Redis error: {e}")
+            return 1
+
+    async def get_analysis(self, chain_id: int, code_hash: str, kind: str) -> Optional[Dict]:
+        analysis = await token_cache.get(f"code:{chain_id}:{code_hash}:{kind}")
+        if analysis is None:
+            self.analysis_misses += 1
+        else:
+            self.analysis_hits += 1
+        return analysis
+
+    async def set_analysis(self, chain_id: int, code_hash: str, kind: str, analysis: Dict):
+        await token_cache.set(
+            f"code:{chain_id}:{code_hash}:{kind}", analysis, ttl=self.settings.CODE_ANALYSIS_CACHE_TTL
+        )
+
+    async def top_clones(self, chain_id: int, limit: int = 20) -> List[Dict]:
+        """Code hashes with the most distinct addresses on a chain"""
+        redis = get_redis()
+        ranked = await redis.zrevrange(f"{self.prefix}:{chain_id}:clones", 0, limit - 1, withscores=True)
+        return [
+            {'code_hash': code_hash.decode() if isinstance(code_hash, bytes) else code_hash,
+             'address_count': int(count)}
+            for code_hash, count in ranked
+        ]
+
+    def stats(self) -> Dict:
+        lookups = self.analysis_hits + self.analysis_misses
+        return {
+            'code_fetches': self.code_fetches,
+            'analysis_hits': self.analysis_hits,
+            'analysis_misses': self.analysis_misses,
+            'analysis_hit_ratio': self.analysis_hits / lookups if lookups else 0.0,
+        }
+
+
+contract_code = ContractCodeIndex(settings)
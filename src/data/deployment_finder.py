@@ -0,0 +1,152 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..config.settings import settings
+from ..models.database import ContractDeployment
+from ..utils.cache import token_cache
+from ..utils.circuit_breaker import breakers
+from ..utils.database import get_db
+from ..utils.single_flight import SingleFlight
+from .rpc_pool import RPCEndpointPool, RPCResponseError
+from .web3_registry import web3_registry
+
+
+def _has_code(result) -> bool:
+    return bool(result) and result not in ('0x', '0x0')
+
+
+class DeploymentFinder:
+    """Deployment block and time of a contract, found from eth_getCode history.
+
+    The deployment block is the first block at which the address has code.
+    Each round probes DEPLOYMENT_SEARCH_FANOUT evenly spaced blocks between
+    the last block known without code and the first known with it, sent as
+    one JSON-RPC batch, so the range shrinks (fanout + 1)-fold per roundtrip.
+    Historical eth_getCode needs an archive node; where the endpoints cannot
+    serve it the lookup gives up and is retried after DEPLOYMENT_RETRY_TTL.
+
+    Deployments never change, so results are stored in Postgres and cached.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self._flight = SingleFlight()
+        self.searches = 0
+        self.probes = 0
+        self.roundtrips = 0
+        self.db_hits = 0
+        self.unavailable = 0
+
+    async def get_deployment(self, chain_id: int, token_address: str, latest_block: int) -> Optional[Dict]:
+        """{'block_number', 'block_timestamp'} or None if it cannot be determined"""
+        key = f"deployment:{chain_id}:{token_address.lower()}"
+        deployment = await token_cache.get(key)
+        if deployment is None:
+            deployment = await self._flight.do(key, lambda: self._resolve(chain_id, token_address, latest_block, key))
+        return deployment if deployment.get('block_number') is not None else None
+
+    async def _resolve(self, chain_id: int, token_address: str, latest_block: int, key: str) -> Dict:
+        deployment = await self._load(chain_id, token_address)
+        if deployment is not None:
+            self.db_hits += 1
+        else:
+            pool = web3_registry.get_pool(chain_id)
+            if pool is None:
+                return {'block_number': None}
+            try:
+                async with breakers.get('rpc', chain_id):
+                    deployment = await self._search(pool, token_address, latest_block)
+            except RPCResponseError as e:
+                # Typically "missing trie node": the endpoints are not archive nodes
+                print(f"Deployment search unavailable on chain {chain_id}: {e}")
+                self.unavailable += 1
+                deployment = None
+            if deployment is None:
+                await token_cache.set(key, {'block_number': None}, ttl=self.settings.DEPLOYMENT_RETRY_TTL)
+                return {'block_number': None}
+            await self._store(chain_id, token_address, deployment)
+        await token_cache.set(key, deployment, ttl=self.settings.DEPLOYMENT_CACHE_TTL)
+        return deployment
+
+    async def _search(self, pool: RPCEndpointPool, token_address: str, latest_block: int) -> Optional[Dict]:
+        self.searches += 1
+        if not _has_code((await self._get_code(pool, token_address, [latest_block]))[0]):
+            return None
+        fanout = max(1, self.settings.DEPLOYMENT_SEARCH_FANOUT)
+        # Invariant: no code at lo (-1 is "before genesis"), code at hi
+        lo, hi = -1, latest_block
+        while hi - lo > 1:
+            step = (hi - lo) / (fanout + 1)
+            blocks = sorted({lo + max(1, int(step * i)) for i in range(1, fanout + 1)} - {hi})
+            results = await self._get_code(pool, token_address, blocks)
+            for block, code in zip(blocks, results):
+                if _has_code(code):
+                    hi = block
+                    break
+                lo = block
+        block = await pool.request('eth_getBlockByNumber', [hex(hi), False])
+        self.roundtrips += 1
+        return {'block_number': hi, 'block_timestamp': int(block['timestamp'], 16)}
+
+    async def _get_code(self, pool: RPCEndpointPool, token_address: str, blocks: List[int]) -> List:
+        """eth_getCode at several blocks in one roundtrip; raises if any probe errors"""
+        self.probes += len(blocks)
+        self.roundtrips += 1
+        if len(blocks) == 1:
+            return [await pool.request('eth_getCode', [token_address, hex(blocks[0])])]
+        try:
+            responses = await pool.batch_request([('eth_getCode', [token_address, hex(b)]) for b in blocks])
+        except RPCResponseError:
+            # Endpoint without batch support
+            return list(await asyncio.gather(*(
+                pool.request('eth_getCode', [token_address, hex(b)]) for b in blocks
+            )))
+        for response in responses:
+            if response.get('error'):
+                raise RPCResponseError(response['error'])
+        return [response.get('result') for response in responses]
+
+    async def _load(self, chain_id: int, token_address: str) -> Optional[Dict]:
+        try:
+            async with get_db() as db:
+                result = await db.execute(
+                    select(ContractDeployment).where(
+                        ContractDeployment.chain_id == chain_id,
+                        ContractDeployment.token_address == token_address.lower(),
+                    )
+                )
+                row = result.scalar_one_or_none()
+        except Exception as e:
+            print(f"Deployment lookup DB error: {e}")
+            return None
+        if row is None:
+            return None
+        return {'block_number': row.block_number, 'block_timestamp': row.block_timestamp}
+
+    async def _store(self, chain_id: int, token_address: str, deployment: Dict):
+        try:
+            async with get_db() as db:
+                await db.execute(
+                    insert(ContractDeployment).values(
+                        chain_id=chain_id,
+                        token_address=token_address.lower(),
+                        block_number=deployment['block_number'],
+                        block_timestamp=deployment['block_timestamp'],
+                    ).on_conflict_do_nothing()
+                )
+        except Exception as e:
+            print(f"Deployment store DB error: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            'searches': self.searches,
+            'probes': self.probes,
+            'roundtrips': self.roundtrips,
+            'db_hits': self.db_hits,
+            'unavailable': self.unavailable,
+        }
+
+
+deployment_finder = DeploymentFinder(settings)
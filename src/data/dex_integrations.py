@@ -1,10 +1,23 @@
-import aiohttp
-from typing import Dict, Optional, List
+import asyncio
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Tuple
 from abc import ABC, abstractmethod
 
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamError, breakers
+from ..utils.http_client import get_session
+
+class SourceStatus(str, Enum):
+    """How one DEX source fared in a fan-out"""
+    OK = "ok"
+    TIMED_OUT = "timed_out"
+    UNAVAILABLE = "unavailable"
+    FAILED = "failed"
+
 class BaseDEXIntegration(ABC):
     """Base class for DEX integrations"""
     
+    name = "unknown"
+    
     @abstractmethod
     async def get_token_data(self, token_address: str, chain_id: int) -> Dict:
         pass
@@ -12,10 +25,49 @@ class BaseDEXIntegration(ABC):
     @abstractmethod
     def supports_chain(self, chain_id: int) -> bool:
         pass
+    
+    async def get_tokens_data(self, token_addresses: List[str], chain_id: int) -> Dict[str, Dict]:
+        """Fetch many tokens; integrations without a bulk endpoint fan out per token.
+
+        Tokens whose lookup failed are left out of the result.
+        """
+        results = await asyncio.gather(
+            *(self.get_token_data(address, chain_id) for address in token_addresses),
+            return_exceptions=True
+        )
+        # One chunk per token, each keyed by its address so _collect_chunks can merge them
+        chunks = [[address] for address in token_addresses]
+        keyed = [result if isinstance(result, BaseException) else {address: result}
+                 for address, result in zip(token_addresses, results)]
+        return _collect_chunks(self.name, chunks, keyed)
+
+
+def _collect_chunks(name: str, chunks: List[List], results: List) -> Dict:
+    """Merge per-chunk results, leaving out the chunks that raised.
+
+    Raises the first error only when every chunk failed, so the source's
+    circuit breaker still sees a source that is down.
+    """
+    merged = {}
+    errors = []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, BaseException):
+            print(f"{name} request for {len(chunk)} tokens failed: {result}")
+            errors.append(result)
+        else:
+            merged.update(result)
+    if errors and len(errors) == len(chunks):
+        raise errors[0]
+    return merged
 
 class DexScreenerIntegration(BaseDEXIntegration):
     """DexScreener.com integration"""
     
+    name = "dexscreener"
+    
+    # /tokens/{addresses} accepts at most this many comma-separated addresses
+    MAX_ADDRESSES_PER_REQUEST = 30
+    
     def __init__(self):
         self.base_url = "https://api.dexscreener.com/latest/dex"
         self.chain_map = {
@@ -30,45 +82,81 @@ class DexScreenerIntegration(BaseDEXIntegration):
         return chain_id in self.chain_map
     
     async def get_token_data(self, token_address: str, chain_id: int) -> Dict:
-        if not self.supports_chain(chain_id):
-            return {}
+        results = await self.get_tokens_data([token_address], chain_id)
+        return results.get(token_address, {})
+    
+    async def get_tokens_data(self, token_addresses: List[str], chain_id: int) -> Dict[str, Dict]:
+        """Fetch many tokens with the minimum number of /tokens requests"""
+        if not self.supports_chain(chain_id) or not token_addresses:
+            return {address: {} for address in token_addresses}
         
         chain = self.chain_map[chain_id]
-        url = f"{self.base_url}/tokens/{token_address}"
+        unique = list(dict.fromkeys(address.lower() for address in token_addresses))
+        chunks = [
+            unique[i:i + self.MAX_ADDRESSES_PER_REQUEST]
+            for i in range(0, len(unique), self.MAX_ADDRESSES_PER_REQUEST)
+        ]
+        results = await asyncio.gather(*(self._fetch_chunk(chain, chunk) for chunk in chunks), return_exceptions=True)
+        pairs_by_token = _collect_chunks(self.name, chunks, results)
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        pairs = data.get('pairs', [])
-                        
-                        if pairs:
-                            # Aggregate data from all pairs
-                            total_liquidity = sum(float(p.get('liquidity', {}).get('usd', 0)) for p in pairs)
-                            total_volume = sum(float(p.get('volume', {}).get('h24', 0)) for p in pairs)
-                            
-                            # Get price from most liquid pair
-                            pairs.sort(key=lambda x: float(x.get('liquidity', {}).get('usd', 0)), reverse=True)
-                            main_pair = pairs[0]
-                            
-                            return {
-                                'price_usd': float(main_pair.get('priceUsd', 0)),
-                                'liquidity_usd': total_liquidity,
-                                'volume_24h': total_volume,
-                                'price_change_24h_percent': float(main_pair.get('priceChange', {}).get('h24', 0)),
-                                'market_cap': float(main_pair.get('marketCap', 0)),
-                                'pair_count': len(pairs),
-                                'dex_source': 'dexscreener'
-                            }
-            except Exception as e:
-                print(f"DexScreener error: {e}")
+        # Tokens of a failed chunk are left out rather than reported pair-less
+        return {
+            address: self._summarize_pairs(pairs_by_token[address.lower()])
+            for address in token_addresses
+            if address.lower() in pairs_by_token
+        }
+    
+    async def _fetch_chunk(self, chain: str, token_addresses: List[str]) -> Dict[str, List[Dict]]:
+        """Pairs of one chunk of tokens, split back by base token"""
+        pairs_by_token: Dict[str, List[Dict]] = {address: [] for address in token_addresses}
+        for pair in await self._fetch_pairs(token_addresses):
+            if pair.get('chainId') != chain:
+                continue
+            base_address = (pair.get('baseToken') or {}).get('address', '').lower()
+            if base_address in pairs_by_token:
+                pairs_by_token[base_address].append(pair)
+        return pairs_by_token
+    
+    async def _fetch_pairs(self, token_addresses: List[str]) -> List[Dict]:
+        url = f"{self.base_url}/tokens/{','.join(token_addresses)}"
+        session = await get_session()
+        async with session.get(url) as response:
+            if response.status == 404:
+                return []
+            # Anything else but a 200 is a failure, not an answer of "no pairs"
+            # that would be negatively cached
+            if response.status != 200:
+                raise UpstreamError(f"DexScreener returned HTTP {response.status}")
+            data = await response.json()
+            return data.get('pairs') or []
+    
+    def _summarize_pairs(self, pairs: List[Dict]) -> Dict:
+        if not pairs:
+            return {}
         
-        return {}
+        # Aggregate data from all pairs
+        total_liquidity = sum(float(p.get('liquidity', {}).get('usd', 0)) for p in pairs)
+        total_volume = sum(float(p.get('volume', {}).get('h24', 0)) for p in pairs)
+        
+        # Get price from most liquid pair
+        main_pair = max(pairs, key=lambda x: float(x.get('liquidity', {}).get('usd', 0)))
+        
+        return {
+            'price_usd': float(main_pair.get('priceUsd', 0)),
+            'liquidity_usd': total_liquidity,
+            'volume_24h': total_volume,
+            'price_change_24h_percent': float(main_pair.get('priceChange', {}).get('h24', 0)),
+            'market_cap': float(main_pair.get('marketCap', 0)),
+            'pair_count': len(pairs),
+            'pair_address': main_pair.get('pairAddress'),
+            'dex_source': 'dexscreener'
+        }
 
 class DEXToolsIntegration(BaseDEXIntegration):
     """DEXTools integration (requires API key)"""
     
+    name = "dextools"
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.dextools.io/v1"
@@ -89,48 +177,200 @@ class DEXToolsIntegration(BaseDEXIntegration):
         url = f"{self.base_url}/token/{chain}/{token_address}"
         headers = {"X-API-Key": self.api_key}
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        return {
-                            'price_usd': float(data.get('price', 0)),
-                            'liquidity_usd': float(data.get('liquidity', 0)),
-                            'volume_24h': float(data.get('volume24h', 0)),
-                            'holders': int(data.get('holders', 0)),
-                            'dex_source': 'dextools',
-                            'audit_results': data.get('audit', {}),
-                            'score': data.get('score', 0)
-                        }
-            except Exception as e:
-                print(f"DEXTools error: {e}")
+        session = await get_session()
+        async with session.get(url, headers=headers) as response:
+            if response.status != 200 and response.status != 404:
+                raise UpstreamError(f"DEXTools returned HTTP {response.status}")
+            if response.status == 200:
+                data = await response.json()
+                
+                return {
+                    'price_usd': float(data.get('price', 0)),
+                    'liquidity_usd': float(data.get('liquidity', 0)),
+                    'volume_24h': float(data.get('volume24h', 0)),
+                    'holders': int(data.get('holders', 0)),
+                    'dex_source': 'dextools',
+                    'audit_results': data.get('audit', {}),
+                    'score': data.get('score', 0)
+                }
         
         return {}
 
+class GeckoTerminalIntegration(BaseDEXIntegration):
+    """GeckoTerminal integration (no API key required)"""
+    
+    name = "geckoterminal"
+    MAX_ADDRESSES_PER_REQUEST = 30
+    
+    def __init__(self):
+        self.base_url = "https://api.geckoterminal.com/api/v2"
+        self.chain_map = {
+            1: "eth",
+            56: "bsc",
+            137: "polygon_pos",
+            8453: "base",
+            42161: "arbitrum"
+        }
+    
+    def supports_chain(self, chain_id: int) -> bool:
+        return chain_id in self.chain_map
+    
+    async def get_token_data(self, token_address: str, chain_id: int) -> Dict:
+        results = await self.get_tokens_data([token_address], chain_id)
+        return results.get(token_address, {})
+    
+    async def get_tokens_data(self, token_addresses: List[str], chain_id: int) -> Dict[str, Dict]:
+        if not self.supports_chain(chain_id) or not token_addresses:
+            return {address: {} for address in token_addresses}
+        
+        network = self.chain_map[chain_id]
+        unique = list(dict.fromkeys(address.lower() for address in token_addresses))
+        chunks = [
+            unique[i:i + self.MAX_ADDRESSES_PER_REQUEST]
+            for i in range(0, len(unique), self.MAX_ADDRESSES_PER_REQUEST)
+        ]
+        results = await asyncio.gather(
+            *(self._fetch_chunk(network, chunk) for chunk in chunks), return_exceptions=True
+        )
+        by_address = _collect_chunks(self.name, chunks, results)
+        # Tokens of a failed chunk are left out rather than reported unlisted
+        return {
+            address: by_address[address.lower()]
+            for address in token_addresses
+            if address.lower() in by_address
+        }
+    
+    async def _fetch_chunk(self, network: str, token_addresses: List[str]) -> Dict[str, Dict]:
+        """Parsed data of one chunk of tokens; {} for tokens GeckoTerminal does not list"""
+        by_address = {address: {} for address in token_addresses}
+        for token in await self._fetch_tokens(network, token_addresses):
+            attributes = token.get('attributes') or {}
+            address = (attributes.get('address') or '').lower()
+            if address:
+                by_address[address] = self._parse_token(attributes)
+        return by_address
+    
+    async def _fetch_tokens(self, network: str, token_addresses: List[str]) -> List[Dict]:
+        url = f"{self.base_url}/networks/{network}/tokens/multi/{','.join(token_addresses)}"
+        session = await get_session()
+        async with session.get(url, headers={"Accept": "application/json"}) as response:
+            if response.status == 404:
+                return []
+            if response.status != 200:
+                raise UpstreamError(f"GeckoTerminal returned HTTP {response.status}")
+            data = await response.json()
+            return data.get('data') or []
+    
+    def _parse_token(self, attributes: Dict) -> Dict:
+        return {
+            'price_usd': float(attributes.get('price_usd') or 0),
+            'liquidity_usd': float(attributes.get('total_reserve_in_usd') or 0),
+            'volume_24h': float((attributes.get('volume_usd') or {}).get('h24') or 0),
+            'market_cap': float(attributes.get('market_cap_usd') or attributes.get('fdv_usd') or 0),
+            'dex_source': 'geckoterminal'
+        }
+
 class MultiDEXAggregator:
     """Aggregate data from multiple DEX sources"""
     
     def __init__(self, settings):
-        self.integrations = [
-            DexScreenerIntegration(),
-        ]
+        self.settings = settings
+        self.integrations: List[BaseDEXIntegration] = []
+        self.deadlines: Dict[str, float] = {}
+        
+        self.register_integration(DexScreenerIntegration())
         
         # Add DEXTools if API key available
         if settings.DEXTOOLS_API_KEY:
-            self.integrations.append(DEXToolsIntegration(settings.DEXTOOLS_API_KEY))
+            self.register_integration(DEXToolsIntegration(settings.DEXTOOLS_API_KEY))
+        
+        if settings.GECKOTERMINAL_ENABLED:
+            self.register_integration(GeckoTerminalIntegration())
+    
+    def register_integration(self, integration: BaseDEXIntegration, deadline: Optional[float] = None):
+        """Add a DEX source; it is queried concurrently with the others under its own deadline"""
+        self.integrations.append(integration)
+        self.deadlines[integration.name] = (
+            deadline
+            or self.settings.DEX_SOURCE_DEADLINES.get(integration.name)
+            or self.settings.DEX_SOURCE_DEADLINE
+        )
+    
+    async def _fan_out(
+        self, chain_id: int, call: Callable[[BaseDEXIntegration], Awaitable]
+    ) -> Tuple[List, List[str], List[str], List[str]]:
+        """Query every integration concurrently.
+        
+        Returns (results, timed_out_sources, unavailable_sources, failed_sources);
+        sources whose circuit breaker is open are skipped without waiting.
+        """
+        integrations = [i for i in self.integrations if i.supports_chain(chain_id)]
+        
+        async def run(integration) -> Tuple[SourceStatus, Any]:
+            try:
+                async with breakers.get(integration.name, chain_id):
+                    value = await asyncio.wait_for(call(integration), timeout=self.deadlines[integration.name])
+                return SourceStatus.OK, value
+            except CircuitOpenError:
+                return SourceStatus.UNAVAILABLE, None
+            except asyncio.TimeoutError:
+                return SourceStatus.TIMED_OUT, None
+            except Exception as e:
+                print(f"{integration.name} error: {e}")
+                return SourceStatus.FAILED, None
+        
+        outcomes = await asyncio.gather(*(run(i) for i in integrations))
+        results = [value for status, value in outcomes if status == SourceStatus.OK and value]
+        
+        def names(status: SourceStatus) -> List[str]:
+            return [i.name for i, (outcome, _) in zip(integrations, outcomes) if outcome == status]
+        
+        return results, names(SourceStatus.TIMED_OUT), names(SourceStatus.UNAVAILABLE), names(SourceStatus.FAILED)
     
     async def get_aggregated_data(self, token_address: str, chain_id: int) -> Dict:
         """Get data from all available DEX sources"""
-        results = []
+        results, timed_out, unavailable, failed = await self._fan_out(
+            chain_id, lambda integration: integration.get_token_data(token_address, chain_id)
+        )
         
-        for integration in self.integrations:
-            if integration.supports_chain(chain_id):
-                data = await integration.get_token_data(token_address, chain_id)
-                if data:
-                    results.append(data)
+        aggregated = self._aggregate(results)
+        if timed_out:
+            aggregated['timed_out_sources'] = timed_out
+        if unavailable:
+            aggregated['unavailable_sources'] = unavailable
+        if failed:
+            aggregated['failed_sources'] = failed
+        return aggregated
+    
+    async def get_aggregated_data_many(self, token_addresses: List[str], chain_id: int) -> Dict[str, Dict]:
+        """Get aggregated data for many tokens on one chain using bulk endpoints"""
+        results_by_token: Dict[str, List[Dict]] = {address: [] for address in token_addresses}
+        failed_by_token: Dict[str, List[str]] = {address: [] for address in token_addresses}
+        
+        async def fetch(integration):
+            return integration.name, await integration.get_tokens_data(token_addresses, chain_id)
         
+        data_by_source, timed_out, unavailable, failed = await self._fan_out(chain_id, fetch)
+        for name, data_by_token in data_by_source:
+            for address in token_addresses:
+                if address not in data_by_token:
+                    # Only this token's chunk failed
+                    failed_by_token[address].append(name)
+                elif data_by_token[address]:
+                    results_by_token[address].append(data_by_token[address])
+        
+        aggregated = {address: self._aggregate(results) for address, results in results_by_token.items()}
+        for address, data in aggregated.items():
+            if timed_out:
+                data['timed_out_sources'] = timed_out
+            if unavailable:
+                data['unavailable_sources'] = unavailable
+            if failed or failed_by_token[address]:
+                data['failed_sources'] = failed + failed_by_token[address]
+        return aggregated
+    
+    def _aggregate(self, results: List[Dict]) -> Dict:
+        """Liquidity-weighted merge of per-source results for one token"""
         if not results:
             return {}
         
@@ -154,10 +394,16 @@ class MultiDEXAggregator:
         aggregated['price_usd'] = primary_source.get('price_usd', 0)
         aggregated['price_change_24h_percent'] = primary_source.get('price_change_24h_percent', 0)
         aggregated['market_cap'] = primary_source.get('market_cap', 0)
+        pair_address = primary_source.get('pair_address') or next(
+            (r['pair_address'] for r in results if r.get('pair_address')), None
+        )
+        if pair_address:
+            aggregated['pair_address'] = pair_address
 
-        # Sum liquidity and volume from all sources
-        aggregated['liquidity_usd'] = sum(r.get('liquidity_usd', 0) for r in results)
-        aggregated['volume_24h'] = sum(r.get('volume_24h', 0) for r in results)
+        # Every source indexes the same on-chain pools, so summing would count
+        # each pool once per source; take the most complete view instead.
+        aggregated['liquidity_usd'] = max(r.get('liquidity_usd', 0) for r in results)
+        aggregated['volume_24h'] = max(r.get('volume_24h', 0) for r in results)
         aggregated['sources'] = [r.get('dex_source') for r in results if r.get('dex_source')]
 
         # Include additional data if available from any source
@@ -0,0 +1,120 @@
+import asyncio
+import math
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from ..analyzers.concentration import ConcentrationStats
+from ..config.settings import settings
+from ..utils.cache import token_cache
+from ..utils.single_flight import SingleFlight
+from .onchain_reader import onchain_reader
+
+# page number -> rows of the explorer's holder list; [] past the last page,
+# None if the page could not be fetched
+FetchPage = Callable[[int], Awaitable[Optional[List[Dict]]]]
+
+
+def _quantity(row: Dict) -> int:
+    value = row.get('TokenHolderQuantity') or 0
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+class HolderScanner:
+    """Walks a token's whole holder list and reduces it to concentration metrics.
+
+    Up to HOLDER_SCAN_CONCURRENCY pages are in flight at once (the explorer's
+    rate limiter paces them) and each page is folded into ConcentrationStats
+    as it arrives, so nothing proportional to the holder count is kept.
+    Scans stop after HOLDER_SCAN_MAX_PAGES pages; holder_count is then a
+    lower bound and holder_count_truncated is set.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self._flight = SingleFlight()
+        self.scans = 0
+        self.pages = 0
+        self.holders_streamed = 0
+
+    async def scan(self, chain_id: int, token_address: str, fetch_page: FetchPage) -> Optional[Dict]:
+        """Holder metrics for a token, or None if the first page could not be fetched"""
+        key = f"holders:{chain_id}:{token_address.lower()}"
+        result = await token_cache.get(key)
+        if result is not None:
+            return result
+        return await self._flight.do(key, lambda: self._scan(chain_id, token_address, fetch_page, key))
+
+    async def _scan(self, chain_id: int, token_address: str, fetch_page: FetchPage, key: str) -> Optional[Dict]:
+        self.scans += 1
+        page_size = self.settings.HOLDER_SCAN_PAGE_SIZE
+        max_pages = self.settings.HOLDER_SCAN_MAX_PAGES
+        stats = ConcentrationStats(top_k=self.settings.HOLDER_SCAN_TOP_K)
+        next_page, last_page, fetched, failed = 1, None, 0, False
+        pending: Dict[asyncio.Future, int] = {}
+        try:
+            while True:
+                while (len(pending) < self.settings.HOLDER_SCAN_CONCURRENCY and next_page <= max_pages
+                       and (last_page is None or next_page <= last_page)):
+                    pending[asyncio.ensure_future(fetch_page(next_page))] = next_page
+                    next_page += 1
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = pending.pop(task)
+                    rows = task.result()
+                    if rows is None:
+                        if page == 1:
+                            return None
+                        # Keep what was scanned so far, reported as truncated
+                        failed = True
+                        last_page = page - 1 if last_page is None else min(last_page, page - 1)
+                        continue
+                    fetched += 1
+                    if len(rows) < page_size:
+                        last_page = page if last_page is None else min(last_page, page)
+                    for row in rows:
+                        stats.add(row.get('TokenHolderAddress'), _quantity(row))
+                    self.holders_streamed += len(rows)
+        finally:
+            for task in pending:
+                task.cancel()
+        self.pages += fetched
+        if not stats.count:
+            return None
+
+        total_supply, balances = await self._onchain_supply(chain_id, token_address, stats)
+        result = stats.summary(total_supply)
+        if total_supply and balances:
+            # Explorer balances lag; prefer current on-chain balances for the top holders
+            ordered = sorted(balances.values(), reverse=True)
+            result['top_holder_percent'] = ordered[0] / total_supply * 100
+            result['top10_holders_percent'] = sum(ordered[:10]) / total_supply * 100
+        result['holder_count_truncated'] = failed or last_page is None
+        result['holder_pages_scanned'] = fetched
+        # Big holder lists are costly to rescan and their metrics move slowly
+        ttl = min(self.settings.HOLDER_SCAN_CACHE_TTL * max(1, math.ceil(fetched / 10)),
+                  self.settings.HOLDER_SCAN_MAX_CACHE_TTL)
+        await token_cache.set(key, result, ttl=ttl)
+        return result
+
+    async def _onchain_supply(self, chain_id: int, token_address: str, stats: ConcentrationStats):
+        """(totalSupply, current balances of the top 10) read on-chain in one roundtrip"""
+        try:
+            return await onchain_reader.read_balances(
+                chain_id, token_address, [address for address, _ in stats.top()[:10]]
+            )
+        except Exception as e:
+            print(f"On-chain balance read error: {e}")
+            return None, {}
+
+    def stats(self) -> Dict:
+        return {
+            'scans': self.scans,
+            'pages': self.pages,
+            'holders_streamed': self.holders_streamed,
+        }
+
+
+holder_scanner = HolderScanner(settings)
@@ -0,0 +1,168 @@
+import asyncio
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from ..config.settings import settings
+from ..utils.circuit_breaker import breakers
+from .rpc_pool import RPCEndpointPool
+from .web3_registry import web3_registry
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+
+# ABI-encoded size of one aggregate3 entry besides its calldata
+# (tuple offset, address, allowFailure, bytes offset, bytes length)
+_CALL_OVERHEAD_BYTES = 5 * 32
+
+BURN_ADDRESSES = {
+    '0x0000000000000000000000000000000000000000',
+    '0x000000000000000000000000000000000000dead',
+}
+
+Call = Tuple[str, bytes]
+
+
+def encode_call(signature: str, types: Sequence[str] = (), args: Sequence = ()) -> bytes:
+    """Calldata for a function signature such as 'balanceOf(address)'"""
+    return Web3.keccak(text=signature)[:4] + (encode(list(types), list(args)) if types else b'')
+
+
+def decode_result(types: Sequence[str], data: Optional[bytes]) -> Optional[Tuple]:
+    """Decode return data; None if the call failed or returned something else"""
+    if not data:
+        return None
+    try:
+        return decode(list(types), data)
+    except Exception:
+        return None
+
+
+class OnChainReader:
+    """Many eth_calls in as few roundtrips as possible.
+
+    Calls are packed into Multicall3 aggregate3 calls on chains where it is
+    deployed, and sent as JSON-RPC batch arrays elsewhere. Either way they
+    are chunked so no request exceeds MULTICALL_MAX_CALLDATA_BYTES or
+    MULTICALL_MAX_CALLS.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self._multicall_deployed: Dict[int, bool] = {}
+        self.calls = 0
+        self.roundtrips = 0
+
+    async def _has_multicall(self, chain_id: int, pool: RPCEndpointPool) -> bool:
+        deployed = self._multicall_deployed.get(chain_id)
+        if deployed is None:
+            code = await pool.request('eth_getCode', [MULTICALL3_ADDRESS, 'latest'])
+            deployed = bool(code) and code not in ('0x', '0x0')
+            self._multicall_deployed[chain_id] = deployed
+        return deployed
+
+    def _chunks(self, calls: List[Call]) -> Iterator[List[Call]]:
+        chunk, size = [], 0
+        for call in calls:
+            call_size = len(call[1]) + _CALL_OVERHEAD_BYTES
+            if chunk and (size + call_size > self.settings.MULTICALL_MAX_CALLDATA_BYTES
+                          or len(chunk) >= self.settings.MULTICALL_MAX_CALLS):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(call)
+            size += call_size
+        if chunk:
+            yield chunk
+
+    async def call_many(self, chain_id: int, calls: List[Call], block: str = 'latest') -> List[Optional[bytes]]:
+        """Run (target, calldata) calls; returns each call's return data, None where it failed"""
+        pool = web3_registry.get_pool(chain_id)
+        if pool is None or not calls:
+            return [None] * len(calls)
+        chunks = list(self._chunks(calls))
+        async with breakers.get('rpc', chain_id):
+            send = self._aggregate3 if await self._has_multicall(chain_id, pool) else self._batch
+            results = await asyncio.gather(*(send(pool, chunk, block) for chunk in chunks))
+        self.calls += len(calls)
+        self.roundtrips += len(chunks)
+        return [data for chunk in results for data in chunk]
+
+    async def _aggregate3(self, pool: RPCEndpointPool, chunk: List[Call], block: str) -> List[Optional[bytes]]:
+        calldata = AGGREGATE3_SELECTOR + encode(
+            ['(address,bool,bytes)[]'],
+            [[(Web3.to_checksum_address(target), True, data) for target, data in chunk]],
+        )
+        result = await pool.request('eth_call', [{'to': MULTICALL3_ADDRESS, 'data': '0x' + calldata.hex()}, block])
+        (returned,) = decode(['(bool,bytes)[]'], bytes.fromhex(result[2:]))
+        return [data if success and data else None for success, data in returned]
+
+    async def _batch(self, pool: RPCEndpointPool, chunk: List[Call], block: str) -> List[Optional[bytes]]:
+        responses = await pool.batch_request([
+            ('eth_call', [{'to': target, 'data': '0x' + data.hex()}, block]) for target, data in chunk
+        ])
+        return [
+            bytes.fromhex(response['result'][2:]) if response.get('result') not in (None, '0x') else None
+            for response in responses
+        ]
+
+    async def read_token_basics(self, chain_id: int, token_address: str) -> Dict:
+        """owner(), totalSupply() and decimals() in one roundtrip"""
+        owner, total_supply, decimals = await self.call_many(chain_id, [
+            (token_address, encode_call('owner()')),
+            (token_address, encode_call('totalSupply()')),
+            (token_address, encode_call('decimals()')),
+        ])
+        data = {}
+        owner = decode_result(['address'], owner)
+        if owner:
+            data['onchain_owner'] = owner[0]
+            data['ownership_renounced'] = owner[0].lower() in BURN_ADDRESSES
+        total_supply = decode_result(['uint256'], total_supply)
+        if total_supply:
+            data['onchain_total_supply'] = total_supply[0]
+        decimals = decode_result(['uint8'], decimals)
+        if decimals:
+            data['decimals'] = decimals[0]
+        return data
+
+    async def read_balances(self, chain_id: int, token_address: str,
+                            holders: List[str]) -> Tuple[Optional[int], Dict[str, int]]:
+        """(totalSupply, {holder: balance}) read in one roundtrip per chunk"""
+        calls = [(token_address, encode_call('totalSupply()'))] + [
+            (token_address, encode_call('balanceOf(address)', ['address'], [Web3.to_checksum_address(holder)]))
+            for holder in holders
+        ]
+        results = await self.call_many(chain_id, calls)
+        total_supply = decode_result(['uint256'], results[0])
+        balances = {}
+        for holder, data in zip(holders, results[1:]):
+            balance = decode_result(['uint256'], data)
+            if balance is not None:
+                balances[holder] = balance[0]
+        return (total_supply[0] if total_supply else None), balances
+
+    async def read_pair_reserves(self, chain_id: int, pair_address: str) -> Optional[Dict]:
+        """token0/token1 and reserves of a Uniswap V2 style pair"""
+        token0, token1, reserves = await self.call_many(chain_id, [
+            (pair_address, encode_call('token0()')),
+            (pair_address, encode_call('token1()')),
+            (pair_address, encode_call('getReserves()')),
+        ])
+        token0 = decode_result(['address'], token0)
+        token1 = decode_result(['address'], token1)
+        reserves = decode_result(['uint112', 'uint112', 'uint32'], reserves)
+        if not (token0 and token1 and reserves):
+            return None
+        return {'token0': token0[0], 'token1': token1[0], 'reserve0': reserves[0], 'reserve1': reserves[1]}
+
+    def stats(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'roundtrips': self.roundtrips,
+            'calls_per_roundtrip': self.calls / self.roundtrips if self.roundtrips else 0.0,
+            'multicall_chains': {chain: deployed for chain, deployed in self._multicall_deployed.items()},
+        }
+
+
+onchain_reader = OnChainReader(settings)
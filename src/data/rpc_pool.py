@@ -0,0 +1,217 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from web3.providers.async_base import AsyncBaseProvider
+
+from ..utils.circuit_breaker import RequestError, UpstreamError
+from ..utils.http_client import get_session
+
+
+class RPCError(UpstreamError):
+    """Raised when no endpoint in a pool could serve a JSON-RPC request"""
+
+
+class RPCResponseError(RPCError, RequestError):
+    """A JSON-RPC level error returned by a healthy endpoint (e.g. execution reverted)"""
+    def __init__(self, error: Dict):
+        self.error = error
+        super().__init__(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+
+
+class RPCEndpoint:
+    """Rolling latency/error statistics for a single RPC URL"""
+    def __init__(self, url: str, window: int):
+        self.url = url
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.total_requests = 0
+        self.total_errors = 0
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_errors = 0
+        self.total_requests += 1
+
+    def record_error(self, eject_after: int, cooldown: float):
+        self.outcomes.append(False)
+        self.consecutive_errors += 1
+        self.total_requests += 1
+        self.total_errors += 1
+        if self.consecutive_errors >= eject_after:
+            self.ejected_until = time.monotonic() + cooldown
+            self.consecutive_errors = 0
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(int(len(ordered) * percentile), len(ordered) - 1)
+        return ordered[index]
+
+    def score(self) -> float:
+        """Lower is better; unmeasured endpoints score 0 so they get probed first."""
+        median = self.latency_percentile(0.5)
+        if median is None:
+            return 0.0
+        return median * (1 + 4 * self.error_rate)
+
+    def snapshot(self) -> Dict:
+        return {
+            'url': self.url,
+            'healthy': self.is_healthy(),
+            'p50_ms': round(self.latency_percentile(0.5) * 1000, 1) if self.latencies else None,
+            'p95_ms': round(self.latency_percentile(0.95) * 1000, 1) if self.latencies else None,
+            'error_rate': round(self.error_rate, 3),
+            'total_requests': self.total_requests,
+            'total_errors': self.total_errors,
+        }
+
+
+class RPCEndpointPool:
+    """Latency-aware JSON-RPC routing over several endpoints of one chain.
+
+    Calls go to the fastest healthy endpoint. If it has not answered after its
+    own p95 latency, the same request is hedged to the next endpoint and the
+    first answer wins. Endpoints that fail repeatedly are ejected for a
+    cool-down period.
+    """
+    def __init__(self, chain_id: int, urls: List[str], settings):
+        self.chain_id = chain_id
+        self.settings = settings
+        self.endpoints = [RPCEndpoint(url, settings.RPC_LATENCY_WINDOW) for url in urls]
+        self._ids = itertools.count(1)
+        self.hedged_requests = 0
+        self.failovers = 0
+        self.batched_calls = 0
+
+    def _ranked(self) -> List[RPCEndpoint]:
+        healthy = [e for e in self.endpoints if e.is_healthy()]
+        if not healthy:
+            # Everything is ejected; try the endpoint that comes back soonest.
+            return sorted(self.endpoints, key=lambda e: e.ejected_until)
+        return sorted(healthy, key=lambda e: e.score())
+
+    def _hedge_delay(self, endpoint: RPCEndpoint) -> float:
+        p95 = endpoint.latency_percentile(0.95)
+        if p95 is None:
+            return self.settings.RPC_HEDGE_MAX_DELAY
+        return min(max(p95, self.settings.RPC_HEDGE_MIN_DELAY), self.settings.RPC_HEDGE_MAX_DELAY)
+
+    async def _send(self, endpoint: RPCEndpoint, payload: Any) -> Any:
+        session = await get_session()
+        timeout = aiohttp.ClientTimeout(total=self.settings.RPC_TIMEOUT)
+        start = time.monotonic()
+        try:
+            async with session.post(endpoint.url, json=payload, timeout=timeout) as response:
+                if response.status != 200:
+                    raise RPCError(f"{endpoint.url} returned HTTP {response.status}")
+                data = await response.json(content_type=None)
+        except Exception:
+            endpoint.record_error(self.settings.RPC_EJECT_AFTER_ERRORS, self.settings.RPC_EJECT_COOLDOWN)
+            raise
+        endpoint.record_success(time.monotonic() - start)
+        return data
+
+    async def _dispatch(self, payload: Any) -> Any:
+        queue = self._ranked()
+        if not queue:
+            raise RPCError(f"No RPC endpoints configured for chain {self.chain_id}")
+        pending = set()
+        last_error = None
+        current = None
+        try:
+            while queue or pending:
+                if not pending:
+                    if last_error is not None:
+                        self.failovers += 1
+                    current = queue.pop(0)
+                    pending.add(asyncio.ensure_future(self._send(current, payload)))
+                delay = self._hedge_delay(current) if queue else None
+                done, pending = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    current = queue.pop(0)
+                    pending.add(asyncio.ensure_future(self._send(current, payload)))
+                    self.hedged_requests += 1
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise RPCError(f"All RPC endpoints failed for chain {self.chain_id}: {last_error}")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _payload(self, method: str, params: Optional[List]) -> Dict:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+
+    async def make_request(self, method: str, params: Optional[List] = None) -> Dict:
+        """Return the raw JSON-RPC response object"""
+        return await self._dispatch(self._payload(method, params))
+
+    async def request(self, method: str, params: Optional[List] = None) -> Any:
+        response = await self.make_request(method, params)
+        if response.get('error'):
+            raise RPCResponseError(response['error'])
+        return response.get('result')
+
+    async def batch_request(self, calls: List[Tuple[str, List]]) -> List[Dict]:
+        """Send several calls as one JSON-RPC batch array.
+
+        Returns the raw response objects in the order of calls; per-call
+        errors are left in each response's 'error'.
+        """
+        payload = [self._payload(method, params) for method, params in calls]
+        response = await self._dispatch(payload)
+        if not isinstance(response, list):
+            # Endpoints without batch support answer with a single error object
+            raise RPCResponseError(response.get('error', response) if isinstance(response, dict) else response)
+        self.batched_calls += len(calls)
+        by_id = {item.get('id'): item for item in response if isinstance(item, dict)}
+        return [
+            by_id.get(item['id'], {'error': {'message': 'missing from batch response'}})
+            for item in payload
+        ]
+
+    def stats(self) -> Dict:
+        return {
+            'endpoints': [e.snapshot() for e in self.endpoints],
+            'hedged_requests': self.hedged_requests,
+            'failovers': self.failovers,
+            'batched_calls': self.batched_calls,
+        }
+
+
+class PooledAsyncProvider(AsyncBaseProvider):
+    """AsyncWeb3 provider that routes every call through an RPCEndpointPool"""
+    def __init__(self, pool: RPCEndpointPool):
+        super().__init__()
+        self.pool = pool
+
+    async def make_request(self, method, params) -> Dict:
+        return await self.pool.make_request(method, list(params or []))
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            await self.pool.request('web3_clientVersion')
+            return True
+        except Exception:
+            if show_traceback:
+                raise
+            return False
@@ -1,11 +1,93 @@
+import asyncio
 import aiohttp
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+from ..config.settings import settings
+from ..utils.circuit_breaker import CircuitOpenError, UpstreamError, breakers
+from ..utils.http_client import get_session
+from ..utils.loop_local import LoopLocal
+from ..utils.rate_limiter import RateLimitExceeded, rate_limiter
+
+class GoPlusAPIError(UpstreamError):
+    """Raised when a GoPlus token_security request fails"""
+
+class GoPlusBatcher:
+    """
+    Collects pending token_security lookups for the same chain over a short
+    window and resolves them all with a single comma-separated request.
+    """
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._pending = LoopLocal(dict)
+        self.lookups = 0
+        self.requests = 0
+
+    async def lookup(self, analyzer: "SecurityAnalyzer", token_address: str, chain_id_str: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get()
+        key = (chain_id_str, analyzer.api_key)
+        batch = pending.get(key)
+        if batch is None:
+            batch = {}
+            pending[key] = batch
+            loop.call_later(self.window, self._flush, analyzer, key, batch)
+        address = token_address.lower()
+        future = batch.get(address)
+        if future is None:
+            future = loop.create_future()
+            batch[address] = future
+        self.lookups += 1
+        if len(batch) >= self.max_size:
+            self._flush(analyzer, key, batch)
+        return await asyncio.shield(future)
+
+    def _flush(self, analyzer: "SecurityAnalyzer", key, batch: Dict):
+        pending = self._pending.get()
+        if pending.get(key) is not batch:
+            return  # already flushed because it reached max_size
+        del pending[key]
+        asyncio.ensure_future(self._execute(analyzer, key[0], batch))
+
+    async def _execute(self, analyzer: "SecurityAnalyzer", chain_id_str: str, batch: Dict):
+        self.requests += 1
+        try:
+            try:
+                async with breakers.get('goplus', int(chain_id_str)):
+                    results = await analyzer._fetch_security_batch(chain_id_str, list(batch))
+            except Exception as e:
+                for future in batch.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for address, future in batch.items():
+                if future.done():
+                    continue
+                try:
+                    future.set_result(analyzer._parse_security_data(results.get(address, {})))
+                except Exception as e:
+                    # A malformed record fails only its own lookup
+                    future.set_exception(GoPlusAPIError(f"Unparseable result for {address}: {e}"))
+        finally:
+            # Nothing may be left waiting, even if this task is cancelled
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(GoPlusAPIError("Batch lookup did not complete"))
+
+    def stats(self) -> Dict:
+        return {
+            'lookups': self.lookups,
+            'requests': self.requests,
+            'addresses_per_request': self.lookups / self.requests if self.requests else 0.0,
+        }
+
+goplus_batcher = GoPlusBatcher(settings.GOPLUS_BATCH_WINDOW, settings.GOPLUS_BATCH_MAX_SIZE)
 
 class SecurityAnalyzer:
     """
     Analyzer for fetching token security data from GoPlus Security API.
     """
-    def __init__(self, api_key: str, session: aiohttp.ClientSession):
+    def __init__(self, api_key: str, session: Optional[aiohttp.ClientSession] = None):
         self.api_key = api_key
         self.base_url = "https://api.gopluslabs.io/api/v1"
         self.session = session
@@ -27,32 +109,39 @@ class SecurityAnalyzer:
             return self._get_default_security_data()
 
         chain_id_str = self.chain_map[chain_id]
-        url = f"{self.base_url}/token_security/{chain_id_str}?contract_addresses={token_address}"
 
         try:
-            async with self.session.get(url, headers=self.headers, timeout=15) as response:
-                if response.status != 200:
-                    print(f"GoPlus API Error: Status {response.status}")
-                    return self._get_default_security_data()
-                
-                data = await response.json()
-                if not data or data.get('code') != 1:
-                    print(f"GoPlus API Error: {data.get('message', 'Unknown error')}")
-                    return self._get_default_security_data()
-
-                result = data.get('result', {}).get(token_address.lower(), {})
-                return self._parse_security_data(result)
-
+            return await goplus_batcher.lookup(self, token_address, chain_id_str)
+        except (CircuitOpenError, UpstreamError, RateLimitExceeded):
+            # No answer is not a verdict; defaulting here would flag the token as a honeypot
+            raise
         except Exception as e:
             print(f"Error fetching GoPlus security data: {e}")
             return self._get_default_security_data()
 
+    async def _fetch_security_batch(self, chain_id_str: str, addresses: List[str]) -> Dict:
+        """
+        Fetches raw security results for many tokens, keyed by lowercase address.
+        """
+        url = f"{self.base_url}/token_security/{chain_id_str}"
+        params = {"contract_addresses": ",".join(addresses)}
+        session = self.session or await get_session()
+        status, data = await rate_limiter.get_json(
+            session, url, 'goplus', self.api_key, params=params, headers=self.headers, timeout=15
+        )
+        if status != 200:
+            raise GoPlusAPIError(f"Status {status}")
+        if not data or data.get('code') != 1:
+            raise GoPlusAPIError((data or {}).get('message', 'Unknown error'))
+        return {address.lower(): result for address, result in (data.get('result') or {}).items()}
+
     def _parse_security_data(self, result: Dict) -> Dict:
         """
         Parses the raw API response into a structured dictionary.
         """
         if not result:
-            return self._get_default_security_data()
+            # GoPlus answered but has no record of this token
+            return {**self._get_default_security_data(), 'goplus_no_result': True}
 
         return {
             'is_honeypot': result.get('is_honeypot') == '1',
@@ -0,0 +1,317 @@
+import asyncio
+import re
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from ..analyzers.concentration import ConcentrationStats
+from ..config.settings import settings
+from ..models.database import TokenBalance, TransferIndexCheckpoint
+from ..utils.circuit_breaker import breakers
+from ..utils.database import get_db
+from ..utils.single_flight import SingleFlight
+from .deployment_finder import deployment_finder
+from .rpc_pool import RPCEndpointPool, RPCResponseError
+from .web3_registry import web3_registry
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+ZERO_ADDRESS = '0x' + '0' * 40
+
+# Providers word "this eth_getLogs range returns too much" differently. Rate
+# limit errors share their error codes, so only the message is trusted.
+_RANGE_TOO_LARGE = re.compile(
+    r'more than \d+ (results|logs)|range (is )?too (large|wide)|exceeds? (the )?max(imum)? block range'
+    r'|block range (limit|too)|response size|too many (results|logs|blocks)|query timeout',
+    re.IGNORECASE,
+)
+
+# Balance rows per INSERT; keeps each statement well under the bind parameter limit
+_UPSERT_CHUNK = 1000
+
+
+class IndexConflict(Exception):
+    """Another process moved the checkpoint first; the window's writes are rolled back"""
+
+
+# (block number, from, to, raw amount)
+Transfer = Tuple[int, str, str, int]
+
+
+def _is_range_too_large(error: RPCResponseError) -> bool:
+    return _RANGE_TOO_LARGE.search(str(error)) is not None
+
+
+def _decode(log: Dict) -> Optional[Transfer]:
+    topics = log.get('topics') or []
+    # ERC-721 Transfers carry the token id as a fourth topic
+    if len(topics) != 3 or log.get('removed'):
+        return None
+    data = log.get('data')
+    value = int(data, 16) if data and data != '0x' else 0
+    return int(log['blockNumber'], 16), '0x' + topics[1][-40:].lower(), '0x' + topics[2][-40:].lower(), value
+
+
+class TransferIndexer:
+    """Holder balances rebuilt locally from ERC-20 Transfer logs.
+
+    Logs are pulled with eth_getLogs, TRANSFER_INDEX_CONCURRENCY block ranges
+    at a time. A range the node refuses as too large is split in half until
+    it is accepted, and the range size follows: it drops to the smallest
+    accepted span and doubles again while ranges stay under
+    TRANSFER_INDEX_TARGET_LOGS logs.
+
+    Each window of ranges is reduced to per-holder deltas and written in one
+    transaction together with the checkpoint, which only moves if nobody
+    else moved it, so a restarted or concurrent sync never applies a block
+    twice. Tokens whose balances change without Transfer events (rebasing,
+    reflection) will drift from their on-chain balances.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self._flight = SingleFlight()
+        self.ranges_fetched = 0
+        self.range_splits = 0
+        self.logs_applied = 0
+        self.conflicts = 0
+
+    async def sync(self, chain_id: int, token_address: str, max_seconds: Optional[float] = None) -> Optional[Dict]:
+        """Index from the checkpoint towards the confirmed head; None if the chain has no RPC"""
+        token_address = token_address.lower()
+        return await self._flight.do(
+            f"{chain_id}:{token_address}", lambda: self._sync(chain_id, token_address, max_seconds)
+        )
+
+    async def _sync(self, chain_id: int, token_address: str, max_seconds: Optional[float]) -> Optional[Dict]:
+        pool = web3_registry.get_pool(chain_id)
+        if pool is None:
+            return None
+        async with breakers.get('rpc', chain_id):
+            latest = int(await pool.request('eth_blockNumber'), 16)
+        head = latest - self.settings.TRANSFER_INDEX_CONFIRMATIONS
+        checkpoint = await self._load_checkpoint(chain_id, token_address)
+        if checkpoint is None:
+            checkpoint = await self._create_checkpoint(chain_id, token_address, latest)
+        cursor = checkpoint['last_block']
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+
+        windows = self.stream_transfers(chain_id, token_address, cursor + 1, head)
+        try:
+            async for end, transfers in windows:
+                try:
+                    await self._apply(chain_id, token_address, cursor, end, transfers, caught_up=end >= head)
+                except IndexConflict as e:
+                    self.conflicts += 1
+                    print(f"Transfer index conflict for {token_address}: {e}")
+                    return {'last_block': cursor, 'head': head, 'caught_up': False, 'conflict': True}
+                cursor = end
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        finally:
+            await windows.aclose()
+        return {'last_block': cursor, 'head': head, 'caught_up': cursor >= head}
+
+    async def stream_transfers(self, chain_id: int, token_address: str, from_block: int,
+                               to_block: int) -> AsyncIterator[Tuple[int, List[Transfer]]]:
+        """Decoded Transfers in [from_block, to_block], one (last block, transfers) per window.
+
+        Windows come in block order and only one is held at a time, so
+        callers can fold arbitrarily long ranges in bounded memory.
+        """
+        pool = web3_registry.get_pool(chain_id)
+        if pool is None:
+            return
+        size = self.settings.TRANSFER_INDEX_INITIAL_RANGE
+        semaphore = asyncio.Semaphore(self.settings.TRANSFER_INDEX_CONCURRENCY)
+        cursor = from_block - 1
+        while cursor < to_block:
+            ranges, start = [], cursor + 1
+            while start <= to_block and len(ranges) < self.settings.TRANSFER_INDEX_CONCURRENCY:
+                end = min(start + size - 1, to_block)
+                ranges.append((start, end))
+                start = end + 1
+            async with breakers.get('rpc', chain_id):
+                results = await asyncio.gather(*(
+                    self._fetch_range(pool, semaphore, token_address, first, last) for first, last in ranges
+                ))
+            cursor = ranges[-1][1]
+            yield cursor, [transfer for logs, _ in results for transfer in map(_decode, logs) if transfer]
+
+            smallest = min(span for _, span in results)
+            busiest = max(len(logs) for logs, _ in results)
+            if smallest < size:
+                size = smallest
+            elif busiest < self.settings.TRANSFER_INDEX_TARGET_LOGS // 2:
+                size = min(size * 2, self.settings.TRANSFER_INDEX_MAX_RANGE)
+
+    async def _fetch_range(self, pool: RPCEndpointPool, semaphore: asyncio.Semaphore, token_address: str,
+                           from_block: int, to_block: int) -> Tuple[List[Dict], int]:
+        """Transfer logs in [from_block, to_block] and the smallest span the node accepted"""
+        try:
+            async with semaphore:
+                logs = await pool.request('eth_getLogs', [{
+                    'address': token_address,
+                    'topics': [TRANSFER_TOPIC],
+                    'fromBlock': hex(from_block),
+                    'toBlock': hex(to_block),
+                }])
+            self.ranges_fetched += 1
+            return logs or [], to_block - from_block + 1
+        except RPCResponseError as e:
+            if from_block == to_block or not _is_range_too_large(e):
+                raise
+        self.range_splits += 1
+        middle = (from_block + to_block) // 2
+        (left, left_span), (right, right_span) = await asyncio.gather(
+            self._fetch_range(pool, semaphore, token_address, from_block, middle),
+            self._fetch_range(pool, semaphore, token_address, middle + 1, to_block),
+        )
+        return left + right, min(left_span, right_span)
+
+    async def _apply(self, chain_id: int, token_address: str, from_block: int, to_block: int,
+                     transfers: List[Transfer], caught_up: bool):
+        """Apply a window's balance deltas and move the checkpoint from from_block to to_block"""
+        deltas: Dict[str, int] = {}
+        for _, sender, recipient, value in transfers:
+            deltas[sender] = deltas.get(sender, 0) - value
+            deltas[recipient] = deltas.get(recipient, 0) + value
+        # Mints and burns: the zero address is not a holder
+        deltas.pop(ZERO_ADDRESS, None)
+        rows = [
+            {'chain_id': chain_id, 'token_address': token_address, 'holder_address': holder, 'balance': delta}
+            for holder, delta in deltas.items() if delta
+        ]
+
+        async with get_db() as db:
+            # Taking the checkpoint row first serialises concurrent syncs of a token
+            result = await db.execute(
+                update(TransferIndexCheckpoint)
+                .where(
+                    TransferIndexCheckpoint.chain_id == chain_id,
+                    TransferIndexCheckpoint.token_address == token_address,
+                    TransferIndexCheckpoint.last_block == from_block,
+                )
+                .values(last_block=to_block, caught_up=caught_up)
+            )
+            if result.rowcount != 1:
+                raise IndexConflict(f"checkpoint is no longer at block {from_block}")
+            for i in range(0, len(rows), _UPSERT_CHUNK):
+                statement = insert(TokenBalance).values(rows[i:i + _UPSERT_CHUNK])
+                await db.execute(statement.on_conflict_do_update(
+                    index_elements=['chain_id', 'token_address', 'holder_address'],
+                    set_={'balance': TokenBalance.balance + statement.excluded.balance},
+                ))
+            if rows:
+                await db.execute(
+                    delete(TokenBalance).where(
+                        TokenBalance.chain_id == chain_id,
+                        TokenBalance.token_address == token_address,
+                        TokenBalance.balance == 0,
+                    )
+                )
+        self.logs_applied += len(transfers)
+
+    async def _load_checkpoint(self, chain_id: int, token_address: str) -> Optional[Dict]:
+        async with get_db() as db:
+            result = await db.execute(
+                select(TransferIndexCheckpoint).where(
+                    TransferIndexCheckpoint.chain_id == chain_id,
+                    TransferIndexCheckpoint.token_address == token_address,
+                )
+            )
+            row = result.scalar_one_or_none()
+        if row is None:
+            return None
+        return {'start_block': row.start_block, 'last_block': row.last_block, 'caught_up': row.caught_up}
+
+    async def _create_checkpoint(self, chain_id: int, token_address: str, latest_block: int) -> Dict:
+        """Start indexing at the deployment block, or at genesis if it is unknown"""
+        try:
+            deployment = await deployment_finder.get_deployment(chain_id, token_address, latest_block)
+        except Exception as e:
+            print(f"Deployment search error: {e}")
+            deployment = None
+        start = deployment['block_number'] if deployment else 0
+        async with get_db() as db:
+            await db.execute(
+                insert(TransferIndexCheckpoint).values(
+                    chain_id=chain_id,
+                    token_address=token_address,
+                    start_block=start,
+                    last_block=start - 1,
+                    caught_up=False,
+                ).on_conflict_do_nothing()
+            )
+        return await self._load_checkpoint(chain_id, token_address)
+
+    async def holder_count(self, chain_id: int, token_address: str) -> int:
+        async with get_db() as db:
+            result = await db.execute(
+                select(func.count()).select_from(TokenBalance).where(
+                    TokenBalance.chain_id == chain_id,
+                    TokenBalance.token_address == token_address.lower(),
+                    TokenBalance.balance > 0,
+                )
+            )
+            return result.scalar_one()
+
+    async def top_holders(self, chain_id: int, token_address: str, limit: int = 20) -> List[Tuple[str, int]]:
+        async with get_db() as db:
+            result = await db.execute(
+                select(TokenBalance.holder_address, TokenBalance.balance)
+                .where(
+                    TokenBalance.chain_id == chain_id,
+                    TokenBalance.token_address == token_address.lower(),
+                )
+                .order_by(TokenBalance.balance.desc())
+                .limit(limit)
+            )
+            return [(holder, int(balance)) for holder, balance in result.all()]
+
+    async def get_holder_data(self, chain_id: int, token_address: str) -> Optional[Dict]:
+        """Holder metrics from the index, shaped like the holder collector's; None unless caught up"""
+        token_address = token_address.lower()
+        checkpoint = await self._load_checkpoint(chain_id, token_address)
+        if not checkpoint or not checkpoint['caught_up']:
+            return None
+        stats = ConcentrationStats(top_k=self.settings.HOLDER_SCAN_TOP_K)
+        async with get_db() as db:
+            result = await db.stream(
+                select(TokenBalance.holder_address, TokenBalance.balance)
+                .where(
+                    TokenBalance.chain_id == chain_id,
+                    TokenBalance.token_address == token_address,
+                    TokenBalance.balance > 0,
+                )
+                .execution_options(yield_per=5000)
+            )
+            async for holder, balance in result:
+                stats.add(holder, int(balance))
+        if not stats.count:
+            return None
+        data = stats.summary()
+        data.update({'holder_source': 'transfer_index', 'indexed_block': checkpoint['last_block']})
+        return data
+
+    async def indexed_tokens(self, limit: int = 500) -> List[Tuple[str, int]]:
+        """(token_address, chain_id) of indexed tokens, least recently synced first"""
+        async with get_db() as db:
+            result = await db.execute(
+                select(TransferIndexCheckpoint.token_address, TransferIndexCheckpoint.chain_id)
+                .order_by(TransferIndexCheckpoint.updated_at)
+                .limit(limit)
+            )
+            return [tuple(row) for row in result.all()]
+
+    def stats(self) -> Dict:
+        return {
+            'ranges_fetched': self.ranges_fetched,
+            'range_splits': self.range_splits,
+            'logs_applied': self.logs_applied,
+            'conflicts': self.conflicts,
+        }
+
+
+transfer_indexer = TransferIndexer(settings)
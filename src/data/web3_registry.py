@@ -0,0 +1,69 @@
+import threading
+from typing import Dict, List, Optional
+
+from web3 import AsyncWeb3
+
+from ..config.settings import settings
+from .rpc_pool import PooledAsyncProvider, RPCEndpointPool
+
+
+class Web3Registry:
+    """Process-wide chain id -> RPC pool / AsyncWeb3 registry.
+
+    Pools and providers are only constructed the first time a chain is used
+    and are reused afterwards, so creating a DataCollector per task stays cheap.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self._pools: Dict[int, RPCEndpointPool] = {}
+        self._connections: Dict[int, AsyncWeb3] = {}
+        self._lock = threading.Lock()
+
+    def rpc_urls(self, chain_id: int) -> List[str]:
+        primary, extra = {
+            1: (self.settings.ETH_RPC, self.settings.ETH_RPC_URLS),
+            56: (self.settings.BSC_RPC, self.settings.BSC_RPC_URLS),
+            137: (self.settings.POLYGON_RPC, self.settings.POLYGON_RPC_URLS),
+        }.get(chain_id, (None, []))
+        urls = []
+        for url in [primary, *extra]:
+            if url and url not in urls:
+                urls.append(url)
+        return urls
+
+    def get_pool(self, chain_id: int) -> Optional[RPCEndpointPool]:
+        pool = self._pools.get(chain_id)
+        if pool is not None:
+            return pool
+        urls = self.rpc_urls(chain_id)
+        if not urls:
+            return None
+        with self._lock:
+            pool = self._pools.get(chain_id)
+            if pool is None:
+                pool = RPCEndpointPool(chain_id, urls, self.settings)
+                self._pools[chain_id] = pool
+        return pool
+
+    def get(self, chain_id: int) -> Optional[AsyncWeb3]:
+        web3 = self._connections.get(chain_id)
+        if web3 is not None:
+            return web3
+        pool = self.get_pool(chain_id)
+        if pool is None:
+            return None
+        with self._lock:
+            web3 = self._connections.get(chain_id)
+            if web3 is None:
+                web3 = AsyncWeb3(PooledAsyncProvider(pool))
+                self._connections[chain_id] = web3
+        return web3
+
+    def initialized_chains(self):
+        return sorted(self._pools)
+
+    def stats(self) -> Dict:
+        return {chain_id: pool.stats() for chain_id, pool in self._pools.items()}
+
+
+web3_registry = Web3Registry(settings)
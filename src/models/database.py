@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, Index, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, BigInteger, Numeric, String, Float, Boolean, DateTime, JSON, Index, Text, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import UUID, JSONB
@@ -155,4 +155,38 @@ class AnalysisTask(Base):
     __table_args__ = (
         Index('idx_task_status', 'status'),
         Index('idx_task_created_at', 'created_at'),
-    )
\ No newline at end of file
+    )
+
+class ContractDeployment(Base):
+    """Block a contract was deployed in; immutable, so stored once per address"""
+    __tablename__ = "contract_deployments"
+    
+    chain_id = Column(Integer, primary_key=True)
+    token_address = Column(String(42), primary_key=True)
+    block_number = Column(BigInteger, nullable=False)
+    block_timestamp = Column(BigInteger, nullable=False)  # Unix seconds
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class TransferIndexCheckpoint(Base):
+    """How far a token's Transfer logs have been applied to token_balances"""
+    __tablename__ = "transfer_index_checkpoints"
+    
+    chain_id = Column(Integer, primary_key=True)
+    token_address = Column(String(42), primary_key=True)
+    start_block = Column(BigInteger, nullable=False)
+    last_block = Column(BigInteger, nullable=False)  # Last block fully applied
+    caught_up = Column(Boolean, default=False)  # Reached the confirmed head on the last sync
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TokenBalance(Base):
+    """Token balances rebuilt from Transfer logs; uint256 needs 78 digits"""
+    __tablename__ = "token_balances"
+    
+    chain_id = Column(Integer, primary_key=True)
+    token_address = Column(String(42), primary_key=True)
+    holder_address = Column(String(42), primary_key=True)
+    balance = Column(Numeric(78, 0), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_token_balances_balance', 'chain_id', 'token_address', 'balance'),
+    )
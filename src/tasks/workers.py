@@ -10,10 +10,14 @@ from ..config.settings import settings
 from ..utils.database import get_db, init_db
 from ..models.database import TokenAnalysis, TokenMetrics, AnalysisTask, TaskStatus, AnalysisStep
 from ..models.schemas import Risk, HeuristicResult
-from ..data.collectors import DataCollector
+from ..data.collectors import DataCollector, drain_background_collections
+from ..data.transfer_indexer import transfer_indexer
 from ..analyzers.heuristic_engine import HeuristicEngine
 from ..analyzers.ml_detector import MLScamDetector
 from ..analyzers.smart_money_tracker import SmartMoneyTracker
+from ..utils.cache import token_cache
+from ..utils.http_client import http_clients
+from ..utils.redis_client import close_redis
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +44,10 @@ celery_app.conf.update(
             'task': 'src.tasks.workers.update_token_metrics',
             'schedule': crontab(minute='*/30'),  # Every 30 minutes
         },
+        'refresh-transfer-index': {
+            'task': 'src.tasks.workers.refresh_transfer_index',
+            'schedule': crontab(minute='*/10'),  # Every 10 minutes
+        },
         'cleanup-old-data': {
             'task': 'src.tasks.workers.cleanup_old_data',
             'schedule': crontab(hour=2, minute=0),  # Daily at 2 AM
@@ -47,6 +55,19 @@ celery_app.conf.update(
     }
 )
 
+def _run_async(coro):
+    """Run a coroutine on a fresh event loop, releasing loop-bound clients afterwards."""
+    async def _runner():
+        try:
+            return await coro
+        finally:
+            # asyncio.run() cancels whatever is left; let stragglers cache their output first
+            await drain_background_collections(settings.WORKER_DRAIN_TIMEOUT)
+            await token_cache.close()
+            await http_clients.close()
+            await close_redis()
+    return asyncio.run(_runner())
+
 async def update_task_status(task_id: UUID, status: TaskStatus = None, step: AnalysisStep = None, progress: int = None, intermediate_results: Dict = None):
     """Update the status of an analysis task."""
     async with get_db() as db:
@@ -73,7 +94,7 @@ async def update_task_status(task_id: UUID, status: TaskStatus = None, step: Ana
 def run_analysis_task(task_id_str: str):
     """The main Celery task to run a full token analysis."""
     task_id = UUID(task_id_str)
-    asyncio.run(_run_analysis_task(task_id))
+    _run_async(_run_analysis_task(task_id))
 
 async def _run_analysis_task(task_id: UUID):
     """Asynchronous orchestrator for the analysis task."""
@@ -99,7 +120,13 @@ async def _run_analysis_task(task_id: UUID):
         # Step 1: Fetching Data
         await update_task_status(task_id, step=AnalysisStep.FETCHING_DATA, progress=10)
         async with collector:
-            token_data = await collector.collect_all_data(token_address, chain_id)
+            token_data = await collector.collect_all_data(
+                token_address, chain_id,
+                time_budget=settings.ANALYSIS_TIME_BUDGET,
+                max_staleness=settings.PIPELINE_MAX_STALENESS,
+            )
+        # Build up the local holder index for tokens we analyse
+        index_token_transfers.delay(token_address, chain_id)
         
         # Step 2: Heuristic Analysis (step-by-step)
         heuristic_risks = []
@@ -180,7 +207,7 @@ async def _run_analysis_task(task_id: UUID):
 @celery_app.task
 def monitor_trending_tokens():
     """Monitor trending tokens from DEXs"""
-    asyncio.run(_monitor_trending_tokens())
+    _run_async(_monitor_trending_tokens())
 
 async def _monitor_trending_tokens():
     """Get trending tokens and analyze them"""
@@ -200,7 +227,7 @@ async def _monitor_trending_tokens():
 @celery_app.task
 def update_token_metrics():
     """Update metrics for tracked tokens"""
-    asyncio.run(_update_token_metrics())
+    _run_async(_update_token_metrics())
 
 async def _update_token_metrics():
     """Update price and liquidity metrics"""
@@ -215,36 +242,73 @@ async def _update_token_metrics():
             )
             tokens = result.all()
             
+            tokens_by_chain = {}
+            for token_address, chain_id in tokens:
+                tokens_by_chain.setdefault(chain_id, []).append(token_address)
+            
             collector = DataCollector()
             async with collector:
-                for token_address, chain_id in tokens:
-                    try:
-                        # Collect fresh data
-                        data = await collector.collect_dex_data(token_address, chain_id)
-                        
-                        # Store metrics
-                        metrics = TokenMetrics(
-                            token_address=token_address,
-                            chain_id=chain_id,
-                            price_usd=data.get('price_usd', 0),
-                            liquidity_usd=data.get('liquidity_usd', 0),
-                            volume_24h=data.get('volume_24h', 0),
-                            market_cap=data.get('market_cap', 0)
-                        )
-                        db.add(metrics)
-                        
-                    except Exception as e:
-                        print(f"Error updating metrics for {token_address}: {e}")
+                for chain_id, token_addresses in tokens_by_chain.items():
+                    # Collect fresh data in batched DEX requests
+                    dex_data = await collector.collect_dex_data_many(token_addresses, chain_id)
+                    for token_address in token_addresses:
+                        try:
+                            data = dex_data[token_address]
+                            if not data.get('sources') and any(
+                                data.get(key) for key in ('timed_out_sources', 'unavailable_sources', 'failed_sources')
+                            ):
+                                # No source answered for this token; keep its last metrics rather than zeros
+                                continue
+                            
+                            # Store metrics
+                            metrics = TokenMetrics(
+                                token_address=token_address,
+                                chain_id=chain_id,
+                                price_usd=data.get('price_usd', 0),
+                                liquidity_usd=data.get('liquidity_usd', 0),
+                                volume_24h=data.get('volume_24h', 0),
+                                market_cap=data.get('market_cap', 0)
+                            )
+                            db.add(metrics)
+                            
+                        except Exception as e:
+                            print(f"Error updating metrics for {token_address}: {e}")
                 
                 await db.commit()
                 
     except Exception as e:
         print(f"Metrics update error: {e}")
 
+@celery_app.task
+def index_token_transfers(token_address: str, chain_id: int):
+    """Apply a token's new Transfer logs to the local holder index"""
+    _run_async(_index_token_transfers(token_address, chain_id))
+
+async def _index_token_transfers(token_address: str, chain_id: int):
+    try:
+        progress = await transfer_indexer.sync(chain_id, token_address, max_seconds=settings.TRANSFER_INDEX_MAX_SECONDS)
+        if progress and not progress['caught_up'] and not progress.get('conflict'):
+            # Resume from the checkpoint in a fresh task rather than holding a worker
+            index_token_transfers.delay(token_address, chain_id)
+    except Exception as e:
+        print(f"Transfer indexing error for {token_address}: {e}")
+
+@celery_app.task
+def refresh_transfer_index():
+    """Keep indexed tokens close to the chain head"""
+    _run_async(_refresh_transfer_index())
+
+async def _refresh_transfer_index():
+    try:
+        for token_address, chain_id in await transfer_indexer.indexed_tokens():
+            index_token_transfers.delay(token_address, chain_id)
+    except Exception as e:
+        print(f"Transfer index refresh error: {e}")
+
 @celery_app.task
 def cleanup_old_data():
     """Clean up old analysis data"""
-    asyncio.run(_cleanup_old_data())
+    _run_async(_cleanup_old_data())
 
 async def _cleanup_old_data():
     """Remove old records"""
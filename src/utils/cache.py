@@ -1,28 +1,314 @@
-from typing import Optional, Any
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Tuple
+import asyncio
+import heapq
+import math
+import os
+import random
+import sys
 import time
+import uuid
 
-class SimpleCache:
-    """Simple in-memory cache (use Redis in production)"""
-    def __init__(self):
-        self._cache = {}
-        self._ttl = 300  # 5 minutes default
+from ..config.settings import settings
+from .loop_local import LoopLocal
+from .redis_client import get_redis
+from .serialization import dumps, loads
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep size of a cached value, good enough to enforce a memory cap"""
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(_estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(v, _depth + 1) for v in value)
+    return size
+
+
+class BoundedTTLCache:
+    """In-memory LRU cache with per-entry TTL and entry/byte limits.
+
+    Expired entries are removed by a small amortized sweep on every write, so
+    keys that are never read again do not accumulate in long-running
+    processes.
+    """
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: int = 300, sweep_batch: int = 16):
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._expiry_heap = []
+        self._ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_batch = sweep_batch
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
 
     def get(self, key: str) -> Optional[Any]:
-        if key in self._cache:
-            entry = self._cache[key]
+        entry = self._cache.get(key)
+        if entry is not None:
             if time.time() < entry['expires']:
+                self._cache.move_to_end(key)
+                self.hits += 1
                 return entry['value']
-            else:
-                del self._cache[key]
+            self._remove(key)
+            self.expirations += 1
+        self.misses += 1
         return None
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None):
-        self._cache[key] = {
-            'value': value,
-            'expires': time.time() + (ttl or self._ttl)
-        }
+        if key in self._cache:
+            self._remove(key)
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires = time.time() + (ttl or self._ttl)
+        self._cache[key] = {'value': value, 'expires': expires, 'size': size}
+        self.current_bytes += size
+        heapq.heappush(self._expiry_heap, (expires, key))
+        self._sweep_expired()
+        self._evict_over_capacity()
+
+    def delete(self, key: str):
+        if key in self._cache:
+            self._remove(key)
 
     def clear(self):
         self._cache.clear()
+        self._expiry_heap.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._cache.pop(key)
+        self.current_bytes -= entry['size']
+
+    def _sweep_expired(self):
+        now = time.time()
+        for _ in range(self.sweep_batch):
+            if not self._expiry_heap or self._expiry_heap[0][0] > now:
+                break
+            expires, key = heapq.heappop(self._expiry_heap)
+            entry = self._cache.get(key)
+            # Skip heap records left behind by overwritten keys
+            if entry is not None and entry['expires'] == expires:
+                self._remove(key)
+                self.expirations += 1
+        if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [(e['expires'], k) for k, e in self._cache.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _evict_over_capacity(self):
+        while self._cache and (len(self._cache) > self.max_entries or self.current_bytes > self.max_bytes):
+            _, entry = self._cache.popitem(last=False)
+            self.current_bytes -= entry['size']
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._cache)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._cache),
+            'bytes': self.current_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+cache = BoundedTTLCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    default_ttl=settings.CACHE_DEFAULT_TTL,
+)
+
+
+class TwoTierCache:
+    """In-process L1 in front of a Redis L2 shared by the API and all workers.
+
+    Writes go to both tiers and publish an invalidation so other processes
+    drop their L1 copy. L1 entries are also capped at L1_MAX_TTL so a missed
+    invalidation can only serve stale data briefly.
+
+    Entries are kept for CACHE_STALE_GRACE past their TTL so callers that
+    tolerate staleness can be served while one caller refreshes the value
+    (see lookup()).
+    """
+    def __init__(self, l1: BoundedTTLCache, settings, prefix: str = "moneygrow:cache"):
+        self.l1 = l1
+        self.settings = settings
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self._instance_pid = None
+        self._instance_id = None
+        self._listeners = LoopLocal(lambda: asyncio.ensure_future(self._listen()))
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.l2_errors = 0
+        self.invalidations_received = 0
+        self.stale_served = 0
+        self.early_refreshes = 0
+        self.negative_hits = 0
+
+    @property
+    def instance_id(self) -> str:
+        """Tags this process's invalidations; regenerated after a fork so workers don't share it"""
+        pid = os.getpid()
+        if self._instance_pid != pid:
+            self._instance_pid = pid
+            self._instance_id = uuid.uuid4().hex
+        return self._instance_id
+
+    def _l2_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def _get_entry(self, key: str) -> Optional[Dict]:
+        entry = self.l1.get(key)
+        if entry is not None:
+            self.l1_hits += 1
+            return entry
+        self._listeners.get()
+        try:
+            redis = get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                payload, ttl_ms = await pipe.get(self._l2_key(key)).pttl(self._l2_key(key)).execute()
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"L2 cache error: {e}")
+            self.misses += 1
+            return None
+        if payload is None:
+            self.misses += 1
+            return None
+        self.l2_hits += 1
+        entry = loads(payload)
+        if ttl_ms and ttl_ms > 0:
+            self.l1.set(key, entry, ttl=min(ttl_ms / 1000, self.settings.CACHE_L1_MAX_TTL))
+        return entry
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the value only while it is fresh"""
+        value, _ = await self.lookup(key)
+        return value
+
+    async def lookup(self, key: str, max_staleness: float = 0.0) -> Tuple[Optional[Any], bool]:
+        """Return (value, should_refresh).
+
+        A value up to max_staleness seconds past its TTL is still returned,
+        with should_refresh set. Fresh values also ask for a refresh with a
+        probability that rises as expiry approaches, weighted by how long the
+        value took to compute (XFetch), so hot keys are refreshed before they
+        expire rather than all at once after.
+        """
+        entry = await self._get_entry(key)
+        if entry is None:
+            return None, False
+        if entry.get('negative'):
+            self.negative_hits += 1
+        age = time.time() - entry['created']
+        if age > entry['ttl']:
+            if age > entry['ttl'] + max_staleness:
+                return None, False
+            self.stale_served += 1
+            return entry['value'], True
+        beta = self.settings.CACHE_EARLY_REFRESH_BETA
+        if beta > 0 and age - entry['delta'] * beta * math.log(1.0 - random.random()) >= entry['ttl']:
+            self.early_refreshes += 1
+            return entry['value'], True
+        return entry['value'], False
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, delta: float = 0.0,
+                  negative: Optional[str] = None):
+        """Store a value; delta is how long it took to compute (seconds).
+
+        negative names why the value records the absence of data (no pairs,
+        not a contract, ...); such entries are counted in negative_hits.
+        """
+        ttl = ttl or self.settings.CACHE_DEFAULT_TTL
+        entry = {'value': value, 'created': time.time(), 'ttl': ttl, 'delta': delta}
+        if negative:
+            entry['negative'] = negative
+        expire = ttl + self.settings.CACHE_STALE_GRACE
+        self.l1.set(key, entry, ttl=min(expire, self.settings.CACHE_L1_MAX_TTL))
+        self._listeners.get()
+        try:
+            redis = get_redis()
+            await redis.set(self._l2_key(key), dumps(entry), px=int(expire * 1000))
+            await redis.publish(self.channel, dumps([self.instance_id, key]))
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"L2 cache error: {e}")
+
+    async def claim_refresh(self, key: str) -> bool:
+        """Take the cross-process lease to refresh key; True if this caller should do it"""
+        try:
+            redis = get_redis()
+            return bool(await redis.set(
+                f"{self.prefix}:refresh:{key}", self.instance_id,
+                nx=True, px=int(self.settings.CACHE_REFRESH_LOCK_TTL * 1000),
+            ))
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"L2 cache error: {e}")
+            return True
+
+    async def delete(self, key: str):
+        self.l1.delete(key)
+        try:
+            redis = get_redis()
+            await redis.delete(self._l2_key(key))
+            await redis.publish(self.channel, dumps([self.instance_id, key]))
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"L2 cache error: {e}")
+
+    async def _listen(self):
+        """Drop L1 entries that another process has overwritten or deleted"""
+        while True:
+            try:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(self.channel)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get('type') != 'message':
+                            continue
+                        origin, key = loads(message['data'])
+                        if origin != self.instance_id:
+                            self.invalidations_received += 1
+                            self.l1.delete(key)
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(5)
+
+    async def close(self):
+        listener = self._listeners.pop()
+        if listener is not None:
+            listener.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            'l1_hits': self.l1_hits,
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'l2_errors': self.l2_errors,
+            'invalidations_received': self.invalidations_received,
+            'stale_served': self.stale_served,
+            'early_refreshes': self.early_refreshes,
+            'negative_hits': self.negative_hits,
+            'l1': self.l1.stats(),
+        }
+
 
-cache = SimpleCache()
+token_cache = TwoTierCache(cache, settings)
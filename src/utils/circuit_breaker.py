@@ -0,0 +1,140 @@
+import asyncio
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+import aiohttp
+
+from ..config.settings import settings
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose breaker is open"""
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"Circuit open for {name}")
+
+
+class UpstreamError(Exception):
+    """A source answered, but with a failure (5xx, exhausted throttling, API error)"""
+
+
+class RequestError(Exception):
+    """A healthy source could not serve this particular request (e.g. a JSON-RPC error)"""
+
+
+# Only these say the source itself is unhealthy; local throttling and other
+# errors raised before a request reached the source are not held against it.
+SOURCE_FAILURES = (UpstreamError, asyncio.TimeoutError, aiohttp.ClientError)
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one external source.
+
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail fast. Once recovery_timeout has passed a limited number of probe
+    calls are let through; a successful probe closes the breaker, a failed
+    one re-opens it.
+    """
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.rejected_calls = 0
+        self.total_failures = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self.half_open_calls = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and self.half_open_calls < self.half_open_max_calls:
+            self.half_open_calls += 1
+            return True
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self):
+        self._state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.half_open_calls = 0
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        if self._state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+            self.half_open_calls = 0
+
+    async def __aenter__(self):
+        if not self.allow_request():
+            raise CircuitOpenError(self.name)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None or issubclass(exc_type, RequestError):
+            self.record_success()
+        elif issubclass(exc_type, SOURCE_FAILURES):
+            self.record_failure()
+        else:
+            # Cancelled or failed on our side; just give the probe slot back.
+            if self._state == CircuitState.HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+        return False
+
+    def snapshot(self) -> Dict:
+        state = self.state
+        return {
+            'state': state.value,
+            'consecutive_failures': self.consecutive_failures,
+            'total_failures': self.total_failures,
+            'rejected_calls': self.rejected_calls,
+            'retry_in_seconds': (
+                round(max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at)), 1)
+                if state == CircuitState.OPEN else None
+            ),
+        }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per (source, chain) pair, created on first use"""
+    def __init__(self, settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, source: str, chain_id: Optional[int] = None) -> CircuitBreaker:
+        name = f"{source}:{chain_id}" if chain_id is not None else source
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                self.settings.CIRCUIT_FAILURE_THRESHOLD,
+                self.settings.CIRCUIT_RECOVERY_TIMEOUT,
+                self.settings.CIRCUIT_HALF_OPEN_MAX_CALLS,
+            )
+            self._breakers[name] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict:
+        return {name: breaker.snapshot() for name, breaker in sorted(self._breakers.items())}
+
+
+breakers = CircuitBreakerRegistry(settings)
@@ -0,0 +1,88 @@
+import aiohttp
+from typing import Dict
+
+from ..config.settings import settings
+from .loop_local import LoopLocal
+
+
+class HTTPClientRegistry:
+    """Shared, long-lived aiohttp sessions (one per event loop) for all collectors.
+
+    Keeping a single connector alive lets every DEX, explorer and GoPlus call
+    reuse pooled keep-alive connections instead of paying a fresh TCP+TLS
+    handshake per request.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self._sessions = LoopLocal(self._create_session)
+        self.stats_counters = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+        }
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.settings.HTTP_POOL_LIMIT,
+            limit_per_host=self.settings.HTTP_POOL_LIMIT_PER_HOST,
+            use_dns_cache=True,
+            ttl_dns_cache=self.settings.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=self.settings.HTTP_KEEPALIVE_TIMEOUT,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.settings.HTTP_TIMEOUT_TOTAL,
+            connect=self.settings.HTTP_TIMEOUT_CONNECT,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[self._trace_config()],
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        def counter(name):
+            async def _increment(session, trace_config_ctx, params):
+                self.stats_counters[name] += 1
+            return _increment
+
+        trace_config.on_request_start.append(counter('requests'))
+        trace_config.on_connection_create_end.append(counter('connections_created'))
+        trace_config.on_connection_reuseconn.append(counter('connections_reused'))
+        trace_config.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        return trace_config
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session for the running event loop."""
+        session = self._sessions.get()
+        if session.closed:
+            self._sessions.pop()
+            session = self._sessions.get()
+        return session
+
+    async def close(self):
+        """Close the session bound to the running event loop, if any."""
+        session = self._sessions.pop()
+        if session and not session.closed:
+            await session.close()
+
+    def stats(self) -> Dict:
+        created = self.stats_counters['connections_created']
+        reused = self.stats_counters['connections_reused']
+        total = created + reused
+        return {
+            **self.stats_counters,
+            'open_sessions': sum(1 for s in self._sessions.values() if not s.closed),
+            'connection_reuse_ratio': reused / total if total > 0 else 0.0,
+        }
+
+
+http_clients = HTTPClientRegistry(settings)
+
+
+async def get_session() -> aiohttp.ClientSession:
+    return await http_clients.get_session()
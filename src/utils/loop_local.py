@@ -0,0 +1,41 @@
+import asyncio
+import weakref
+from typing import Any, Callable, Optional
+
+
+class LoopLocal:
+    """Hold one lazily-created object per running event loop.
+
+    Celery tasks call ``asyncio.run`` for every job, so anything bound to a
+    loop (client sessions, futures, Redis connections) has to be scoped to the
+    loop that is currently running instead of to the process.
+    """
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._values: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    def get(self) -> Any:
+        loop = asyncio.get_running_loop()
+        value = self._values.get(loop)
+        if value is None:
+            value = self._factory()
+            self._values[loop] = value
+        return value
+
+    def peek(self) -> Optional[Any]:
+        """Return the value for the running loop without creating it."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        return self._values.get(loop)
+
+    def pop(self) -> Optional[Any]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        return self._values.pop(loop, None)
+
+    def values(self):
+        return list(self._values.values())
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from ..config.settings import settings
+from .circuit_breaker import UpstreamError
+from .redis_client import get_redis
+
+# Reservation-style token bucket shared by every worker. Each call gets back
+# how long it has to wait before a token becomes valid, and takes that token
+# (the balance may go negative) only if the wait is within ARGV[3]; refused
+# callers leave the bucket untouched. A provider-imposed Retry-After pushes
+# 'blocked_until' forward for everyone.
+_ACQUIRE = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+local blocked_until = tonumber(data[3]) or 0
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < 1 then wait = (1 - tokens) / rate end
+if blocked_until - now > wait then wait = blocked_until - now end
+if wait <= max_wait then tokens = tokens - 1 end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(wait)
+"""
+
+_BLOCK = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local until_ts = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if until_ts > current then redis.call('HSET', KEYS[1], 'blocked_until', until_ts) end
+redis.call('EXPIRE', KEYS[1], 3600)
+return 1
+"""
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a source would make us wait longer than RATE_LIMIT_MAX_WAIT"""
+
+
+class TokenBucket:
+    """In-process token bucket used when Redis is unavailable"""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self, rate: float, max_wait: float) -> float:
+        """Wait until a token is valid; the token is only taken if that is within max_wait"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        wait = max((1 - self.tokens) / rate if self.tokens < 1 else 0.0, self.blocked_until - now)
+        if wait <= max_wait:
+            self.tokens -= 1
+        return wait
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Per-source, per-API-key request pacing with adaptive backoff.
+
+    Budgets are shared across processes through Redis. On a throttled
+    response the effective rate for that bucket is halved (and restored
+    gradually on success), and any Retry-After is honoured by all workers.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self._local_buckets: Dict[str, TokenBucket] = {}
+        self._factors: Dict[str, float] = {}
+        self.counters = {'requests': 0, 'throttled': 0, 'retries': 0, 'waited_seconds': 0.0}
+
+    def _configured_rate(self, source: str) -> float:
+        return {
+            'etherscan': self.settings.ETHERSCAN_RATE_LIMIT,
+            'bscscan': self.settings.BSCSCAN_RATE_LIMIT,
+            'goplus': self.settings.GOPLUS_RATE_LIMIT,
+        }.get(source, self.settings.DEFAULT_RATE_LIMIT)
+
+    def _bucket_key(self, source: str, api_key: Optional[str]) -> str:
+        key_hash = hashlib.sha1((api_key or '').encode()).hexdigest()[:12]
+        return f"moneygrow:ratelimit:{source}:{key_hash}"
+
+    def _effective_rate(self, bucket_key: str, source: str) -> float:
+        return self._configured_rate(source) * self._factors.get(bucket_key, 1.0)
+
+    async def acquire(self, source: str, api_key: Optional[str] = None):
+        bucket_key = self._bucket_key(source, api_key)
+        rate = self._effective_rate(bucket_key, source)
+        capacity = max(1.0, self._configured_rate(source) * self.settings.RATE_LIMIT_BURST_SECONDS)
+        try:
+            wait = float(await get_redis().eval(
+                _ACQUIRE, 1, bucket_key, rate, capacity, self.settings.RATE_LIMIT_MAX_WAIT
+            ))
+        except Exception as e:
+            print(f"Rate limiter Redis error, using local bucket: {e}")
+            bucket = self._local_buckets.setdefault(bucket_key, TokenBucket(rate, capacity))
+            wait = bucket.reserve(rate, self.settings.RATE_LIMIT_MAX_WAIT)
+        # A refused reservation took no token, so rejected calls do not push the bucket further back
+        if wait > self.settings.RATE_LIMIT_MAX_WAIT:
+            raise RateLimitExceeded(f"{source} budget exhausted for {wait:.1f}s")
+        if wait > 0:
+            self.counters['waited_seconds'] += wait
+            await asyncio.sleep(wait)
+
+    async def record_throttled(self, source: str, api_key: Optional[str], retry_after: Optional[float]):
+        bucket_key = self._bucket_key(source, api_key)
+        self.counters['throttled'] += 1
+        self._factors[bucket_key] = max(
+            self.settings.RATE_LIMIT_MIN_FACTOR, self._factors.get(bucket_key, 1.0) * 0.5
+        )
+        block_for = retry_after if retry_after is not None else 1.0 / self._effective_rate(bucket_key, source)
+        try:
+            await get_redis().eval(_BLOCK, 1, bucket_key, block_for)
+        except Exception:
+            self._local_buckets.setdefault(bucket_key, TokenBucket(1.0, 1.0)).block(block_for)
+
+    def record_success(self, source: str, api_key: Optional[str]):
+        bucket_key = self._bucket_key(source, api_key)
+        factor = self._factors.get(bucket_key)
+        if factor is not None:
+            factor = min(1.0, factor + 0.05)
+            if factor >= 1.0:
+                self._factors.pop(bucket_key)
+            else:
+                self._factors[bucket_key] = factor
+
+    async def get_json(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        source: str,
+        api_key: Optional[str] = None,
+        **kwargs,
+    ) -> Tuple[int, Optional[Any]]:
+        """GET a JSON endpoint under the source's budget, retrying throttled responses.
+
+        Returns (status, data); data is None when the body is not JSON.
+        Raises UpstreamError if the source is still throttling after the last
+        retry, so a throttled body is never mistaken for an answer.
+        """
+        for attempt in range(self.settings.RATE_LIMIT_MAX_RETRIES + 1):
+            if attempt:
+                self.counters['retries'] += 1
+            await self.acquire(source, api_key)
+            self.counters['requests'] += 1
+            async with session.get(url, **kwargs) as response:
+                status = response.status
+                retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+                try:
+                    data = await response.json(content_type=None)
+                except Exception:
+                    data = None
+            if not _is_throttled(status, data):
+                self.record_success(source, api_key)
+                return status, data
+            await self.record_throttled(source, api_key, retry_after)
+        raise UpstreamError(f"{source} still throttled after {self.settings.RATE_LIMIT_MAX_RETRIES} retries")
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            'backed_off_buckets': {k.split(':', 2)[2]: round(v, 3) for k, v in self._factors.items()},
+        }
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def _is_throttled(status: int, data: Any) -> bool:
+    if status == 429:
+        return True
+    if isinstance(data, dict):
+        # Etherscan/BscScan answer HTTP 200 with a NOTOK body when throttling.
+        result = data.get('result')
+        if data.get('status') == '0' and isinstance(result, str) and 'rate limit' in result.lower():
+            return True
+        # GoPlus signals throttling through its own error code.
+        if data.get('code') == 4029:
+            return True
+    return False
+
+
+rate_limiter = RateLimiter(settings)
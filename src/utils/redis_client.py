@@ -0,0 +1,17 @@
+import redis.asyncio as aioredis
+
+from ..config.settings import settings
+from .loop_local import LoopLocal
+
+_clients = LoopLocal(lambda: aioredis.from_url(settings.REDIS_URL))
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the Redis client bound to the running event loop"""
+    return _clients.get()
+
+
+async def close_redis():
+    client = _clients.pop()
+    if client is not None:
+        await client.aclose()
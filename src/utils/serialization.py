@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Any
+
+import msgpack
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_BIGINT = 2
+
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        # isoformat round-trips both naive and timezone-aware values
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, int):
+        # Only called for ints outside msgpack's 64-bit range, e.g. raw uint256 supplies
+        return msgpack.ExtType(_EXT_BIGINT, str(value).encode())
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _ext_hook(code: int, data: bytes):
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_BIGINT:
+        return int(data)
+    return msgpack.ExtType(code, data)
+
+
+def dumps(value: Any) -> bytes:
+    """Compact binary encoding of token data for Redis, preserving datetimes and big ints"""
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
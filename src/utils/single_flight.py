@@ -0,0 +1,130 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from .loop_local import LoopLocal
+from .redis_client import get_redis
+from .serialization import dumps, loads
+
+# Only delete the lock if we still own it.
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight execution"""
+    def __init__(self):
+        self._inflight = LoopLocal(dict)
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        inflight = self._inflight.get()
+        self.calls += 1
+        future = inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(fn())
+        inflight[key] = future
+        future.add_done_callback(lambda f: inflight.pop(key, None))
+        # Shield so a cancelled leader does not cancel the work its followers await.
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict:
+        return {'calls': self.calls, 'coalesced': self.coalesced}
+
+
+class DistributedSingleFlight:
+    """Single-flight across processes using a Redis lock and result publish.
+
+    Calls are first coalesced in-process. The local leader then tries to take
+    a Redis lock; the lock owner runs the work and publishes the result, and
+    every other process waits for that publish instead of repeating the work.
+    If Redis is unreachable or the owner does not publish in time, the caller
+    falls back to running the work itself.
+    """
+    def __init__(self, prefix: str, settings):
+        self.prefix = prefix
+        self.settings = settings
+        self.local = SingleFlight()
+        self.remote_coalesced = 0
+        self.remote_timeouts = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await self.local.do(key, lambda: self._do_distributed(key, fn))
+
+    async def _do_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key = f"{self.prefix}:lock:{key}"
+        result_key = f"{self.prefix}:result:{key}"
+        token = uuid.uuid4().hex
+        try:
+            redis = get_redis()
+            acquired = await redis.set(lock_key, token, nx=True, px=int(self.settings.SINGLE_FLIGHT_LOCK_TTL * 1000))
+        except Exception as e:
+            print(f"Single-flight Redis error: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+                try:
+                    payload = dumps(result)
+                    await redis.set(result_key, payload, px=int(self.settings.SINGLE_FLIGHT_RESULT_TTL * 1000))
+                    await redis.publish(result_key, payload)
+                except Exception as e:
+                    # Waiting processes time out and collect for themselves
+                    print(f"Single-flight publish error: {e}")
+                return result
+            finally:
+                try:
+                    await redis.eval(_RELEASE_LOCK, 1, lock_key, token)
+                except Exception as e:
+                    print(f"Single-flight lock release error: {e}")
+
+        result = await self._wait_for_result(redis, result_key)
+        if result is not None:
+            self.remote_coalesced += 1
+            return result
+        self.remote_timeouts += 1
+        return await fn()
+
+    async def _wait_for_result(self, redis, result_key: str) -> Any:
+        try:
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(result_key)
+        except Exception as e:
+            print(f"Single-flight subscribe error: {e}")
+            return None
+        try:
+            # The owner may have published before we subscribed.
+            payload = await redis.get(result_key)
+            if payload is not None:
+                return loads(payload)
+            deadline = time.monotonic() + self.settings.SINGLE_FLIGHT_WAIT_TIMEOUT
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message and message.get('type') == 'message':
+                    return loads(message['data'])
+            return None
+        except Exception as e:
+            print(f"Single-flight wait error: {e}")
+            return None
+        finally:
+            try:
+                await pubsub.unsubscribe(result_key)
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict:
+        return {
+            **self.local.stats(),
+            'remote_coalesced': self.remote_coalesced,
+            'remote_timeouts': self.remote_timeouts,
+        }
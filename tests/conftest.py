@@ -0,0 +1,24 @@
+import os
+
+# Settings() requires an Etherscan key; tests never call the real API
+os.environ.setdefault('ETHERSCAN_API_KEY', 'test')
+
+import fakeredis
+import pytest
+
+from src.utils import redis_client
+from src.utils.cache import token_cache
+from src.utils.http_client import http_clients
+
+
+@pytest.fixture
+async def fake_redis(monkeypatch):
+    """Point every get_redis() call at one in-memory Redis server"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_client._clients, '_factory', lambda: fakeredis.aioredis.FakeRedis(server=server))
+    token_cache.l1.clear()
+    yield server
+    await token_cache.close()
+    await http_clients.close()
+    await redis_client.close_redis()
+    token_cache.l1.clear()
@@ -0,0 +1,23 @@
+"""Small runs of the benchmarks in benchmarks/, checking the property each one measures"""
+from benchmarks import collector_construction, rpc_concurrency, source_scan_corpus
+
+
+async def test_async_rpc_reads_overlap_and_do_not_block_the_loop():
+    results = await rpc_concurrency.run(calls=10, latency=0.05)
+    sync, pooled = results['sync_provider'], results['async_pool']
+    # Ten sequential roundtrips block the loop for their whole duration
+    assert sync['max_loop_stall'] >= 0.4
+    assert pooled['max_loop_stall'] < 0.2
+    assert pooled['seconds'] < sync['seconds'] / 3
+
+
+def test_collector_construction_builds_no_providers():
+    results = collector_construction.run(iterations=50)
+    assert results['chains_initialized'] == []
+    assert results['collector_seconds'] < results['eager_providers_seconds']
+
+
+def test_source_scanner_matches_a_regex_pass_and_outruns_it():
+    results = source_scan_corpus.run(contracts=30)
+    assert results['mismatches'] == 0
+    assert results['scanner_seconds'] < results['trie_regex_seconds']
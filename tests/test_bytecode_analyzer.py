@@ -0,0 +1,44 @@
+from src.analyzers.bytecode_analyzer import BytecodeAnalyzer, SELECTOR_FILE, SelectorIndex, scan_bytecode
+
+# solc-style dispatcher: CALLDATALOAD, SHR 0xe0, then DUP1 PUSH4 <selector> EQ PUSH2 <dest> JUMPI per function
+DISPATCHER = bytes.fromhex(
+    '6080604052348015600f57600080fd5b50'
+    '600436106100415760003560e01c'
+    '806340c10f1914610046578063'  # mint(address,uint256)
+    '8456cb5914610058578063'  # pause()
+    'a9059cbb1461006a57'  # transfer(address,uint256)
+    '5b600080fd'
+    # PUSH32 whose data happens to contain PUSH4 .. EQ; must not be read as code
+    '7f00000000000000000000000063f9f92be41400000000000000000000000000000000'
+    '00'
+)
+# CBOR metadata (ipfs hash, solc version) with its 2-byte length suffix
+METADATA = bytes.fromhex('a2646970667358221220' + 'ff' * 32 + '64736f6c63430008140033')
+
+
+def test_dispatcher_selectors_are_found():
+    selectors, opcodes = scan_bytecode(DISPATCHER)
+    assert selectors == [0x40c10f19, 0x8456cb59, 0xa9059cbb]
+    assert 0xff not in opcodes
+
+
+def test_known_bytecode_capabilities():
+    analyzer = BytecodeAnalyzer(SelectorIndex(SELECTOR_FILE))
+    result = analyzer.analyze(DISPATCHER + METADATA)
+    assert result['bytecode_selector_count'] == 3
+    assert 'mint(address,uint256)' in result['bytecode_functions']
+    assert result['bytecode_capabilities'] == ['mint', 'pause']
+
+
+def test_metadata_is_not_disassembled():
+    # The 0xff bytes of the metadata hash would otherwise look like SELFDESTRUCT
+    _, opcodes = scan_bytecode(DISPATCHER + METADATA)
+    assert 0xff not in opcodes
+    _, opcodes = scan_bytecode(DISPATCHER + bytes([0xf4, 0xff]))
+    assert {0xf4, 0xff} <= opcodes
+
+
+def test_selector_index_lookup():
+    index = SelectorIndex(SELECTOR_FILE)
+    assert index.lookup(0xa9059cbb) == 'transfer(address,uint256)'
+    assert index.lookup(0x00000001) is None
@@ -0,0 +1,102 @@
+from src.utils import cache as module
+from src.utils.cache import BoundedTTLCache, token_cache
+
+
+def test_instance_id_is_per_process(monkeypatch):
+    parent = token_cache.instance_id
+    assert token_cache.instance_id == parent
+    # A forked worker sees the parent's object but a different pid
+    monkeypatch.setattr(module.os, 'getpid', lambda: -1)
+    child = token_cache.instance_id
+    assert child != parent
+    assert token_cache.instance_id == child
+
+
+def _clock(monkeypatch, start=1_000_000.0):
+    now = [start]
+    monkeypatch.setattr(module.time, 'time', lambda: now[0])
+    return now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = BoundedTTLCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_byte_cap_evicts_oldest_and_rejects_oversized_values():
+    value = 'x' * 1000
+    size = module._estimate_size(value)
+    cache = BoundedTTLCache(max_bytes=size * 2 + size // 2)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, value)
+    assert cache.get('a') is None
+    assert len(cache) == 2 and cache.current_bytes == size * 2
+    cache.set('huge', 'x' * (size * 3))
+    assert cache.get('huge') is None
+    assert cache.current_bytes == size * 2
+
+
+def test_expired_entries_are_swept_without_being_read(monkeypatch):
+    now = _clock(monkeypatch)
+    cache = BoundedTTLCache(sweep_batch=16)
+    for i in range(10):
+        cache.set(f"old{i}", i, ttl=1)
+    now[0] += 2
+    cache.set('new', 'value', ttl=60)
+    assert len(cache) == 1
+    assert cache.expirations == 10
+
+
+def test_overwritten_key_is_not_swept_by_its_old_expiry(monkeypatch):
+    now = _clock(monkeypatch)
+    cache = BoundedTTLCache()
+    cache.set('key', 'short', ttl=1)
+    cache.set('key', 'long', ttl=60)
+    now[0] += 2
+    cache.set('other', 'value')
+    assert cache.get('key') == 'long'
+
+
+async def test_stale_value_is_served_within_max_staleness(fake_redis, monkeypatch):
+    monkeypatch.setattr(token_cache.settings, 'CACHE_EARLY_REFRESH_BETA', 0.0)
+    now = _clock(monkeypatch)
+    await token_cache.set('swr', 'value', ttl=60)
+    assert await token_cache.lookup('swr', max_staleness=30) == ('value', False)
+
+    now[0] += 75
+    token_cache.l1.clear()
+    served = token_cache.stale_served
+    assert await token_cache.lookup('swr', max_staleness=30) == ('value', True)
+    assert token_cache.stale_served == served + 1
+    assert await token_cache.get('swr') is None
+
+    now[0] += 30
+    assert await token_cache.lookup('swr', max_staleness=30) == (None, False)
+
+
+async def test_xfetch_refreshes_expensive_values_early(fake_redis, monkeypatch):
+    monkeypatch.setattr(token_cache.settings, 'CACHE_EARLY_REFRESH_BETA', 1.0)
+    now = _clock(monkeypatch)
+    await token_cache.set('cheap', 'value', ttl=60, delta=0.01)
+    await token_cache.set('expensive', 'value', ttl=60, delta=10.0)
+    now[0] += 50
+    # -log(1 - 0.99) ~= 4.6, so the early-refresh window is about 4.6 * delta
+    monkeypatch.setattr(module.random, 'random', lambda: 0.99)
+    assert await token_cache.lookup('cheap') == ('value', False)
+    early = token_cache.early_refreshes
+    assert await token_cache.lookup('expensive') == ('value', True)
+    assert token_cache.early_refreshes == early + 1
+
+
+
+async def test_negative_entries_are_counted_on_hit(fake_redis):
+    await token_cache.set('neg', {}, ttl=60, negative='no_pairs')
+    hits = token_cache.negative_hits
+    assert await token_cache.get('neg') == {}
+    assert token_cache.negative_hits == hits + 1
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from src.data.rpc_pool import RPCError, RPCResponseError
+from src.utils.circuit_breaker import CircuitBreaker, CircuitState, UpstreamError
+from src.utils.rate_limiter import RateLimitExceeded
+
+
+async def _fail(breaker, error):
+    with pytest.raises(type(error)):
+        async with breaker:
+            raise error
+
+
+@pytest.mark.parametrize('error', [
+    UpstreamError('HTTP 503'),
+    RPCError('All RPC endpoints failed'),
+    asyncio.TimeoutError(),
+])
+async def test_source_failures_open_the_breaker(error):
+    breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=30)
+    for _ in range(3):
+        await _fail(breaker, error)
+    assert breaker.state == CircuitState.OPEN
+
+
+@pytest.mark.parametrize('error', [
+    RateLimitExceeded('etherscan budget exhausted for 40.0s'),
+    RPCResponseError({'code': -32000, 'message': 'missing trie node'}),
+    ValueError('bad input'),
+])
+async def test_local_and_request_errors_are_not_recorded(error):
+    breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=30)
+    for _ in range(10):
+        await _fail(breaker, error)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.total_failures == 0
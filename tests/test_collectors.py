@@ -0,0 +1,209 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from src.config.settings import settings
+from src.data import collectors as module
+from src.data.collectors import COLLECTORS, DataCollector, drain_background_collections
+from src.data.dex_integrations import DexScreenerIntegration
+from src.utils.cache import token_cache
+from src.utils.circuit_breaker import UpstreamError
+
+TOKEN = '0x1111111111111111111111111111111111111111'
+
+
+async def test_collect_all_data_keeps_uint256_supply(fake_redis, monkeypatch):
+    collector = DataCollector()
+
+    async def chain_state(token_address, chain_id):
+        return {'latest_block': 19_000_000, 'onchain_total_supply': 10 ** 27}
+
+    async def empty(token_address, chain_id):
+        return {}
+
+    monkeypatch.setattr(collector, '_collectors', lambda: {
+        name: chain_state if name == 'chain_state' else empty for name in COLLECTORS
+    })
+    data = await collector.collect_all_data(TOKEN, 1)
+    assert data['onchain_total_supply'] == 10 ** 27
+
+    # The Redis copy round-trips the big int too
+    token_cache.l1.clear()
+    cached = await token_cache.get(f"1:{TOKEN.lower()}:chain_state")
+    assert cached['onchain_total_supply'] == 10 ** 27
+
+
+async def test_throttled_security_source_is_missing_not_honeypot(fake_redis, monkeypatch):
+    collector = DataCollector()
+
+    async def contract(token_address, chain_id):
+        return {'latest_block': 19_000_000, 'is_contract': True}
+
+    async def throttled(token_address, chain_id):
+        raise UpstreamError("goplus still throttled after 3 retries")
+
+    async def empty(token_address, chain_id):
+        return {}
+
+    monkeypatch.setattr(collector, '_collectors', lambda: {
+        'contract': contract, 'security': throttled,
+        **{name: empty for name in COLLECTORS if name not in ('contract', 'security')},
+    })
+    data = await collector.collect_all_data(TOKEN, 1)
+    assert 'security' in data['missing_sources']
+    assert 'is_honeypot' not in data and 'sell_tax' not in data
+    assert await token_cache.get(f"1:{TOKEN.lower()}:security") is None
+
+
+async def test_callers_joining_a_collection_keep_their_own_budget(fake_redis, monkeypatch):
+    collector = DataCollector()
+
+    async def slow_contract(token_address, chain_id):
+        await asyncio.sleep(1)
+        return {'latest_block': 19_000_000, 'is_contract': True}
+
+    async def etherscan(token_address, chain_id):
+        return {'contract_name': 'Token', 'contract_verified': True}
+
+    async def empty(token_address, chain_id):
+        return {}
+
+    monkeypatch.setattr(collector, '_collectors', lambda: {
+        'contract': slow_contract, 'etherscan': etherscan,
+        **{name: empty for name in COLLECTORS if name not in ('contract', 'etherscan')},
+    })
+    leader = asyncio.ensure_future(collector.collect_all_data(TOKEN, 1))
+    await asyncio.sleep(0)
+    started = time.monotonic()
+    data = await collector.collect_all_data(TOKEN, 1, time_budget=0.2)
+    assert time.monotonic() - started < 0.8
+    assert 'contract' in data['missing_sources']
+    assert data['contract_name'] == 'Token'
+
+    await drain_background_collections(5)
+    assert (await leader)['latest_block'] == 19_000_000
+    assert await token_cache.get(f"1:{TOKEN.lower()}:contract") is not None
+
+
+async def test_each_part_is_reused_for_its_own_ttl(fake_redis, monkeypatch):
+    collector = DataCollector()
+    monkeypatch.setattr(settings, 'CACHE_EARLY_REFRESH_BETA', 0.0)
+    calls = {name: 0 for name in COLLECTORS}
+    outputs = {
+        'dex': {'sources': ['dexscreener'], 'liquidity_usd': 50_000.0},
+        'contract': {'is_contract': True, 'contract_created_at': datetime(2024, 1, 1),
+                     'contract_age_estimate': False},
+        'chain_state': {'latest_block': 19_000_000, 'onchain_owner': '0x' + '22' * 20},
+    }
+
+    def counted(name):
+        async def collect(token_address, chain_id):
+            calls[name] += 1
+            return outputs.get(name, {})
+        return collect
+
+    monkeypatch.setattr(collector, '_collectors', lambda: {name: counted(name) for name in COLLECTORS})
+    await collector.collect_all_data(TOKEN, 1)
+
+    # Two minutes on, dex (30s) and chain_state (60s) are stale; contract (24h) is not
+    now = time.time() + 120
+    monkeypatch.setattr(time, 'time', lambda: now)
+    data = await collector.collect_all_data(TOKEN, 1)
+    assert calls['dex'] == calls['chain_state'] == 2
+    assert calls['contract'] == 1
+    assert data['contract_created_at'] == datetime(2024, 1, 1)
+    assert data['latest_block'] == 19_000_000
+
+
+async def test_estimated_creation_date_is_not_cached(fake_redis, monkeypatch):
+    collector = DataCollector()
+
+    async def contract(token_address, chain_id):
+        return {'is_contract': True, 'contract_created_at': datetime(2024, 1, 1),
+                'contract_age_estimate': True}
+
+    async def empty(token_address, chain_id):
+        return {}
+
+    monkeypatch.setattr(collector, '_collectors', lambda: {
+        name: contract if name == 'contract' else empty for name in COLLECTORS
+    })
+    await collector.collect_all_data(TOKEN, 1)
+    assert await token_cache.get(f"1:{TOKEN.lower()}:contract") is None
+
+
+@pytest.fixture
+async def dexscreener():
+    """DexScreener stand-in answering with the status and body the test sets"""
+    state = {'status': 200, 'body': {'pairs': None}, 'requests': 0}
+
+    async def tokens(request):
+        state['requests'] += 1
+        return web.json_response(state['body'], status=state['status'])
+
+    app = web.Application()
+    app.router.add_get('/tokens/{addresses}', tokens)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    state['url'] = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    yield state
+    await runner.cleanup()
+
+
+def _dex_only_collector(monkeypatch, base_url):
+    collector = DataCollector()
+    integration = DexScreenerIntegration()
+    integration.base_url = base_url
+    collector.dex_aggregator.integrations = []
+    collector.dex_aggregator.register_integration(integration)
+
+    async def empty(token_address, chain_id):
+        return {}
+
+    monkeypatch.setattr(collector, '_collectors', lambda: {
+        name: collector.collect_dex_data if name == 'dex' else empty for name in COLLECTORS
+    })
+    return collector
+
+
+async def test_token_without_pairs_is_negatively_cached(fake_redis, monkeypatch, dexscreener):
+    collector = _dex_only_collector(monkeypatch, dexscreener['url'])
+    await collector.collect_all_data(TOKEN, 1)
+    hits = token_cache.negative_hits
+    await collector.collect_all_data(TOKEN, 1)
+    assert dexscreener['requests'] == 1
+    assert token_cache.negative_hits > hits
+
+
+async def test_unexpected_status_is_not_cached_as_no_pairs(fake_redis, monkeypatch, dexscreener):
+    dexscreener['status'] = 403
+    collector = _dex_only_collector(monkeypatch, dexscreener['url'])
+    data = await collector.collect_all_data(TOKEN, 1)
+    assert data['failed_sources'] == ['dexscreener']
+    assert await token_cache.get(f"1:{TOKEN.lower()}:dex") is None
+    await collector.collect_all_data(TOKEN, 1)
+    assert dexscreener['requests'] == 2
+
+
+async def test_main_pair_reserves_are_read_on_chain(monkeypatch):
+    collector = DataCollector()
+    pair = '0x' + '33' * 20
+    quote = '0x' + 'ee' * 20
+
+    async def aggregated(token_address, chain_id):
+        return {'sources': ['dexscreener'], 'liquidity_usd': 80_000.0, 'pair_address': pair}
+
+    async def read_pair_reserves(chain_id, pair_address):
+        assert pair_address == pair
+        return {'token0': quote, 'token1': TOKEN, 'reserve0': 0, 'reserve1': 10 ** 24}
+
+    monkeypatch.setattr(collector.dex_aggregator, 'get_aggregated_data', aggregated)
+    monkeypatch.setattr(module.onchain_reader, 'read_pair_reserves', read_pair_reserves)
+    data = await collector.collect_dex_data(TOKEN, 1)
+    assert data['pair_token_reserve'] == 10 ** 24
+    assert data['pair_quote_reserve'] == 0
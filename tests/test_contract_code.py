@@ -0,0 +1,49 @@
+from src.config.settings import settings
+from src.data import contract_code as module
+from src.data.contract_code import ContractCodeIndex
+
+# PUSH1 0x80 PUSH1 0x40 MSTORE, then a transfer(address,uint256) selector
+CODE = bytes.fromhex('6080604052' + '63a9059cbb')
+FIRST = '0x' + '11' * 20
+CLONE = '0x' + '22' * 20
+
+
+def _index(monkeypatch):
+    index = ContractCodeIndex(settings, prefix='test:code')
+    fetched = []
+    analyzed = []
+
+    async def get_code(chain_id, token_address):
+        fetched.append(token_address)
+        return CODE
+
+    def analyze(code):
+        analyzed.append(code)
+        return {'bytecode_capabilities': []}
+
+    monkeypatch.setattr(index, 'get_code', get_code)
+    monkeypatch.setattr(module.bytecode_analyzer, 'analyze', analyze)
+    return index, fetched, analyzed
+
+
+async def test_clones_share_one_bytecode_analysis(fake_redis, monkeypatch):
+    index, fetched, analyzed = _index(monkeypatch)
+    first = await index.lookup(1, FIRST)
+    clone = await index.lookup(1, CLONE)
+    assert first['code_hash'] == clone['code_hash']
+    assert (first['clone_count'], clone['clone_count']) == (1, 2)
+    assert len(analyzed) == 1
+
+    analysis = await index.get_bytecode_analysis(1, CLONE, clone['code_hash'])
+    assert analysis == {'bytecode_capabilities': []}
+    assert fetched == [FIRST, CLONE]
+    assert await index.top_clones(1) == [{'code_hash': first['code_hash'], 'address_count': 2}]
+
+
+async def test_repeat_lookups_do_not_count_an_address_twice(fake_redis, monkeypatch):
+    index, fetched, _ = _index(monkeypatch)
+    info = await index.lookup(1, FIRST)
+    assert await index.lookup(1, FIRST.upper().replace('0X', '0x')) == info
+    assert fetched == [FIRST]
+    # Even once the per-address entry has expired
+    assert await index.record_address(1, info['code_hash'], FIRST) == 1
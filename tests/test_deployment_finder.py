@@ -0,0 +1,81 @@
+import math
+import time
+
+from src.config.settings import settings
+from src.data import deployment_finder as module
+from src.data.deployment_finder import DeploymentFinder
+
+TOKEN = '0x1111111111111111111111111111111111111111'
+DEPLOYED_AT = 17_345_678
+LATEST = 19_000_000
+MISSING_TRIE_NODE = {'code': -32000, 'message': 'missing trie node'}
+
+
+class _Pool:
+    """eth_getCode history of one token; without archive data only the head is served"""
+    def __init__(self, archive: bool = True):
+        self.archive = archive
+        self.batches = 0
+
+    def _code(self, block: int) -> dict:
+        if not self.archive and block != LATEST:
+            return {'error': MISSING_TRIE_NODE}
+        return {'result': '0x6080' if block >= DEPLOYED_AT else '0x'}
+
+    async def request(self, method, params=None):
+        if method == 'eth_getBlockByNumber':
+            return {'timestamp': hex(1_700_000_000 + int(params[0], 16))}
+        assert method == 'eth_getCode'
+        response = self._code(int(params[1], 16))
+        if 'error' in response:
+            raise module.RPCResponseError(response['error'])
+        return response['result']
+
+    async def batch_request(self, calls):
+        self.batches += 1
+        return [self._code(int(params[1], 16)) for method, params in calls]
+
+
+def _finder(monkeypatch, pool):
+    finder = DeploymentFinder(settings)
+    stored = []
+
+    async def load(chain_id, token_address):
+        return None
+
+    async def store(chain_id, token_address, deployment):
+        stored.append(deployment)
+
+    monkeypatch.setattr(finder, '_load', load)
+    monkeypatch.setattr(finder, '_store', store)
+    monkeypatch.setattr(module.web3_registry, 'get_pool', lambda chain_id: pool)
+    return finder, stored
+
+
+async def test_k_ary_search_finds_the_first_block_with_code(fake_redis, monkeypatch):
+    pool = _Pool()
+    finder, stored = _finder(monkeypatch, pool)
+    deployment = await finder.get_deployment(1, TOKEN, LATEST)
+    assert deployment == {'block_number': DEPLOYED_AT, 'block_timestamp': 1_700_000_000 + DEPLOYED_AT}
+    assert stored == [deployment]
+    # Each batch shrinks the range (fanout + 1)-fold
+    fanout = settings.DEPLOYMENT_SEARCH_FANOUT
+    assert pool.batches <= math.ceil(math.log(LATEST + 1, fanout + 1)) + 1
+
+    # Later lookups are served from the cache
+    assert await finder.get_deployment(1, TOKEN, LATEST) == deployment
+    assert finder.searches == 1
+
+
+async def test_missing_archive_data_is_retried_later(fake_redis, monkeypatch):
+    finder, stored = _finder(monkeypatch, _Pool(archive=False))
+    assert await finder.get_deployment(1, TOKEN, LATEST) is None
+    assert await finder.get_deployment(1, TOKEN, LATEST) is None
+    assert (finder.searches, finder.unavailable, stored) == (1, 1, [])
+
+    # The "unavailable" marker expires after DEPLOYMENT_RETRY_TTL, not the full TTL
+    later = time.time() + settings.DEPLOYMENT_RETRY_TTL + 1
+    monkeypatch.setattr(time, 'time', lambda: later)
+    monkeypatch.setattr(module.web3_registry, 'get_pool', lambda chain_id: _Pool())
+    assert (await finder.get_deployment(1, TOKEN, LATEST))['block_number'] == DEPLOYED_AT
+    assert finder.searches == 2
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from src.config.settings import settings
+from src.data.dex_integrations import BaseDEXIntegration, DexScreenerIntegration, MultiDEXAggregator
+from src.utils.circuit_breaker import UpstreamError
+
+TOKENS = [f"0x{i:040x}" for i in range(1, 46)]
+
+
+def _pair(address):
+    return {
+        'chainId': 'ethereum',
+        'baseToken': {'address': address},
+        'liquidity': {'usd': 1000},
+        'volume': {'h24': 10},
+        'priceUsd': '1.5',
+        'pairAddress': '0xpair',
+    }
+
+
+def _dexscreener(monkeypatch, failing_chunk=None):
+    integration = DexScreenerIntegration()
+
+    async def fetch_pairs(addresses):
+        if failing_chunk is not None and TOKENS[failing_chunk * 30] in addresses:
+            raise UpstreamError("DexScreener returned HTTP 503")
+        return [_pair(address) for address in addresses]
+
+    monkeypatch.setattr(integration, '_fetch_pairs', fetch_pairs)
+    return integration
+
+
+async def test_failed_chunk_only_drops_its_own_tokens(monkeypatch):
+    data = await _dexscreener(monkeypatch, failing_chunk=1).get_tokens_data(TOKENS, 1)
+    assert set(data) == set(TOKENS[:30])
+    assert data[TOKENS[0]]['liquidity_usd'] == 1000
+
+
+async def test_every_chunk_failing_raises(monkeypatch):
+    integration = _dexscreener(monkeypatch, failing_chunk=0)
+    with pytest.raises(UpstreamError):
+        await integration.get_tokens_data(TOKENS[:30], 1)
+
+
+async def test_tokens_of_a_failed_chunk_are_reported_failed(monkeypatch):
+    aggregator = MultiDEXAggregator(settings)
+    aggregator.integrations = [_dexscreener(monkeypatch, failing_chunk=1)]
+    data = await aggregator.get_aggregated_data_many(TOKENS, 1)
+    assert data[TOKENS[0]]['sources'] == ['dexscreener']
+    assert 'failed_sources' not in data[TOKENS[0]]
+    assert data[TOKENS[40]] == {'failed_sources': ['dexscreener']}
+
+
+class _PerTokenIntegration(BaseDEXIntegration):
+    """No bulk endpoint, like DEXTools: one request per token"""
+    name = 'pertoken'
+
+    def supports_chain(self, chain_id):
+        return True
+
+    async def get_token_data(self, token_address, chain_id):
+        if token_address == TOKENS[1]:
+            raise UpstreamError("HTTP 503")
+        return {'price_usd': 2.0, 'liquidity_usd': 500.0, 'volume_24h': 5.0, 'dex_source': 'pertoken'}
+
+
+async def test_per_token_integration_through_batched_aggregation():
+    aggregator = MultiDEXAggregator(settings)
+    aggregator.integrations = [_PerTokenIntegration()]
+    aggregator.deadlines['pertoken'] = 5
+    data = await aggregator.get_aggregated_data_many(TOKENS[:3], 1)
+    assert data[TOKENS[0]]['sources'] == ['pertoken']
+    assert data[TOKENS[0]]['liquidity_usd'] == 500.0
+    assert 'failed_sources' not in data[TOKENS[2]]
+    assert data[TOKENS[1]] == {'failed_sources': ['pertoken']}
+
+
+async def test_sources_reporting_the_same_pools_are_not_summed():
+    class Gecko(_PerTokenIntegration):
+        name = 'geckoterminal'
+
+        async def get_token_data(self, token_address, chain_id):
+            return {'price_usd': 1.5, 'liquidity_usd': 900.0, 'volume_24h': 12.0, 'dex_source': 'geckoterminal'}
+
+    aggregator = MultiDEXAggregator(settings)
+    aggregator.integrations = [_PerTokenIntegration(), Gecko()]
+    aggregator.deadlines.update({'pertoken': 5, 'geckoterminal': 5})
+    data = await aggregator.get_aggregated_data(TOKENS[0], 1)
+    assert sorted(data['sources']) == ['geckoterminal', 'pertoken']
+    assert data['liquidity_usd'] == 900.0
+    assert data['volume_24h'] == 12.0
+
+
+async def test_fan_out_reports_each_source_status():
+    class Slow(_PerTokenIntegration):
+        name = 'slow'
+
+        async def get_token_data(self, token_address, chain_id):
+            await asyncio.sleep(1)
+
+    aggregator = MultiDEXAggregator(settings)
+    aggregator.integrations = [_PerTokenIntegration(), Slow()]
+    aggregator.deadlines.update({'pertoken': 5, 'slow': 0.05})
+    data = await aggregator.get_aggregated_data(TOKENS[1], 1)
+    assert data == {'timed_out_sources': ['slow'], 'failed_sources': ['pertoken']}
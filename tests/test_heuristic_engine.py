@@ -0,0 +1,33 @@
+from src.analyzers.heuristic_engine import HeuristicEngine
+
+
+async def test_bytecode_capabilities_checked_when_ownership_is_missing():
+    token_data = {
+        'missing_fields': ['ownership_renounced'],
+        'bytecode_capabilities': ['blacklist', 'mint'],
+    }
+    risks = {risk.type for risk in await HeuristicEngine().check_ownership(token_data)}
+    assert risks == {'BLACKLIST_FUNCTION', 'ACTIVE_MINT_FUNCTION'}
+
+
+async def test_unrenounced_ownership_is_flagged():
+    risks = await HeuristicEngine().check_ownership({'ownership_renounced': False})
+    assert [risk.type for risk in risks] == ['CENTRALIZED_OWNERSHIP']
+
+
+async def test_source_flags_count_without_bytecode_capabilities():
+    token_data = {
+        'ownership_renounced': True,
+        'has_blacklist': True,
+        'has_fee_setter': True,
+        'bytecode_capabilities': ['pause'],
+    }
+    risks = {risk.type for risk in await HeuristicEngine().check_ownership(token_data)}
+    assert risks == {'BLACKLIST_FUNCTION', 'ADJUSTABLE_FEES', 'PAUSABLE_TRADING'}
+
+
+async def test_pulled_pool_is_flagged_despite_cached_liquidity():
+    token_data = {'liquidity_usd': 80_000.0, 'market_cap': 1_000_000.0,
+                  'pair_token_reserve': 10 ** 24, 'pair_quote_reserve': 0}
+    risks = await HeuristicEngine().check_liquidity(token_data)
+    assert [risk.type for risk in risks] == ['LIQUIDITY_REMOVED']
@@ -0,0 +1,87 @@
+import pytest
+
+from src.analyzers.concentration import ConcentrationStats
+from src.config.settings import settings
+from src.data.holder_scanner import HolderScanner
+
+TOKEN = '0x1111111111111111111111111111111111111111'
+
+
+def test_equal_holders_have_no_inequality():
+    stats = ConcentrationStats()
+    for i in range(4):
+        stats.add(f"0x{i:040x}", 250)
+    assert stats.hhi() == pytest.approx(2500)
+    assert stats.gini() == pytest.approx(0.0)
+
+
+def test_one_whale_dominates():
+    stats = ConcentrationStats(top_k=3)
+    balances = [10] * 99 + [10 ** 6]
+    for i, balance in enumerate(balances):
+        stats.add(f"0x{i:040x}", balance)
+    stats.add('0xzero', 0)
+    assert stats.count == 100
+    assert stats.top()[0] == (f"0x{99:040x}", 10 ** 6)
+    assert len(stats.top()) == 3
+    # Exact Gini of the same balances
+    ordered = sorted(balances)
+    exact = sum((2 * (i + 1) - len(ordered) - 1) * b for i, b in enumerate(ordered)) / (len(ordered) * sum(ordered))
+    assert stats.gini() == pytest.approx(exact, abs=0.02)
+    # Against a larger supply the same holdings are less concentrated
+    assert stats.hhi(total_supply=2 * stats.total) == pytest.approx(stats.hhi() / 4)
+
+
+def _scanner(monkeypatch, holders, failing_pages=()):
+    monkeypatch.setattr(settings, 'HOLDER_SCAN_PAGE_SIZE', 3)
+    monkeypatch.setattr(settings, 'HOLDER_SCAN_MAX_PAGES', 4)
+    monkeypatch.setattr(settings, 'HOLDER_SCAN_CONCURRENCY', 2)
+    scanner = HolderScanner(settings)
+    requested = []
+
+    async def onchain_supply(chain_id, token_address, stats):
+        return None, {}
+
+    async def fetch_page(page):
+        requested.append(page)
+        if page in failing_pages:
+            return None
+        rows = holders[(page - 1) * 3:page * 3]
+        return [{'TokenHolderAddress': f"0x{i:040x}", 'TokenHolderQuantity': str(balance)}
+                for i, balance in enumerate(rows, start=(page - 1) * 3)]
+
+    monkeypatch.setattr(scanner, '_onchain_supply', onchain_supply)
+    return scanner, fetch_page, requested
+
+
+async def test_short_page_ends_the_scan(fake_redis, monkeypatch):
+    scanner, fetch_page, requested = _scanner(monkeypatch, [100] * 7)
+    result = await scanner.scan(1, TOKEN, fetch_page)
+    assert result['holder_count'] == 7
+    assert result['holder_count_truncated'] is False
+    # Page 4 may have been in flight with page 3, but nothing past it
+    assert max(requested) <= 4
+
+
+async def test_page_limit_truncates_the_holder_count(fake_redis, monkeypatch):
+    scanner, fetch_page, requested = _scanner(monkeypatch, [100] * 20)
+    result = await scanner.scan(1, TOKEN, fetch_page)
+    assert result['holder_count'] == 12
+    assert result['holder_count_truncated'] is True
+    assert sorted(requested) == [1, 2, 3, 4]
+
+    # The result is cached
+    assert await scanner.scan(1, TOKEN, fetch_page) == result
+    assert scanner.scans == 1
+
+
+async def test_failed_page_keeps_earlier_pages_as_truncated(fake_redis, monkeypatch):
+    scanner, fetch_page, _ = _scanner(monkeypatch, [100] * 20, failing_pages={2})
+    result = await scanner.scan(1, TOKEN, fetch_page)
+    assert result['holder_count'] == 3
+    assert result['holder_count_truncated'] is True
+
+
+async def test_unreachable_first_page_gives_no_result(fake_redis, monkeypatch):
+    scanner, fetch_page, _ = _scanner(monkeypatch, [100] * 20, failing_pages={1})
+    assert await scanner.scan(1, TOKEN, fetch_page) is None
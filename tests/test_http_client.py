@@ -0,0 +1,57 @@
+import asyncio
+
+from aiohttp import web
+
+from src.config.settings import settings
+from src.utils.http_client import HTTPClientRegistry
+
+
+def test_one_session_per_event_loop():
+    registry = HTTPClientRegistry(settings)
+
+    async def sessions():
+        first = await registry.get_session()
+        second = await registry.get_session()
+        await registry.close()
+        return first, second
+
+    first, second = asyncio.run(sessions())
+    assert first is second
+    # A new loop (the next Celery task) gets its own session
+    other, _ = asyncio.run(sessions())
+    assert other is not first
+    assert first.closed and other.closed
+
+
+async def test_closed_session_is_replaced():
+    registry = HTTPClientRegistry(settings)
+    session = await registry.get_session()
+    await session.close()
+    replacement = await registry.get_session()
+    assert replacement is not session and not replacement.closed
+    await registry.close()
+
+
+async def test_requests_reuse_keepalive_connections():
+    async def ok(request):
+        return web.json_response({'ok': True})
+
+    app = web.Application()
+    app.router.add_get('/', ok)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    registry = HTTPClientRegistry(settings)
+    try:
+        for _ in range(5):
+            session = await registry.get_session()
+            async with session.get(f"http://127.0.0.1:{port}/") as response:
+                assert (await response.json())['ok']
+        stats = registry.stats()
+        assert stats['connections_created'] == 1
+        assert stats['connections_reused'] == 4
+    finally:
+        await registry.close()
+        await runner.cleanup()
@@ -0,0 +1,84 @@
+from eth_abi import decode, encode
+
+from src.config.settings import settings
+from src.data import onchain_reader as module
+from src.data.onchain_reader import AGGREGATE3_SELECTOR, MULTICALL3_ADDRESS, OnChainReader, encode_call
+
+TOKEN = '0x1111111111111111111111111111111111111111'
+OWNER = '0x000000000000000000000000000000000000dead'
+SUPPLY = 10 ** 27
+
+
+def _returns(calldata: bytes):
+    """What the token returns for each call; None makes the call revert"""
+    if calldata == encode_call('owner()'):
+        return encode(['address'], [OWNER])
+    if calldata == encode_call('totalSupply()'):
+        return encode(['uint256'], [SUPPLY])
+    if calldata[:4] == encode_call('balanceOf(address)')[:4]:
+        # Each holder's balance is its own address as a number
+        return encode(['uint256'], [int.from_bytes(calldata[-20:], 'big')])
+    return None
+
+
+class _Pool:
+    def __init__(self, multicall: bool):
+        self.multicall = multicall
+        self.eth_calls = 0
+        self.batches = []
+
+    async def request(self, method, params=None):
+        if method == 'eth_getCode':
+            assert params[0] == MULTICALL3_ADDRESS
+            return '0x6080' if self.multicall else '0x'
+        assert method == 'eth_call' and params[0]['to'] == MULTICALL3_ADDRESS
+        self.eth_calls += 1
+        calldata = bytes.fromhex(params[0]['data'][2:])
+        assert calldata[:4] == AGGREGATE3_SELECTOR
+        (calls,) = decode(['(address,bool,bytes)[]'], calldata[4:])
+        results = [(_returns(data) is not None, _returns(data) or b'') for _, allow_failure, data in calls]
+        return '0x' + encode(['(bool,bytes)[]'], [results]).hex()
+
+    async def batch_request(self, calls):
+        self.batches.append(len(calls))
+        responses = []
+        for method, (call, block) in calls:
+            data = _returns(bytes.fromhex(call['data'][2:]))
+            if data is None:
+                responses.append({'error': {'code': -32000, 'message': 'execution reverted'}})
+            else:
+                responses.append({'result': '0x' + data.hex()})
+        return responses
+
+
+def _reader(monkeypatch, pool):
+    monkeypatch.setattr(module.web3_registry, 'get_pool', lambda chain_id: pool)
+    return OnChainReader(settings)
+
+
+async def test_aggregate3_decodes_results_and_failures(monkeypatch):
+    pool = _Pool(multicall=True)
+    data = await _reader(monkeypatch, pool).read_token_basics(1, TOKEN)
+    # decimals() reverts and is simply left out
+    assert data == {'onchain_owner': OWNER, 'ownership_renounced': True, 'onchain_total_supply': SUPPLY}
+    assert pool.eth_calls == 1 and not pool.batches
+
+
+async def test_batch_fallback_without_multicall(monkeypatch):
+    pool = _Pool(multicall=False)
+    data = await _reader(monkeypatch, pool).read_token_basics(1, TOKEN)
+    assert data['onchain_total_supply'] == SUPPLY
+    assert 'decimals' not in data
+    assert pool.batches == [3] and pool.eth_calls == 0
+
+
+async def test_calls_are_chunked(monkeypatch):
+    monkeypatch.setattr(settings, 'MULTICALL_MAX_CALLS', 10)
+    pool = _Pool(multicall=True)
+    reader = _reader(monkeypatch, pool)
+    holders = [f"0x{i:040x}" for i in range(1, 25)]
+    total_supply, balances = await reader.read_balances(1, TOKEN, holders)
+    assert total_supply == SUPPLY
+    assert balances == {holder: int(holder, 16) for holder in holders}
+    assert pool.eth_calls == 3
+    assert reader.stats()['calls'] == 25
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from src.utils import rate_limiter as module
+from src.utils.circuit_breaker import UpstreamError
+from src.utils.rate_limiter import RateLimitExceeded, TokenBucket, rate_limiter
+
+
+def test_local_bucket_keeps_admitting_under_sustained_overload(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(module.time, 'monotonic', lambda: clock[0])
+    bucket = TokenBucket(rate=5.0, capacity=5.0)
+    admitted_at = []
+    # 10 rps offered against a 5 rps budget for 300 seconds
+    for i in range(3000):
+        clock[0] = i / 10
+        if bucket.reserve(5.0, max_wait=30.0) <= 30.0:
+            admitted_at.append(clock[0])
+    assert len(admitted_at) >= 5 * 300
+    assert admitted_at[-1] > 299
+
+
+async def test_rejected_reservations_do_not_drain_the_shared_bucket(fake_redis, monkeypatch):
+    monkeypatch.setattr(rate_limiter.settings, 'RATE_LIMIT_MAX_WAIT', 0.0)
+    source = 'test-source'
+    for _ in range(5):
+        await rate_limiter.acquire(source, 'key')
+    for _ in range(50):
+        with pytest.raises(RateLimitExceeded):
+            await rate_limiter.acquire(source, 'key')
+    # DEFAULT_RATE_LIMIT is 5/s, so a token is back after 0.2s
+    await asyncio.sleep(0.3)
+    await rate_limiter.acquire(source, 'key')
+
+
+class _Response:
+    def __init__(self, status, body):
+        self.status = status
+        self.headers = {}
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self._body
+
+
+class _Session:
+    def __init__(self, status, body):
+        self.calls = 0
+        self._response = _Response(status, body)
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return self._response
+
+
+async def test_get_json_raises_when_still_throttled(monkeypatch):
+    async def noop(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(rate_limiter, 'acquire', noop)
+    monkeypatch.setattr(rate_limiter, 'record_throttled', noop)
+    # Etherscan throttles with HTTP 200 and a NOTOK body
+    session = _Session(200, {'status': '0', 'message': 'NOTOK', 'result': 'Max rate limit reached'})
+    with pytest.raises(UpstreamError):
+        await rate_limiter.get_json(session, 'https://api.etherscan.io/api', 'etherscan', 'key')
+    assert session.calls == rate_limiter.settings.RATE_LIMIT_MAX_RETRIES + 1
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from src.config.settings import settings
+from src.data import rpc_pool as module
+from src.data.rpc_pool import RPCEndpointPool, RPCError
+
+
+class _Response:
+    def __init__(self, status, body):
+        self.status = status
+        self._body = body
+
+    async def json(self, content_type=None):
+        return self._body
+
+
+class _Post:
+    def __init__(self, node, payload):
+        self.node = node
+        self.payload = payload
+
+    async def __aenter__(self):
+        self.node.calls += 1
+        await asyncio.sleep(self.node.delay)
+        if self.node.status != 200:
+            return _Response(self.node.status, None)
+        return _Response(200, {'jsonrpc': '2.0', 'id': self.payload['id'], 'result': self.node.result})
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Node:
+    def __init__(self, result, delay=0.0, status=200):
+        self.result = result
+        self.delay = delay
+        self.status = status
+        self.calls = 0
+
+
+def _pool(monkeypatch, **nodes):
+    class Session:
+        def post(self, url, json=None, timeout=None):
+            return _Post(nodes[url], json)
+
+    async def get_session():
+        return Session()
+
+    monkeypatch.setattr(module, 'get_session', get_session)
+    return RPCEndpointPool(1, list(nodes), settings)
+
+
+async def test_slow_endpoint_is_hedged_to_the_next(monkeypatch):
+    pool = _pool(monkeypatch, slow=_Node('0x1', delay=5), fast=_Node('0x2'))
+    # Rank the slow endpoint first
+    pool.endpoints[0].latencies.append(0.01)
+    pool.endpoints[1].latencies.append(0.02)
+    monkeypatch.setattr(settings, 'RPC_HEDGE_MAX_DELAY', 0.05)
+    result = await asyncio.wait_for(pool.request('eth_blockNumber'), timeout=1)
+    assert result == '0x2'
+    assert pool.hedged_requests == 1
+
+
+async def test_failing_endpoint_is_ejected_and_skipped(monkeypatch):
+    down = _Node('0x1', status=502)
+    up = _Node('0x2')
+    pool = _pool(monkeypatch, down=down, up=up)
+    monkeypatch.setattr(settings, 'RPC_HEDGE_MAX_DELAY', 1.0)
+    for _ in range(settings.RPC_EJECT_AFTER_ERRORS):
+        # Keep the failing endpoint ranked first until it is ejected
+        pool.endpoints[1].latencies.append(10.0)
+        assert await pool.request('eth_blockNumber') == '0x2'
+    assert not pool.endpoints[0].is_healthy()
+    calls = down.calls
+    assert await pool.request('eth_blockNumber') == '0x2'
+    assert down.calls == calls
+    assert pool.failovers == settings.RPC_EJECT_AFTER_ERRORS
+
+
+async def test_all_endpoints_failing_raises(monkeypatch):
+    pool = _pool(monkeypatch, a=_Node(None, status=500), b=_Node(None, status=503))
+    with pytest.raises(RPCError):
+        await pool.request('eth_blockNumber')
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from src.data import security_analyzer as module
+from src.data.security_analyzer import GoPlusAPIError, GoPlusBatcher, SecurityAnalyzer
+from src.utils.circuit_breaker import UpstreamError
+
+GOOD = '0x1111111111111111111111111111111111111111'
+BAD = '0x2222222222222222222222222222222222222222'
+
+
+async def test_malformed_record_fails_only_its_own_lookup(fake_redis, monkeypatch):
+    batcher = GoPlusBatcher(window=0.01, max_size=10)
+    monkeypatch.setattr(module, 'goplus_batcher', batcher)
+    analyzer = SecurityAnalyzer('key')
+
+    async def fetch(chain_id_str, addresses):
+        return {
+            GOOD: {'is_honeypot': '0', 'buy_tax': '0.01', 'sell_tax': '0.02'},
+            BAD: {'is_honeypot': '0', 'buy_tax': '', 'sell_tax': ''},
+        }
+
+    monkeypatch.setattr(analyzer, '_fetch_security_batch', fetch)
+    good, bad = await asyncio.wait_for(asyncio.gather(
+        batcher.lookup(analyzer, GOOD, '1'),
+        batcher.lookup(analyzer, BAD, '1'),
+        return_exceptions=True,
+    ), timeout=5)
+    assert good['buy_tax'] == 0.01
+    assert isinstance(bad, GoPlusAPIError)
+
+
+async def test_throttled_lookup_is_not_reported_as_honeypot(fake_redis, monkeypatch):
+    batcher = GoPlusBatcher(window=0.01, max_size=10)
+    monkeypatch.setattr(module, 'goplus_batcher', batcher)
+    analyzer = SecurityAnalyzer('key')
+
+    async def fetch(chain_id_str, addresses):
+        raise UpstreamError("goplus still throttled after 3 retries")
+
+    monkeypatch.setattr(analyzer, '_fetch_security_batch', fetch)
+    with pytest.raises(UpstreamError):
+        await analyzer.get_token_security(GOOD, 1)
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from src.analyzers import smart_money_tracker as module
+from src.analyzers.smart_money_tracker import SmartMoneyTracker
+
+TOKEN = '0x1111111111111111111111111111111111111111'
+PAIR = '0x2222222222222222222222222222222222222222'
+SMART = '0x3333333333333333333333333333333333333333'
+HEAD = 20_000_000
+
+
+class _Pool:
+    async def request(self, method, params=None):
+        assert method == 'eth_blockNumber'
+        return hex(HEAD)
+
+
+def _stub_chain(monkeypatch, windows, stall_after=None):
+    requested = []
+
+    async def stream_transfers(chain_id, token_address, from_block, to_block):
+        requested.append((from_block, to_block))
+        for i, window in enumerate(windows):
+            if i == stall_after:
+                await asyncio.sleep(60)
+            yield window
+
+    monkeypatch.setattr(module.web3_registry, 'get_pool', lambda chain_id: _Pool())
+    monkeypatch.setattr(module.transfer_indexer, 'stream_transfers', stream_transfers)
+    return requested
+
+
+async def test_flows_scan_up_to_the_current_head(monkeypatch):
+    requested = _stub_chain(monkeypatch, [(HEAD, [(HEAD - 5, PAIR, SMART, 10 ** 18)])])
+    tracker = SmartMoneyTracker()
+    # latest_block from a day-old cached contract part must not be used
+    token_data = {'latest_block': HEAD - 7200, 'pair_address': PAIR, 'price_usd': 2.0}
+    flows = await tracker._compute_flows(TOKEN, 1, token_data, {SMART})
+    assert requested == [(HEAD - 7200 + 1, HEAD)]
+    assert flows['smart_money_net_flow'] == 2.0
+    assert flows['flow_complete']
+
+
+async def test_flow_scan_stops_at_the_callers_budget(monkeypatch):
+    windows = [(HEAD - 3600, [(HEAD - 4000, PAIR, SMART, 10 ** 18)]), (HEAD, [])]
+    _stub_chain(monkeypatch, windows, stall_after=1)
+    tracker = SmartMoneyTracker()
+    tracker.smart_wallets.add(SMART)
+    started = time.monotonic()
+    analysis = await tracker.analyze_smart_money_flow(
+        TOKEN, 1, {'pair_address': PAIR, 'price_usd': 1.0}, time_budget=0.2
+    )
+    assert time.monotonic() - started < 2
+    assert analysis['flow_blocks_scanned'] == [HEAD - 7200 + 1, HEAD - 3600]
+    assert not analysis['flow_complete']
+    assert analysis['smart_money_net_flow'] == 1.0
@@ -0,0 +1,63 @@
+import json
+
+from src.analyzers.source_parser import summarize_source
+
+FLATTENED = '''
+interface IERC20 { function transfer(address to, uint256 amount) external returns (bool); }
+
+library SafeMath { function add(uint a, uint b) internal pure returns (uint) { return a + b; } }
+
+contract Ownable {
+    address private _owner;
+    function renounceOwnership() public onlyOwner { _owner = address(0); }
+}
+
+contract Mintable {
+    // function mint() would be flagged if this contract were in the lineage
+    function mint(address to, uint256 amount) public {}
+}
+
+contract Token is IERC20, Ownable {
+    mapping(address => bool) public bots;
+    /* setFee(uint) is only mentioned here */
+    function setBots(address[] memory bots_) external onlyOwner {}
+    function transfer(address to, uint256 amount) external returns (bool) { return true; }
+}
+'''
+
+
+def test_main_contract_is_the_last_one_nothing_inherits_from():
+    # Mintable is not inherited either, but Token is declared after it
+    result = summarize_source(FLATTENED)
+    summary = result['summary']
+    assert summary['main_contract'] == 'Token'
+    assert summary['inherits'] == ['Ownable']
+    assert result['capabilities'] == ['blacklist']
+    assert 'mint' not in result['matches'] and 'fee_setter' not in result['matches']
+    assert 'ownership_renounced' in result['matches']
+
+
+def test_explicit_contract_name_selects_the_main_contract():
+    result = summarize_source(FLATTENED, 'Mintable')
+    assert result['summary']['main_contract'] == 'Mintable'
+    assert result['summary']['inherits'] == []
+    assert result['capabilities'] == ['mint']
+
+
+def test_multi_file_standard_json_input():
+    sources = {
+        'contracts/Base.sol': {'content': 'contract Base { function pause() public {} }'},
+        'contracts/Token.sol': {'content': 'import "./Base.sol";\ncontract Token is Base { uint256 public maxWallet; }'},
+    }
+    source_code = '{' + json.dumps({'language': 'Solidity', 'sources': sources}) + '}'
+    result = summarize_source(source_code, 'Token')
+    assert result['summary']['file_count'] == 2
+    assert result['summary']['inherits'] == ['Base']
+    assert result['capabilities'] == ['pause']
+    assert 'max_tx' in result['matches']
+
+
+def test_unparseable_source_falls_back_to_a_full_scan():
+    result = summarize_source('function mint() public {}')
+    assert result['summary']['main_contract'] is None
+    assert result['capabilities'] == ['mint']
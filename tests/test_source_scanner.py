@@ -0,0 +1,25 @@
+from src.analyzers.source_scanner import SourceScanner, build_scanner, source_scanner
+
+
+def test_source_scan_is_case_insensitive_and_keeps_offsets():
+    source = 'function setBuyFee(uint f) external onlyOwner { require(!Bots[to]); }'
+    matches = source_scanner.scan(source)
+    assert matches['fee_setter'] == [(9, 'setBuyFee')]
+    assert matches['blacklist'] == [(source.index('Bots['), 'Bots[')]
+
+
+def test_longest_pattern_wins():
+    matches = source_scanner.scan('uint256 public maxTransactionAmount; owner = address(0);')
+    assert matches['max_tx'] == [(15, 'maxTransactionAmount')]
+    assert 'ownership_renounced' in matches
+
+
+def test_positions_are_capped():
+    scanner = SourceScanner({'mint': ['mint']}, max_positions=2)
+    assert len(scanner.scan('mint mint mint')['mint']) == 2
+
+
+def test_configured_patterns_replace_defaults():
+    scanner = build_scanner({'mint': ['issue']})
+    assert 'mint' not in scanner.scan('function mint()')
+    assert scanner.scan('function issue()')['mint'] == [(9, 'issue')]
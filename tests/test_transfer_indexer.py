@@ -0,0 +1,126 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.config.settings import settings
+from src.data import transfer_indexer as module
+from src.data.rpc_pool import RPCResponseError
+from src.data.transfer_indexer import TRANSFER_TOPIC, IndexConflict, TransferIndexer
+
+TOKEN = '0x1111111111111111111111111111111111111111'
+HOLDER = '0x' + '22' * 20
+
+
+def _log(block: int) -> dict:
+    return {
+        'blockNumber': hex(block),
+        'topics': [TRANSFER_TOPIC, '0x' + '00' * 32, '0x' + '00' * 12 + HOLDER[2:]],
+        'data': hex(1),
+    }
+
+
+class _Pool:
+    """One Transfer per block; spans over max_span are refused as too large"""
+    def __init__(self, max_span: int, message: str = 'query returned more than 10000 results'):
+        self.max_span = max_span
+        self.message = message
+        self.spans = []
+
+    async def request(self, method, params=None):
+        assert method == 'eth_getLogs'
+        first, last = int(params[0]['fromBlock'], 16), int(params[0]['toBlock'], 16)
+        self.spans.append(last - first + 1)
+        if last - first + 1 > self.max_span:
+            raise RPCResponseError({'code': -32005, 'message': self.message})
+        return [_log(block) for block in range(first, last + 1)]
+
+
+@pytest.fixture
+def indexer(monkeypatch):
+    monkeypatch.setattr(settings, 'TRANSFER_INDEX_INITIAL_RANGE', 400)
+    monkeypatch.setattr(settings, 'TRANSFER_INDEX_CONCURRENCY', 2)
+    return TransferIndexer(settings)
+
+
+async def _stream(indexer, pool, first, last):
+    windows = indexer.stream_transfers(1, TOKEN, first, last)
+    return [(end, [block for block, *_ in transfers]) async for end, transfers in windows]
+
+
+async def test_refused_ranges_are_split_and_the_range_size_follows(indexer, monkeypatch):
+    pool = _Pool(max_span=100)
+    monkeypatch.setattr(module.web3_registry, 'get_pool', lambda chain_id: pool)
+    windows = await _stream(indexer, pool, 1, 1000)
+    blocks = [block for _, window in windows for block in window]
+    assert blocks == list(range(1, 1001))
+    assert indexer.range_splits > 0
+    # Two 400-block ranges split down to 100; the next window asks for 100 directly
+    assert [end for end, _ in windows] == [800, 1000]
+    assert pool.spans[-2:] == [100, 100]
+    assert indexer.range_splits == 6
+
+
+async def test_other_rpc_errors_are_not_split(indexer, monkeypatch):
+    pool = _Pool(max_span=100, message='execution timeout, rate limited')
+    monkeypatch.setattr(module.web3_registry, 'get_pool', lambda chain_id: pool)
+    with pytest.raises(RPCResponseError):
+        await _stream(indexer, pool, 1, 1000)
+    assert indexer.range_splits == 0
+
+
+class _Checkpoints:
+    """Stands in for the database: only the checkpoint's compare-and-set is modelled"""
+    def __init__(self, last_block: int):
+        self.last_block = last_block
+        self.balance_writes = 0
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    async def execute(self, statement):
+        result = type('Result', (), {'rowcount': 1})()
+        if statement.is_update:
+            params = statement.compile().params
+            if params['last_block_1'] != self.last_block:
+                result.rowcount = 0
+            else:
+                self.last_block = params['last_block']
+        else:
+            self.balance_writes += 1
+        return result
+
+
+async def test_checkpoint_only_moves_from_where_it_was(indexer, monkeypatch):
+    db = _Checkpoints(last_block=100)
+    monkeypatch.setattr(module, 'get_db', db.session)
+    transfers = [(150, '0x' + '00' * 20, HOLDER, 5)]
+    await indexer._apply(1, TOKEN, 100, 200, transfers, caught_up=False)
+    assert db.last_block == 200 and db.balance_writes == 2
+
+    # A second sync that also started from block 100 must not apply it again
+    with pytest.raises(IndexConflict):
+        await indexer._apply(1, TOKEN, 100, 200, transfers, caught_up=False)
+    assert db.last_block == 200 and db.balance_writes == 2
+
+
+async def test_sync_stops_on_a_conflicting_checkpoint(indexer, monkeypatch):
+    class _HeadPool(_Pool):
+        async def request(self, method, params=None):
+            if method == 'eth_blockNumber':
+                return hex(1000 + settings.TRANSFER_INDEX_CONFIRMATIONS)
+            return await super().request(method, params)
+
+    pool = _HeadPool(max_span=1000)
+    db = _Checkpoints(last_block=500)
+    monkeypatch.setattr(module.web3_registry, 'get_pool', lambda chain_id: pool)
+    monkeypatch.setattr(module, 'get_db', db.session)
+
+    async def stale_checkpoint(chain_id, token_address):
+        # Another worker has already moved it to 500
+        return {'start_block': 0, 'last_block': 100, 'caught_up': False}
+
+    monkeypatch.setattr(indexer, '_load_checkpoint', stale_checkpoint)
+    result = await indexer.sync(1, TOKEN)
+    assert result == {'last_block': 100, 'head': 1000, 'caught_up': False, 'conflict': True}
+    assert indexer.conflicts == 1 and db.last_block == 500